@@ -3,7 +3,6 @@
 
 # external
 import numpy as np
-import scipy.signal
 
 # local
 import alphasynchro.ms.peaks.indexed.mz_peaks
@@ -11,6 +10,11 @@ import alphasynchro.performance.compiling
 import alphasynchro.ms.dimensions.push_matching
 import alphasynchro.ms.dimensions.mz_matching
 import alphasynchro.algorithms.matching.matching
+import alphasynchro.io.hdf
+import alphasynchro.ms.peaks.fragments
+import alphasynchro.ms.peaks.precursors
+import alphasynchro.performance.multithreading
+import alphasynchro.stats.apex_finder
 
 
 @alphasynchro.performance.compiling.njit_dataclass
@@ -34,12 +38,19 @@ class TransmissionCalibrator:
         max_mz=100,
         decimals=1,
         most_intense_count=10000,
+        sampled_cycle_count=0,
     ):
         um = alphasynchro.algorithms.matching.matching.UnfragmentedMatcherMultithreaded(
             indexed_precursors=indexed_precursors,
             indexed_fragments=indexed_fragments,
         )
-        unfragmented_pairs = um.match_all()
+        push_indices = None
+        if sampled_cycle_count > 0:
+            push_indices = get_sampled_push_indices(
+                indexed_precursors,
+                sampled_cycle_count,
+            )
+        unfragmented_pairs = um.match_all(push_indices=push_indices)
         most_intense_count = np.minimum(most_intense_count, len(unfragmented_pairs))
         unfragmented_pairs = unfragmented_pairs[
             np.argpartition(
@@ -48,54 +59,24 @@ class TransmissionCalibrator:
             )[-most_intense_count:]
         ]
         cycle_center = (np.sum(cycle, axis=-1) / 2)[0]
-        eff_dict = {}
-        for prec_index, frag_index in unfragmented_pairs:
-            im_projection = fragments.im_projection.get_pdf(frag_index)
-            im_projection /= np.max(im_projection)
-            frame = fragments.aggregate_data.frame_group[frag_index]
-            start_offset = fragments.im_projection.get_start_offset(frag_index)
-            end_offset = fragments.im_projection.get_end_offset(frag_index)
-            mz_centers = np.copy(cycle_center[frame, start_offset: end_offset])
-            mz = monoisotopic_precursors.aggregate_data.mz_weighted_average[prec_index]
-            mz_centers -= mz
-
-            prec_im_projection = monoisotopic_precursors.im_projection.get_pdf(prec_index)
-            prec_im_projection /= np.max(prec_im_projection)
-            prec_start_offset = monoisotopic_precursors.im_projection.get_start_offset(prec_index)
-            prec_end_offset = monoisotopic_precursors.im_projection.get_end_offset(prec_index)
-
-            smooth = scipy.signal.convolve(im_projection, np.ones(smooth_factor)/smooth_factor, mode='same')
-            prec_smooth = scipy.signal.convolve(prec_im_projection, np.ones(smooth_factor)/smooth_factor, mode='same')
-
-            efficiency = np.zeros(prec_end_offset - prec_start_offset)
-            efficiency_slice = efficiency[:]
-            target_slice = smooth
-            if prec_start_offset < start_offset:
-                efficiency_slice = efficiency_slice[start_offset - prec_start_offset:]
-            else:
-                target_slice = target_slice[prec_start_offset - start_offset:]
-            if len(efficiency_slice) > len(target_slice):
-                efficiency_slice = efficiency_slice[:len(target_slice)]
-            else:
-                target_slice = target_slice[:len(efficiency_slice)]
-
-            efficiency_slice[:] = target_slice[:]
-            efficiency /= prec_smooth
-
-            mz_centers = np.copy(cycle_center[frame, prec_start_offset: prec_end_offset])
-            mz = monoisotopic_precursors.aggregate_data.mz_weighted_average[prec_index]
-            mz_centers -= mz
-
-            for mz, eff in zip(np.round(mz_centers, decimals), efficiency):
-                if mz not in eff_dict:
-                    eff_dict[mz] = []
-                eff_dict[mz].append(eff)
-        eff_dict = {
-            mz: np.median(np.array(eff)[np.isfinite(eff)]) for mz, eff in sorted(eff_dict.items())
-        }
-        # plt.plot(*zip(*eff_dict2.items()))
+        efficiency_calculator = UnfragmentedEfficiencyCalculator(
+            precursors=monoisotopic_precursors,
+            fragments=fragments,
+            cycle_center=cycle_center,
+            smooth_array=np.ones(smooth_factor) / smooth_factor,
+            decimals=decimals,
+        )
+        efficiencies, mz_bins = efficiency_calculator.calculate_all(
+            unfragmented_pairs
+        )
+        unique_mz_bins, median_efficiencies = calculate_binned_medians(
+            efficiencies,
+            mz_bins,
+        )
+        # plt.plot(unique_mz_bins / 10**decimals, median_efficiencies)
         indexed_efficiency = np.zeros((2, int(max_mz * smooth_factor)))
-        for mz, eff in eff_dict.items():
+        for mz_bin, eff in zip(unique_mz_bins, median_efficiencies):
+            mz = mz_bin / 10.**decimals
             sign = int(mz > 0)
             index = int(abs(mz) * 10**decimals)
             if index < indexed_efficiency.shape[1]:
@@ -109,6 +90,54 @@ class TransmissionCalibrator:
             decimals=decimals,
         )
 
+    @classmethod
+    def from_file(cls, file_name: str):
+        hdf_object = alphasynchro.io.hdf.HDFObject.from_file(file_name)
+        group = hdf_object.transmission_calibrator
+        unfragmented_pairs = np.array([], dtype=np.int64)
+        # older calibration files do not contain unfragmented pairs
+        if "unfragmented_pairs" in group.arrays:
+            unfragmented_pairs = np.array(group.unfragmented_pairs)
+        return cls(
+            unfragmented_pairs=unfragmented_pairs,
+            indexed_efficiency=np.array(group.indexed_efficiency),
+            decimals=int(group.decimals),
+        )
+
+    def to_file(self, file_name: str) -> None:
+        hdf_object = alphasynchro.io.hdf.HDFObject.from_file(file_name, new=True)
+        group = hdf_object.set_group("transmission_calibrator")
+        group.set_mmap("unfragmented_pairs", self.unfragmented_pairs)
+        group.set_mmap("indexed_efficiency", self.indexed_efficiency)
+        group.set_attr("decimals", self.decimals)
+
+    def get_drift(self, other) -> float:
+        step = 10.**-max(self.decimals, other.decimals)
+        lower_bound, upper_bound = self.get_transmission_bounds()
+        other_lower_bound, other_upper_bound = other.get_transmission_bounds()
+        mz_distances = np.arange(
+            min(lower_bound, other_lower_bound),
+            max(upper_bound, other_upper_bound) + step,
+            step,
+        )
+        return np.max(
+            np.abs(
+                self.get_efficiencies(mz_distances) - other.get_efficiencies(mz_distances)
+            )
+        )
+
+    def get_transmission_bounds(self) -> tuple[float, float]:
+        index_factor = 10**self.decimals
+        negative_indices = np.flatnonzero(self.indexed_efficiency[0])
+        positive_indices = np.flatnonzero(self.indexed_efficiency[1])
+        lower_bound = 0.
+        upper_bound = 0.
+        if len(negative_indices) > 0:
+            lower_bound = -(negative_indices[-1] + 2) / index_factor
+        if len(positive_indices) > 0:
+            upper_bound = (positive_indices[-1] + 2) / index_factor
+        return lower_bound, upper_bound
+
     @alphasynchro.performance.compiling.njit
     def get_efficiency(
         self,
@@ -120,3 +149,147 @@ class TransmissionCalibrator:
         if index < self.indexed_efficiency.shape[1]:
             efficiency = self.indexed_efficiency[sign, index]
         return efficiency
+
+    @alphasynchro.performance.compiling.njit(nogil=True)
+    def get_efficiencies(
+        self,
+        mz_distances: np.ndarray,
+    ) -> np.ndarray:
+        efficiencies = np.zeros(len(mz_distances))
+        index_factor = 10**self.decimals
+        max_index = self.indexed_efficiency.shape[1]
+        for distance_index, mz_distance in enumerate(mz_distances):
+            sign = int(mz_distance >= 0)
+            index = int(abs(mz_distance) * index_factor)
+            if index < max_index:
+                efficiencies[distance_index] = self.indexed_efficiency[sign, index]
+        return efficiencies
+
+
+def get_sampled_push_indices(
+    indexed_peaks: alphasynchro.ms.peaks.indexed.mz_peaks.PushIndexedMzs,
+    cycle_count: int,
+) -> np.ndarray:
+    total_cycle_count, frame_count, scan_count = indexed_peaks.axis_shape
+    cycles = np.unique(
+        np.linspace(0, total_cycle_count - 1, cycle_count).astype(np.int64)
+    )
+    pushes_per_cycle = frame_count * scan_count
+    push_indices = (
+        cycles[:, np.newaxis] * pushes_per_cycle + np.arange(pushes_per_cycle)
+    ).ravel()
+    return push_indices[push_indices < len(indexed_peaks)]
+
+
+@alphasynchro.performance.compiling.njit_dataclass
+class UnfragmentedEfficiencyCalculator:
+
+    precursors: alphasynchro.ms.peaks.precursors.Precursors
+    fragments: alphasynchro.ms.peaks.fragments.Fragments
+    cycle_center: np.ndarray
+    smooth_array: np.ndarray
+    decimals: int = 1
+
+    def calculate_all(
+        self,
+        unfragmented_pairs: np.ndarray,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        precursor_sizes = np.diff(self.precursors.im_projection.indptr)
+        indptr = np.zeros(len(unfragmented_pairs) + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum(precursor_sizes[unfragmented_pairs[:, 0]])
+        efficiencies = np.empty(indptr[-1])
+        mz_bins = np.empty(indptr[-1], dtype=np.int64)
+        alphasynchro.performance.multithreading.parallel(
+            self.calculate_from_buffers
+        )(
+            range(len(unfragmented_pairs)),
+            unfragmented_pairs,
+            indptr,
+            efficiencies,
+            mz_bins,
+        )
+        return efficiencies, mz_bins
+
+    @alphasynchro.performance.compiling.njit(nogil=True)
+    def calculate_from_buffers(
+        self,
+        index: int,
+        unfragmented_pairs: np.ndarray,
+        indptr: np.ndarray,
+        efficiencies: np.ndarray,
+        mz_bins: np.ndarray,
+    ) -> None:
+        precursor_index, fragment_index = unfragmented_pairs[index]
+        start = indptr[index]
+        end = indptr[index + 1]
+        efficiencies[start: end] = self.calculate_efficiency(
+            precursor_index,
+            fragment_index,
+        )
+        frame = self.fragments.aggregate_data.frame_group[fragment_index]
+        start_offset = self.precursors.im_projection.get_start_offset(precursor_index)
+        end_offset = self.precursors.im_projection.get_end_offset(precursor_index)
+        mz = self.precursors.aggregate_data.mz_weighted_average[precursor_index]
+        mz_differences = self.cycle_center[frame, start_offset: end_offset] - mz
+        mz_bins[start: end] = np.rint(mz_differences * 10.**self.decimals)
+
+    @alphasynchro.performance.compiling.njit(nogil=True)
+    def calculate_efficiency(
+        self,
+        precursor_index: int,
+        fragment_index: int,
+    ) -> np.ndarray:
+        smooth = self.get_smooth_projection(self.fragments.im_projection, fragment_index)
+        start_offset = self.fragments.im_projection.get_start_offset(fragment_index)
+        precursor_smooth = self.get_smooth_projection(
+            self.precursors.im_projection,
+            precursor_index,
+        )
+        precursor_start_offset = self.precursors.im_projection.get_start_offset(
+            precursor_index
+        )
+        efficiency = np.zeros(len(precursor_smooth))
+        efficiency_slice = efficiency[:]
+        target_slice = smooth
+        if precursor_start_offset < start_offset:
+            efficiency_slice = efficiency_slice[start_offset - precursor_start_offset:]
+        else:
+            target_slice = target_slice[precursor_start_offset - start_offset:]
+        if len(efficiency_slice) > len(target_slice):
+            efficiency_slice = efficiency_slice[:len(target_slice)]
+        else:
+            target_slice = target_slice[:len(efficiency_slice)]
+        efficiency_slice[:] = target_slice[:]
+        efficiency /= precursor_smooth
+        return efficiency
+
+    @alphasynchro.performance.compiling.njit(nogil=True)
+    def get_smooth_projection(
+        self,
+        projection: alphasynchro.stats.distributions.CDFWithOffset,
+        index: int,
+    ) -> np.ndarray:
+        distribution = projection.get_pdf(index)
+        distribution /= np.max(distribution)
+        return alphasynchro.stats.apex_finder.convolve_same(
+            distribution,
+            self.smooth_array,
+        )
+
+
+def calculate_binned_medians(
+    values: np.ndarray,
+    bins: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray]:
+    unique_bins, bin_indices = np.unique(bins, return_inverse=True)
+    is_finite = np.isfinite(values)
+    values = values[is_finite]
+    bin_indices = bin_indices[is_finite]
+    order = np.lexsort((values, bin_indices))
+    sorted_values = values[order]
+    counts = np.bincount(bin_indices, minlength=len(unique_bins))
+    starts = np.cumsum(counts) - counts
+    lower = sorted_values[np.minimum(starts + (counts - 1) // 2, len(sorted_values) - 1)]
+    upper = sorted_values[np.minimum(starts + counts // 2, len(sorted_values) - 1)]
+    medians = np.where(counts > 0, (lower + upper) / 2, np.nan)
+    return unique_bins, medians
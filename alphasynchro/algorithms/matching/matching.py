@@ -11,6 +11,9 @@ import alphasynchro.ms.dimensions.push_matching
 import alphasynchro.ms.dimensions.mz_matching
 
 
+PROTON_MASS = 1.007276466621
+
+
 @alphasynchro.performance.compiling.njit_dataclass
 class Matcher:
 
@@ -29,12 +32,85 @@ class Matcher:
             count += 1
         return count
 
+    @alphasynchro.performance.compiling.njit(nogil=True)
+    def fill_matches(
+        self,
+        push_index: int,
+        matches: np.ndarray,
+        offset: int,
+    ) -> int:
+        for precursor_index, fragment_index in self.generate_matches(push_index):
+            matches[offset] = precursor_index, fragment_index
+            offset += 1
+        return offset
+
 
 @alphasynchro.performance.compiling.njit_dataclass
 class UnfragmentedMatcher(Matcher):
 
     ppm_tolerance: float = 50
 
+    @alphasynchro.performance.compiling.njit(nogil=True)
+    def count_matches(
+        self,
+        push_index: int,
+    ) -> int:
+        count = 0
+        if self.indexed_precursors.is_empty(push_index):
+            return count
+        mz_values1 = self.indexed_precursors.get_values(push_index)
+        for frame_offset in range(1, self.indexed_precursors.axis_shape[1]):
+            for other_push_index in alphasynchro.ms.dimensions.push_matching.generate_neighbor_push_indices(
+                push_index + frame_offset * self.indexed_precursors.axis_shape[2],
+                self.indexed_precursors.axis_shape,
+                self.scan_tolerance,
+                self.cycle_tolerance,
+            ):
+                mz_values2 = self.indexed_fragments.get_values(other_push_index)
+                count += alphasynchro.ms.dimensions.mz_matching.count_mz_array_matches(
+                    mz_values1,
+                    mz_values2,
+                    self.ppm_tolerance
+                )
+        return count
+
+    @alphasynchro.performance.compiling.njit(nogil=True)
+    def fill_matches(
+        self,
+        push_index: int,
+        matches: np.ndarray,
+        offset: int,
+    ) -> int:
+        if self.indexed_precursors.is_empty(push_index):
+            return offset
+        mz_values1 = self.indexed_precursors.get_values(push_index)
+        (
+            precursor_start_offset,
+            _
+        ) = self.indexed_precursors.get_boundaries(push_index)
+        for frame_offset in range(1, self.indexed_precursors.axis_shape[1]):
+            for other_push_index in alphasynchro.ms.dimensions.push_matching.generate_neighbor_push_indices(
+                push_index + frame_offset * self.indexed_precursors.axis_shape[2],
+                self.indexed_precursors.axis_shape,
+                self.scan_tolerance,
+                self.cycle_tolerance,
+            ):
+                mz_values2 = self.indexed_fragments.get_values(other_push_index)
+                (
+                    fragment_start_offset,
+                    _
+                ) = self.indexed_fragments.get_boundaries(other_push_index)
+                offset = alphasynchro.ms.dimensions.mz_matching.fill_mz_array_matches(
+                    mz_values1,
+                    mz_values2,
+                    self.ppm_tolerance,
+                    matches,
+                    offset,
+                    precursor_start_offset,
+                    fragment_start_offset,
+                )
+        return offset
+
     @alphasynchro.performance.compiling.njit(nogil=True)
     def generate_matches(
         self,
@@ -97,18 +173,110 @@ class FragmentedMatcher(Matcher):
                 for fragment_index in range(fragment_start_offset, fragment_end_offset):
                     yield (precursor_index, fragment_index)
 
+    @alphasynchro.performance.compiling.njit(nogil=True)
+    def count_candidates(
+        self,
+        push_index: int,
+    ) -> int:
+        if self.indexed_precursors.is_empty(push_index):
+            return 0
+        fragment_count = 0
+        for other_push_index in alphasynchro.ms.dimensions.push_matching.generate_neighbor_push_indices(
+            push_index + self.frame * self.indexed_precursors.axis_shape[2],
+            self.indexed_precursors.axis_shape,
+            self.scan_tolerance,
+            self.cycle_tolerance,
+        ):
+            fragment_count += self.indexed_fragments.get_size(other_push_index)
+        return fragment_count * self.indexed_precursors.get_size(push_index)
+
+
+@alphasynchro.performance.compiling.njit_dataclass
+class PrunedFragmentedMatcher(FragmentedMatcher):
+
+    precursor_mz_values: np.ndarray
+    precursor_charges: np.ndarray
+    cycle: np.ndarray
+    ppm_tolerance: float = 50
+    quadrupole_tolerance: float = 1.0
+
+    @alphasynchro.performance.compiling.njit(nogil=True)
+    def generate_matches(
+        self,
+        push_index: int,
+    ) -> (tuple[int, int]):
+        if self.indexed_precursors.is_empty(push_index):
+            return
+        precursor_indices = self.indexed_precursors.get_values(push_index)
+        for other_push_index in alphasynchro.ms.dimensions.push_matching.generate_neighbor_push_indices(
+            push_index + self.frame * self.indexed_precursors.axis_shape[2],
+            self.indexed_precursors.axis_shape,
+            self.scan_tolerance,
+            self.cycle_tolerance,
+        ):
+            (
+                fragment_start_offset,
+                fragment_end_offset
+            ) = self.indexed_fragments.get_boundaries(other_push_index)
+            if fragment_start_offset == fragment_end_offset:
+                continue
+            scan_index = other_push_index % self.indexed_precursors.axis_shape[2]
+            for precursor_index in precursor_indices:
+                if not self.is_transmitted(precursor_index, scan_index):
+                    continue
+                max_fragment_mz = self.get_max_fragment_mz(precursor_index)
+                for fragment_index in range(fragment_start_offset, fragment_end_offset):
+                    if self.indexed_fragments.values[fragment_index] <= max_fragment_mz:
+                        yield (precursor_index, fragment_index)
+
+    @alphasynchro.performance.compiling.njit(nogil=True)
+    def is_transmitted(
+        self,
+        precursor_index: int,
+        scan_index: int,
+    ) -> bool:
+        if self.quadrupole_tolerance < 0:
+            return True
+        precursor_mz = self.precursor_mz_values[precursor_index]
+        lower_mz = self.cycle[0, self.frame, scan_index, 0] - self.quadrupole_tolerance
+        upper_mz = self.cycle[0, self.frame, scan_index, 1] + self.quadrupole_tolerance
+        return lower_mz <= precursor_mz <= upper_mz
+
+    @alphasynchro.performance.compiling.njit(nogil=True)
+    def get_max_fragment_mz(
+        self,
+        precursor_index: int,
+    ) -> float:
+        charge = self.precursor_charges[precursor_index]
+        if charge <= 0:
+            return np.inf
+        precursor_mz = self.precursor_mz_values[precursor_index]
+        singly_charged_mz = (precursor_mz - PROTON_MASS) * charge + PROTON_MASS
+        return singly_charged_mz * (1 + self.ppm_tolerance * 10**-6)
+
+    @alphasynchro.performance.compiling.njit(nogil=True)
+    def count_matches_and_pruned_candidates(
+        self,
+        push_index: int,
+    ) -> tuple[int, int]:
+        match_count = self.count_matches(push_index)
+        return match_count, self.count_candidates(push_index) - match_count
+
 
 @alphasynchro.performance.compiling.njit_dataclass
 class MultiThreader:
 
     def count_all(
         self,
+        push_indices: np.ndarray = None,
     ) -> np.ndarray[float]:
-        match_counts = np.empty(len(self.indexed_precursors), dtype=np.int64)
+        match_counts = np.zeros(len(self.indexed_precursors), dtype=np.int64)
+        if push_indices is None:
+            push_indices = range(len(match_counts))
         alphasynchro.performance.multithreading.parallel(
             self._count_from_buffers
         )(
-            range(len(match_counts)),
+            push_indices,
             match_counts,
         )
         return match_counts
@@ -125,9 +293,10 @@ class MultiThreader:
     def match_all(
         self,
         match_counts: np.ndarray = None,
+        push_indices: np.ndarray = None,
     ) -> np.ndarray[float]:
         if match_counts is None:
-            match_counts = self.count_all()
+            match_counts = self.count_all(push_indices)
         match_indptr = np.zeros(
             len(self.indexed_precursors) + 1,
             dtype=np.int64
@@ -137,10 +306,12 @@ class MultiThreader:
             (match_indptr[-1], 2),
             dtype=np.int64
         )
+        if push_indices is None:
+            push_indices = range(len(match_indptr))
         alphasynchro.performance.multithreading.parallel(
             self._set_match_from_buffers
         )(
-            range(len(match_indptr)),
+            push_indices,
             matches,
             match_indptr,
         )
@@ -153,10 +324,11 @@ class MultiThreader:
         matches: np.ndarray,
         match_indptr: np.ndarray
     ) -> None:
-        for precursor_index, fragment_index in self.generate_matches(push_index):
-            match_count = match_indptr[push_index]
-            matches[match_count] = precursor_index, fragment_index
-            match_indptr[push_index] += 1
+        match_indptr[push_index] = self.fill_matches(
+            push_index,
+            matches,
+            match_indptr[push_index],
+        )
 
 
 @alphasynchro.performance.compiling.njit_dataclass
@@ -169,3 +341,38 @@ class UnfragmentedMatcherMultithreaded(UnfragmentedMatcher, MultiThreader):
 class FragmentedMatcherMultithreaded(FragmentedMatcher, MultiThreader):
 
     pass
+
+
+@alphasynchro.performance.compiling.njit_dataclass
+class PrunedFragmentedMatcherMultithreaded(PrunedFragmentedMatcher, MultiThreader):
+
+    def count_all(
+        self,
+        push_indices: np.ndarray = None,
+        pruned_counts: np.ndarray = None,
+    ) -> np.ndarray[int]:
+        match_counts = np.zeros(len(self.indexed_precursors), dtype=np.int64)
+        if pruned_counts is None:
+            pruned_counts = np.zeros_like(match_counts)
+        if push_indices is None:
+            push_indices = range(len(match_counts))
+        alphasynchro.performance.multithreading.parallel(
+            self._count_with_pruned_from_buffers
+        )(
+            push_indices,
+            match_counts,
+            pruned_counts,
+        )
+        return match_counts
+
+    @alphasynchro.performance.compiling.njit(nogil=True)
+    def _count_with_pruned_from_buffers(
+        self,
+        push_index: int,
+        match_counts: np.ndarray[int],
+        pruned_counts: np.ndarray[int],
+    ) -> None:
+        (
+            match_counts[push_index],
+            pruned_counts[push_index],
+        ) = self.count_matches_and_pruned_candidates(push_index)
@@ -2,7 +2,9 @@
 
 
 # builtin
+import contextlib
 import logging
+import os
 from typing import Any
 
 # local
@@ -16,18 +18,28 @@ import alphasynchro.algorithms.precursor_slicing
 import alphasynchro.ms.transitions.frame_transitions
 import alphasynchro.algorithms.matching.matching
 import alphasynchro.data.sparse_indices
-import alphasynchro.stats.apex_finder
 import alphasynchro.ms.peaks.indexed.im_peaks
 import alphasynchro.stats.ks_1d
 import alphasynchro.ms.peaks.merged_fragments
 import alphasynchro.stats.distributions
 import alphasynchro.io.writing.mgf
 import alphasynchro.data.dataframe
+import alphasynchro.performance.instrumentation
+import alphasynchro.performance.profiling
+import alphasynchro.performance.memory
 
 # external
 import numpy as np
 
 
+# bytes per precursor-fragment pair while matching, sorting and ks-testing
+PAIR_MEMORY_SIZE = 96
+# blocks with fewer pairs are dominated by the overhead of launching threads
+MIN_PAIR_BLOCK_SIZE = 2**16
+# cycles sampled to check a stored calibration before fully recalibrating
+DRIFT_PROBE_CYCLE_COUNT = 16
+
+
 class Pipeline:
 
     def __init__(
@@ -55,24 +67,51 @@ class Pipeline:
         min_peaks: int = 0,
         unique_transitions_only: bool = False,
         diapasef: bool = False,
+        prune_candidates: bool = False,
+        quadrupole_tolerance: float = 1.0,
+        ks_statistics: bool = False,
+        cdf_dtype: str = "float64",
+        ks_sketch_size: int = 0,
+        approximate_ks: bool = False,
+        calibration_file: str = None,
+        calibration_drift_tolerance: float = None,
+        sampled_cycle_count: int = 0,
+        max_memory: float = None,
     ) -> None:
-        self.load_data_space(cluster_file_name)
-        self.load_peaks(cluster_file_name, min_fragment_size)
-        self.calibrate(
-            smooth_factor=smooth_factor,
-            max_mz=max_mz,
-            decimals=decimals,
-            most_intense_count=most_intense_count,
-        )
-        self.create_ms2_spectra(
-            min_peaks=min_peaks,
-            max_rt_weight=max_rt_weight,
-            max_im_weight=max_im_weight,
-            max_frame_weight=max_frame_weight,
-            unique_transitions_only=unique_transitions_only,
-            diapasef=diapasef,
-        )
+        report_file_name = f"{os.path.splitext(self.analysis_file.file_name)[0]}_report.json"
+        with alphasynchro.performance.instrumentation.report(report_file_name) as report:
+            self.load_data_space(cluster_file_name)
+            self.load_peaks(cluster_file_name, min_fragment_size, cdf_dtype)
+            self.calibrate(
+                smooth_factor=smooth_factor,
+                max_mz=max_mz,
+                decimals=decimals,
+                most_intense_count=most_intense_count,
+                calibration_file=calibration_file,
+                calibration_drift_tolerance=calibration_drift_tolerance,
+                sampled_cycle_count=sampled_cycle_count,
+            )
+            self.create_ms2_spectra(
+                min_peaks=min_peaks,
+                max_rt_weight=max_rt_weight,
+                max_im_weight=max_im_weight,
+                max_frame_weight=max_frame_weight,
+                unique_transitions_only=unique_transitions_only,
+                diapasef=diapasef,
+                prune_candidates=prune_candidates,
+                quadrupole_tolerance=quadrupole_tolerance,
+                ks_statistics=ks_statistics,
+                cdf_dtype=cdf_dtype,
+                ks_sketch_size=ks_sketch_size,
+                approximate_ks=approximate_ks,
+                max_memory=max_memory,
+            )
+            if alphasynchro.performance.profiling.is_enabled():
+                alphasynchro.performance.profiling.show_kernel_profiles()
+                report["kernel_profiles"] = alphasynchro.performance.profiling.get_kernel_profiles()
+        logging.info(f"Stage timings and memory usage are written to {report_file_name}")
 
+    @alphasynchro.performance.instrumentation.stage
     def load_data_space(
         self,
         cluster_file_name: str,
@@ -85,21 +124,23 @@ class Pipeline:
         self.cycle = hdf_cluster_object.acquisition.cycle
         self.tof_indptr = hdf_cluster_object.acquisition.tof_indptr
 
+    @alphasynchro.performance.instrumentation.stage
     def load_peaks(
         self,
         cluster_file_name,
         min_fragment_size: int = 0,
+        cdf_dtype: str = "float64",
     ) -> None:
         logging.info("Loading peaks...")
         logging.info("Loading precursors...")
         self.monoisotopic_precursors = alphasynchro.ms.peaks.precursors.Precursors.from_clusters_hdf(
             cluster_file_name,
-        )
+        ).compress_projections(cdf_dtype)
         logging.info("Loading fragments...")
         self.fragments = alphasynchro.ms.peaks.fragments.Fragments.from_clusters_hdf(
             cluster_file_name,
             min_fragment_size=min_fragment_size,
-        )
+        ).compress_projections(cdf_dtype)
         logging.info("Indexing fragments...")
         self.indexed_fragments = alphasynchro.ms.peaks.indexed.mz_peaks.PushIndexedMzs.from_data_space(
             peaks=self.fragments,
@@ -108,13 +149,26 @@ class Pipeline:
         )
         logging.info("Finished loading peaks")
 
+    @alphasynchro.performance.instrumentation.stage
     def calibrate(
         self,
         smooth_factor=10,
         max_mz=100,
         decimals=1,
         most_intense_count=10000,
+        calibration_file: str = None,
+        calibration_drift_tolerance: float = None,
+        sampled_cycle_count: int = 0,
     ) -> None:
+        stored_calibrator = None
+        if (calibration_file is not None) and os.path.exists(calibration_file):
+            logging.info(f"Loading quadrupole calibration from {calibration_file}...")
+            stored_calibrator = alphasynchro.algorithms.calibration.TransmissionCalibrator.from_file(
+                calibration_file
+            )
+            if calibration_drift_tolerance is None:
+                self.transmission_calibrator = stored_calibrator
+                return
         logging.info("Calibrating quadrupole...")
         logging.info("Indexing precursors...")
         indexed_precursors = alphasynchro.ms.peaks.indexed.mz_peaks.PushIndexedMzs.from_data_space(
@@ -122,19 +176,61 @@ class Pipeline:
             cycle_shape=self.cycle.shape,
             tof_indptr=self.tof_indptr,
         )
-        self.transmission_calibrator = alphasynchro.algorithms.calibration.TransmissionCalibrator.from_unfragmented_pairs(
-            self.indexed_fragments,
-            indexed_precursors,
-            self.monoisotopic_precursors,
-            self.fragments,
-            self.cycle,
+        calibration_parameters = dict(
             smooth_factor=smooth_factor,
             max_mz=max_mz,
             decimals=decimals,
             most_intense_count=most_intense_count,
         )
+        if stored_calibrator is not None:
+            probe_cycle_count = DRIFT_PROBE_CYCLE_COUNT
+            if sampled_cycle_count > 0:
+                probe_cycle_count = min(probe_cycle_count, sampled_cycle_count)
+            logging.info(
+                f"Probing quadrupole calibration drift on {probe_cycle_count} cycles..."
+            )
+            probe_calibrator = self.create_transmission_calibrator(
+                indexed_precursors,
+                sampled_cycle_count=probe_cycle_count,
+                **calibration_parameters,
+            )
+            drift = stored_calibrator.get_drift(probe_calibrator)
+            logging.info(f"Quadrupole calibration drift is {drift:.4f}")
+            if drift <= calibration_drift_tolerance:
+                self.transmission_calibrator = stored_calibrator
+                logging.info("Finished calibrating quadrupole")
+                return
+        transmission_calibrator = self.create_transmission_calibrator(
+            indexed_precursors,
+            sampled_cycle_count=sampled_cycle_count,
+            **calibration_parameters,
+        )
+        if stored_calibrator is not None:
+            logging.info(f"Refreshing quadrupole calibration in {calibration_file}")
+            transmission_calibrator.to_file(calibration_file)
+        elif calibration_file is not None:
+            logging.info(f"Saving quadrupole calibration to {calibration_file}")
+            transmission_calibrator.to_file(calibration_file)
+        self.transmission_calibrator = transmission_calibrator
         logging.info("Finished calibrating quadrupole")
 
+    def create_transmission_calibrator(
+        self,
+        indexed_precursors: alphasynchro.ms.peaks.indexed.mz_peaks.PushIndexedMzs,
+        sampled_cycle_count: int = 0,
+        **calibration_parameters,
+    ) -> alphasynchro.algorithms.calibration.TransmissionCalibrator:
+        return alphasynchro.algorithms.calibration.TransmissionCalibrator.from_unfragmented_pairs(
+            self.indexed_fragments,
+            indexed_precursors,
+            self.monoisotopic_precursors,
+            self.fragments,
+            self.cycle,
+            sampled_cycle_count=sampled_cycle_count,
+            **calibration_parameters,
+        )
+
+    @alphasynchro.performance.instrumentation.stage
     def create_ms2_spectra(
         self,
         min_peaks: int = 0,
@@ -143,6 +239,13 @@ class Pipeline:
         max_frame_weight: float = .5,
         unique_transitions_only: bool = False,
         diapasef: bool = False,
+        prune_candidates: bool = False,
+        quadrupole_tolerance: float = 1.0,
+        ks_statistics: bool = False,
+        cdf_dtype: str = "float64",
+        ks_sketch_size: int = 0,
+        approximate_ks: bool = False,
+        max_memory: float = None,
     ) -> None:
         logging.info("Calculating transitions and creating MS2 spectra...")
         cycle_center = (np.sum(self.cycle, axis=-1) / 2)[0]
@@ -152,84 +255,130 @@ class Pipeline:
             cycle_center=cycle_center,
             cycle=self.cycle,
             diapasef=diapasef,
+            cdf_dtype=cdf_dtype,
         )
-        rt_transitions_dict = {}
-        im_transitions_dict = {}
-        summed_precursor_intensities_dict = {}
-        logging.info("Calculating frame transitions...")
-        for frame_index in range(1, self.cycle.shape[1]):
-            (
-                summed_precursor_intensities_dict[frame_index],
-                im_transitions_dict[frame_index],
-                rt_transitions_dict[frame_index],
-            ) = self.calculate_transitions_of_frame(
-                frame_index=frame_index,
-                unique_transitions_only=unique_transitions_only,
-                max_im_weight=max_im_weight,
-                max_rt_weight=max_rt_weight,
-                min_peaks=min_peaks,
-                slicer=slicer,
+        logging.info("Indexing transmissible precursors...")
+        transmissibility_index = slicer.create_transmissibility_index()
+        if ks_sketch_size > 0:
+            logging.info("Creating ks sketches...")
+            ks_sketches = {
+                "precursor_rt": self.monoisotopic_precursors.rt_projection.to_quantile_sketch(
+                    ks_sketch_size
+                ),
+                "fragment_rt": self.fragments.rt_projection.to_quantile_sketch(
+                    ks_sketch_size
+                ),
+                "fragment_im": self.fragments.im_projection.to_quantile_sketch(
+                    ks_sketch_size
+                ),
+            }
+        else:
+            ks_sketches = None
+        with contextlib.ExitStack() as context_stack:
+            if max_memory is not None:
+                spill_file = context_stack.enter_context(
+                    alphasynchro.io.hdf.temporary(
+                        os.path.dirname(os.path.abspath(self.analysis_file.file_name))
+                    )
+                )
+            transitions_dict = {}
+            summed_precursor_intensities = np.empty(
+                (self.cycle.shape[1] - 1, len(self.monoisotopic_precursors))
             )
-        logging.info("Merging transitions...")
-        merged_transition_index = alphasynchro.ms.transitions.merged_transitions.MergedFrames.from_transition_dicts(
-            im_transition_dict=im_transitions_dict,
-            rt_transition_dict=rt_transitions_dict,
-            fragments=self.fragments,
-        )
-        del im_transitions_dict
-        del rt_transitions_dict
-        merged_transition_index = merged_transition_index.sort_mz()
-        merged_peak_transitions = merged_transition_index.count_all_merged_peaks()
-        fragment_pointers = merged_transition_index.index_peaks(merged_peak_transitions)
-        logging.info("Merging sliced fragments...")
-        merged_fragments = alphasynchro.ms.peaks.merged_fragments.MergedFragments.from_pointers(
-            fragment_pointers,
-            self.fragments,
-            merged_transition_index,
-            self.cycle.shape[1] - 1,
-        )
-        self.merged_fragments = merged_fragments
-        logging.info("Calculating sliced intensity profiles...")
-        size = self.cycle.shape[1] - 1
-        indptr = np.arange(len(self.monoisotopic_precursors) + 1) * size
-        values = np.empty(len(self.monoisotopic_precursors) * size)
-        for frame in range(size):
-            values[frame::size] = summed_precursor_intensities_dict[frame + 1]
-        slice_profile = alphasynchro.stats.distributions.PDF(
-            indptr=indptr,
-            values=values,
-        ).to_cdf()
-        del summed_precursor_intensities_dict
-        logging.info("Calculating ks-stats for intensity profiles...")
-        ks_tester = alphasynchro.stats.ks_1d.KSTester1DNoOffsetPairedMultithreaded(
-            cdf_with_offset=slice_profile,
-            secondary_cdf_with_offset=self.merged_fragments.frame_intensities,
-        )
-        precursor_indices = np.repeat(
-            np.arange(slice_profile.shape[0]),
-            np.diff(merged_peak_transitions),
-        )
-        fragment_indices = np.arange(merged_peak_transitions[-1])
-        paired_indices = np.vstack(
-            [
-                precursor_indices,
-                fragment_indices
-            ]
-        ).T
-        frame_weights = ks_tester.calculate_all(paired_indices)
-        logging.info("Filtering final transitions...")
-        transitions = alphasynchro.ms.transitions.frame_transitions.Transitions(
-            indptr=merged_peak_transitions,
-            values=np.arange(merged_peak_transitions[-1]),
-            weights=frame_weights,
-            precursor_indices=np.arange(len(merged_peak_transitions) - 1),
-        )
-        valid_fragments = frame_weights <= max_frame_weight
-        transitions = transitions.filter_weights(valid_fragments)
-        valid_precursors = np.flatnonzero(np.diff(transitions.indptr) >= 5)
-        self.transitions = transitions.filter(valid_precursors)
+            logging.info("Calculating frame transitions...")
+            for frame_index in range(1, self.cycle.shape[1]):
+                (
+                    summed_precursor_intensities[frame_index - 1],
+                    transitions_dict[frame_index],
+                ) = self.calculate_transitions_of_frame(
+                    frame_index=frame_index,
+                    unique_transitions_only=unique_transitions_only,
+                    max_im_weight=max_im_weight,
+                    max_rt_weight=max_rt_weight,
+                    min_peaks=min_peaks,
+                    slicer=slicer,
+                    transmissible_precursors=transmissibility_index.get_values(frame_index),
+                    prune_candidates=prune_candidates,
+                    quadrupole_tolerance=quadrupole_tolerance,
+                    ks_statistics=ks_statistics,
+                    ks_sketches=ks_sketches,
+                    approximate_ks=approximate_ks,
+                    max_memory=max_memory,
+                )
+                if alphasynchro.performance.memory.is_exceeded(max_memory):
+                    logging.info(
+                        f"Spilling transitions of frame {frame_index} to disk "
+                        f"to stay within {max_memory} Gb"
+                    )
+                    transitions_dict[frame_index] = spill_file.recursive_store(
+                        f"transitions_{frame_index}",
+                        transitions_dict[frame_index],
+                    )
+            logging.info("Merging transitions...")
+            merged_transition_index = alphasynchro.ms.transitions.merged_transitions.MergedFrames.from_transition_dicts(
+                transition_dict=transitions_dict,
+                fragments=self.fragments,
+            )
+            del transitions_dict
+            merged_transition_index = merged_transition_index.sort_mz()
+            merged_peak_transitions = merged_transition_index.count_all_merged_peaks()
+            fragment_pointers = merged_transition_index.index_peaks(merged_peak_transitions)
+            logging.info("Merging sliced fragments...")
+            merged_fragments = alphasynchro.ms.peaks.merged_fragments.MergedFragments.from_pointers(
+                fragment_pointers,
+                self.fragments,
+                merged_transition_index,
+                self.cycle.shape[1] - 1,
+            )
+            self.merged_fragments = merged_fragments
+            logging.info("Calculating sliced intensity profiles...")
+            slice_profile = alphasynchro.stats.distributions.FrameProfileBuilder(
+                frame_count=self.cycle.shape[1] - 1,
+            ).from_frame_values(summed_precursor_intensities)
+            del summed_precursor_intensities
+            logging.info("Calculating ks-stats for intensity profiles...")
+            ks_tester = alphasynchro.stats.ks_1d.KSTester1DNoOffsetPairedMultithreaded(
+                cdf_with_offset=slice_profile,
+                secondary_cdf_with_offset=self.merged_fragments.frame_intensities,
+                threshold=max_frame_weight,
+            )
+            if max_memory is None:
+                frame_weights = None
+            else:
+                frame_weights = self.create_frame_weights(
+                    merged_peak_transitions[-1],
+                    max_memory,
+                    spill_file,
+                )
+            frame_weights = ks_tester.calculate_all_of_indptr(
+                merged_peak_transitions,
+                ks_values=frame_weights,
+            )
+            logging.info("Filtering final transitions...")
+            transitions = alphasynchro.ms.transitions.frame_transitions.Transitions(
+                indptr=merged_peak_transitions,
+                values=np.arange(merged_peak_transitions[-1]),
+                weights=frame_weights,
+                precursor_indices=np.arange(len(merged_peak_transitions) - 1),
+            )
+            valid_fragments = frame_weights <= max_frame_weight
+            transitions = transitions.filter_weights(valid_fragments)
+            valid_precursors = np.flatnonzero(np.diff(transitions.indptr) >= 5)
+            self.transitions = transitions.filter(valid_precursors)
         logging.info("Finished calculating transitions and creating MS2 spectra")
 
+    def create_frame_weights(
+        self,
+        pair_count: int,
+        max_memory: float,
+        spill_file: alphasynchro.io.hdf.HDFObject,
+    ) -> np.ndarray:
+        if alphasynchro.performance.memory.get_available_memory(max_memory) < 8 * pair_count:
+            logging.info("Writing ks-stats of intensity profiles to disk")
+            return spill_file.create_mmap("frame_weights", (pair_count,))
+        return np.empty(pair_count)
+
+    @alphasynchro.performance.instrumentation.stage
     def calculate_transitions_of_frame(
         self,
         frame_index: int,
@@ -238,16 +387,29 @@ class Pipeline:
         max_rt_weight: float,
         min_peaks: int,
         slicer,
+        transmissible_precursors: np.ndarray = None,
+        prune_candidates: bool = False,
+        quadrupole_tolerance: float = 1.0,
+        ks_statistics: bool = False,
+        ks_sketches: dict = None,
+        approximate_ks: bool = False,
+        max_memory: float = None,
     ):
         logging.info(f"Calculating transitions for frame {frame_index}...")
-        logging.info("Calculating transmission efficiency...")
-        transmitted_precursor_im_profiles = slicer.calculate_all_transmitted_cdf_for_frame(frame_index)
-        summed_precursor_intensities = transmitted_precursor_im_profiles.summed_values
-        logging.info("Calculating im apices...")
-        apex_finder = alphasynchro.stats.apex_finder.SmoothApexFinder(
-            cdf=transmitted_precursor_im_profiles
+        logging.info("Calculating transmission efficiency and im apices...")
+        if transmissible_precursors is not None:
+            logging.info(
+                f"Slicing {len(transmissible_precursors)} of "
+                f"{len(self.monoisotopic_precursors)} precursors that can be transmitted"
+            )
+        (
+            transmitted_precursor_im_profiles,
+            im_apices,
+        ) = slicer.calculate_all_transmitted_cdf_and_apices_for_frame(
+            frame_index,
+            transmissible_precursors,
         )
-        im_apices = apex_finder.calculate_all()
+        summed_precursor_intensities = transmitted_precursor_im_profiles.summed_values
         logging.info("Indexing precusors...")
         indexed_precursors_for_frame = alphasynchro.ms.peaks.indexed.im_peaks.PushIndexedImPeaks.from_data_space(
             peaks=self.monoisotopic_precursors,
@@ -256,34 +418,114 @@ class Pipeline:
             tof_indptr=self.tof_indptr,
         )
         logging.info("Matching precursors with fragments...")
-        matcher = alphasynchro.algorithms.matching.matching.FragmentedMatcherMultithreaded(
-            indexed_precursors=indexed_precursors_for_frame,
-            indexed_fragments=self.indexed_fragments,
-            frame=frame_index,
-        )
-        precursor_fragment_pairs = matcher.match_all()
-        order = np.argsort(precursor_fragment_pairs[:, 0 ])
-        precursor_fragment_pairs = precursor_fragment_pairs[order]
-        logging.info("Calculating ks-stats for IM...")
-        paired_ks_tester_im = alphasynchro.stats.ks_1d.KSTester1DPairedMultithreaded(
-            cdf_with_offset=transmitted_precursor_im_profiles,
-            secondary_cdf_with_offset=self.fragments.im_projection,
-        )
-        im_weights = paired_ks_tester_im.calculate_all(precursor_fragment_pairs)
-        logging.info("Calculating ks-stats for RT...")
-        paired_ks_tester_rt = alphasynchro.stats.ks_1d.KSTester1DPairedMultithreaded(
-            cdf_with_offset=self.monoisotopic_precursors.rt_projection,
-            secondary_cdf_with_offset=self.fragments.rt_projection,
-        )
-        rt_weights = paired_ks_tester_rt.calculate_all(precursor_fragment_pairs)
-        logging.info("Filtering transitions...")
-        indptr = np.zeros(len(self.monoisotopic_precursors) + 1, dtype=np.int64)
-        indptr[1:] = np.cumsum(
-            np.bincount(
-                precursor_fragment_pairs[:, 0],
-                minlength=len(self.monoisotopic_precursors)
+        if prune_candidates:
+            matcher = alphasynchro.algorithms.matching.matching.PrunedFragmentedMatcherMultithreaded(
+                indexed_precursors=indexed_precursors_for_frame,
+                indexed_fragments=self.indexed_fragments,
+                frame=frame_index,
+                precursor_mz_values=self.monoisotopic_precursors.aggregate_data.mz_weighted_average,
+                precursor_charges=self.monoisotopic_precursors.aggregate_data.charge,
+                cycle=self.cycle,
+                quadrupole_tolerance=quadrupole_tolerance,
+            )
+        else:
+            matcher = alphasynchro.algorithms.matching.matching.FragmentedMatcherMultithreaded(
+                indexed_precursors=indexed_precursors_for_frame,
+                indexed_fragments=self.indexed_fragments,
+                frame=frame_index,
+            )
+        if prune_candidates:
+            pruned_counts = np.zeros(len(indexed_precursors_for_frame), dtype=np.int64)
+            match_counts = matcher.count_all(pruned_counts=pruned_counts)
+            pruned_count = np.sum(pruned_counts)
+            logging.info(
+                f"Pruned {pruned_count} of {pruned_count + np.sum(match_counts)} "
+                "precursor-fragment candidates"
+            )
+        else:
+            match_counts = matcher.count_all()
+        if unique_transitions_only:
+            im_threshold = 1.0
+            rt_threshold = 1.0
+        else:
+            im_threshold = max_im_weight
+            rt_threshold = max_rt_weight
+        if ks_sketches is None:
+            paired_ks_tester = alphasynchro.stats.ks_1d.KSTester1DFusedPairedBlockedMultithreaded(
+                first_ks_tester=alphasynchro.stats.ks_1d.KSTester1DPaired(
+                    cdf_with_offset=transmitted_precursor_im_profiles,
+                    secondary_cdf_with_offset=self.fragments.im_projection,
+                    threshold=im_threshold,
+                ),
+                second_ks_tester=alphasynchro.stats.ks_1d.KSTester1DPaired(
+                    cdf_with_offset=self.monoisotopic_precursors.rt_projection,
+                    secondary_cdf_with_offset=self.fragments.rt_projection,
+                    threshold=rt_threshold,
+                ),
+                first_threshold=im_threshold,
             )
+        else:
+            paired_ks_tester = alphasynchro.stats.ks_1d.KSTester1DFusedPairedMultithreaded(
+                first_ks_tester=alphasynchro.stats.ks_1d.KSTester1DSketchedPaired(
+                    cdf_with_offset=transmitted_precursor_im_profiles,
+                    secondary_cdf_with_offset=self.fragments.im_projection,
+                    threshold=im_threshold,
+                    sketch=transmitted_precursor_im_profiles.to_quantile_sketch(
+                        ks_sketches["fragment_im"].get_sketch_size()
+                    ),
+                    secondary_sketch=ks_sketches["fragment_im"],
+                    approximate=approximate_ks,
+                ),
+                second_ks_tester=alphasynchro.stats.ks_1d.KSTester1DSketchedPaired(
+                    cdf_with_offset=self.monoisotopic_precursors.rt_projection,
+                    secondary_cdf_with_offset=self.fragments.rt_projection,
+                    threshold=rt_threshold,
+                    sketch=ks_sketches["precursor_rt"],
+                    secondary_sketch=ks_sketches["fragment_rt"],
+                    approximate=approximate_ks,
+                ),
+                first_threshold=im_threshold,
+            )
+        push_blocks = alphasynchro.performance.memory.split_into_blocks(
+            match_counts,
+            alphasynchro.performance.memory.get_max_item_count(
+                PAIR_MEMORY_SIZE,
+                max_memory,
+                MIN_PAIR_BLOCK_SIZE,
+            ),
         )
+        if len(push_blocks) > 1:
+            logging.info(
+                f"Processing {np.sum(match_counts)} pairs in {len(push_blocks)} "
+                f"precursor blocks to stay within {max_memory} Gb"
+            )
+        blocks = [
+            self.calculate_pair_weights(
+                matcher=matcher,
+                match_counts=match_counts,
+                push_indices=push_indices,
+                paired_ks_tester=paired_ks_tester,
+                blocked_ks=ks_sketches is None,
+                ks_statistics=ks_statistics,
+                # unique transitions are only known once all pairs of a frame are tested
+                discard_rejected=(len(push_blocks) > 1) and not unique_transitions_only,
+                im_threshold=im_threshold,
+                rt_threshold=rt_threshold,
+            ) for push_indices in push_blocks
+        ]
+        if len(blocks) == 1:
+            precursor_fragment_pairs, indptr, im_weights, rt_weights = blocks[0]
+        else:
+            precursor_fragment_pairs = np.concatenate([block[0] for block in blocks])
+            im_weights = np.concatenate([block[2] for block in blocks])
+            rt_weights = np.concatenate([block[3] for block in blocks])
+            del blocks
+            order = np.argsort(precursor_fragment_pairs[:, 0], kind="stable")
+            precursor_fragment_pairs = precursor_fragment_pairs[order]
+            im_weights = im_weights[order]
+            rt_weights = rt_weights[order]
+            indptr = self.get_precursor_indptr(precursor_fragment_pairs)
+        logging.info("Filtering transitions...")
         transition_dummy = alphasynchro.data.sparse_indices.SparseIndex(
             indptr=indptr,
             values=np.arange(precursor_fragment_pairs.shape[0]),
@@ -306,25 +548,85 @@ class Pipeline:
         transition_dummy = transition_dummy.filter_values(valid_indices)
         valid_precursors = np.flatnonzero(np.diff(transition_dummy.indptr) >= min_peaks)
         transition_dummy = transition_dummy.filter(valid_precursors)
-        valid_fragments = precursor_fragment_pairs[transition_dummy.values, 1]
-        im_transitions = alphasynchro.ms.transitions.frame_transitions.Transitions(
-            indptr=transition_dummy.indptr,
-            values=valid_fragments,
-            weights=im_weights[transition_dummy.values],
-            precursor_indices=valid_precursors,
-        )
-        rt_transitions = alphasynchro.ms.transitions.frame_transitions.Transitions(
+        transitions = alphasynchro.ms.transitions.frame_transitions.Transitions(
             indptr=transition_dummy.indptr,
-            values=valid_fragments,
-            weights=im_weights[transition_dummy.values],
+            values=precursor_fragment_pairs[transition_dummy.values, 1],
+            weights=alphasynchro.ms.transitions.frame_transitions.combine_weights(
+                rt_weights[transition_dummy.values],
+                im_weights[transition_dummy.values],
+            ),
             precursor_indices=valid_precursors,
         )
         return (
             summed_precursor_intensities,
-            im_transitions,
-            rt_transitions,
+            transitions,
+        )
+
+    def get_precursor_indptr(
+        self,
+        precursor_fragment_pairs: np.ndarray,
+    ) -> np.ndarray:
+        indptr = np.zeros(len(self.monoisotopic_precursors) + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum(
+            np.bincount(
+                precursor_fragment_pairs[:, 0],
+                minlength=len(self.monoisotopic_precursors)
+            )
         )
+        return indptr
+
+    def calculate_pair_weights(
+        self,
+        matcher,
+        match_counts: np.ndarray,
+        push_indices: np.ndarray,
+        paired_ks_tester,
+        blocked_ks: bool,
+        ks_statistics: bool,
+        discard_rejected: bool,
+        im_threshold: float,
+        rt_threshold: float,
+    ) -> tuple[np.ndarray]:
+        if push_indices is not None:
+            block_match_counts = np.zeros_like(match_counts)
+            block_match_counts[push_indices] = match_counts[push_indices]
+            match_counts = block_match_counts
+        precursor_fragment_pairs = matcher.match_all(match_counts, push_indices)
+        order = np.argsort(precursor_fragment_pairs[:, 0], kind="stable")
+        precursor_fragment_pairs = precursor_fragment_pairs[order]
+        indptr = self.get_precursor_indptr(precursor_fragment_pairs)
+        logging.info("Calculating ks-stats for IM and RT...")
+        if ks_statistics:
+            (
+                im_weights,
+                rt_weights,
+                im_statistics,
+                rt_statistics,
+            ) = paired_ks_tester.calculate_all_with_statistics(precursor_fragment_pairs)
+            for name, statistics in [("IM", im_statistics), ("RT", rt_statistics)]:
+                logging.info(
+                    f"{name} ks-stats rejected {statistics['rejected_count']} "
+                    f"of {statistics['pair_count']} pairs and scanned "
+                    f"{statistics['scanned_size']} of {statistics['overlap_size']} "
+                    f"overlapping bins ({statistics['avoided_fraction']:.1%} avoided)"
+                )
+        elif blocked_ks:
+            im_weights, rt_weights = paired_ks_tester.calculate_all(
+                precursor_fragment_pairs,
+                indptr,
+            )
+        else:
+            im_weights, rt_weights = paired_ks_tester.calculate_all(
+                precursor_fragment_pairs,
+            )
+        if discard_rejected:
+            valid_indices = (im_weights <= im_threshold) & (rt_weights <= rt_threshold)
+            precursor_fragment_pairs = precursor_fragment_pairs[valid_indices]
+            im_weights = im_weights[valid_indices]
+            rt_weights = rt_weights[valid_indices]
+        return precursor_fragment_pairs, indptr, im_weights, rt_weights
 
+    @alphasynchro.performance.instrumentation.stage
     def write_ms2_spectra(
         self,
         output_file_name,
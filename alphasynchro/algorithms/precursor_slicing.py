@@ -6,9 +6,12 @@ import numpy as np
 
 # local
 import alphasynchro.performance.compiling
+import alphasynchro.performance.multithreading
+import alphasynchro.data.sparse_indices
 import alphasynchro.ms.peaks.precursors
 import alphasynchro.algorithms.calibration
 import alphasynchro.stats.distributions
+import alphasynchro.stats.apex_finder
 
 
 @alphasynchro.performance.compiling.njit_dataclass
@@ -19,6 +22,7 @@ class SlicedIMDistribution:
     cycle_center: np.ndarray
     cycle: np.ndarray
     diapasef: bool
+    cdf_dtype: str = "float64"
 
     @alphasynchro.performance.compiling.njit(nogil=True)
     def get_transmitted_projection_cdf(
@@ -55,25 +59,35 @@ class SlicedIMDistribution:
         self,
         index: int,
         frame: int,
+    ) -> np.ndarray:
+        return self.get_efficiency_from_scans(
+            index,
+            self.cycle_center[frame],
+            self.cycle[0, frame],
+        )
+
+    @alphasynchro.performance.compiling.njit(nogil=True)
+    def get_efficiency_from_scans(
+        self,
+        index: int,
+        scan_centers: np.ndarray,
+        scan_borders: np.ndarray,
     ) -> np.ndarray:
         precursor_mz = self.precursors.aggregate_data.mz_weighted_average[index]
         start_offset = self.precursors.im_projection.get_start_offset(index)
         end_offset = self.precursors.im_projection.get_end_offset(index)
-        result_buffer = np.copy(self.cycle_center[frame, start_offset: end_offset])
         if self.diapasef:
-            borders = np.copy(self.cycle[0, frame, start_offset: end_offset])
-            for buffer_index, (start, end) in enumerate(borders):
+            efficiency = np.zeros(end_offset - start_offset)
+            for buffer_index, (start, end) in enumerate(
+                scan_borders[start_offset: end_offset]
+            ):
                 if start <= precursor_mz <= end:
-                    result_buffer[buffer_index] = 1
-                else:
-                    result_buffer[buffer_index] = 0
+                    efficiency[buffer_index] = 1
         else:
-            for buffer_index, mz in enumerate(result_buffer):
-                mz_difference = mz - precursor_mz
-                result_buffer[buffer_index] = self.calibration.get_efficiency(
-                    mz_difference
-                )
-        return result_buffer
+            efficiency = self.calibration.get_efficiencies(
+                scan_centers[start_offset: end_offset] - precursor_mz
+            )
+        return efficiency
 
 
 @alphasynchro.performance.compiling.njit_dataclass
@@ -81,25 +95,75 @@ class SlicedIMDistributionMultithreaded(SlicedIMDistribution):
 
     def calculate_all_transmitted_cdf_for_frame(
         self,
-        frame: int
-    ) -> np.ndarray[float]:
-        new_values = np.empty(len(self.precursors.im_projection.values))
-        summed_values = np.empty(len(self.precursors))
+        frame: int,
+        precursor_indices: np.ndarray = None,
+    ) -> alphasynchro.stats.distributions.CDFWithOffsetAndSummedValues:
+        im_projection, _ = self.calculate_all_for_frame(
+            frame,
+            precursor_indices,
+            smooth_array=np.empty(0),
+        )
+        return im_projection
+
+    def calculate_all_transmitted_cdf_and_apices_for_frame(
+        self,
+        frame: int,
+        precursor_indices: np.ndarray = None,
+        smooth_sigma: int = 5,
+    ) -> tuple[alphasynchro.stats.distributions.CDFWithOffsetAndSummedValues, np.ndarray]:
+        return self.calculate_all_for_frame(
+            frame,
+            precursor_indices,
+            smooth_array=alphasynchro.stats.apex_finder.get_smooth_array(
+                smooth_sigma
+            ),
+        )
+
+    def calculate_all_for_frame(
+        self,
+        frame: int,
+        precursor_indices: np.ndarray,
+        smooth_array: np.ndarray,
+    ) -> tuple[alphasynchro.stats.distributions.CDFWithOffsetAndSummedValues, np.ndarray]:
+        if precursor_indices is None:
+            precursor_indices = range(len(self.precursors))
+            buffer_function = np.empty
+        else:
+            buffer_function = np.zeros
+        new_values = buffer_function(
+            len(self.precursors.im_projection.values),
+            dtype=self.cdf_dtype,
+        )
+        value_scale = alphasynchro.stats.distributions.get_value_scale(
+            self.cdf_dtype
+        )
+        summed_values = buffer_function(len(self.precursors))
+        if len(smooth_array) > 0:
+            apices = np.full(len(self.precursors), -1, dtype=np.int64)
+        else:
+            apices = np.empty(0, dtype=np.int64)
+        scan_centers = np.ascontiguousarray(self.cycle_center[frame])
+        scan_borders = np.ascontiguousarray(self.cycle[0, frame])
         alphasynchro.performance.multithreading.parallel(
             self.calculate_from_buffers
         )(
-            range(len(self.precursors)),
+            precursor_indices,
             new_values,
             summed_values,
-            frame,
+            apices,
+            scan_centers,
+            scan_borders,
+            value_scale,
+            smooth_array,
         )
         im_projection = alphasynchro.stats.distributions.CDFWithOffsetAndSummedValues(
             indptr=self.precursors.im_projection.indptr,
             values=new_values,
             start_offsets=self.precursors.im_projection.start_offsets,
             summed_values=summed_values,
+            value_scale=value_scale,
         )
-        return im_projection
+        return im_projection, apices
 
     @alphasynchro.performance.compiling.njit(nogil=True)
     def calculate_from_buffers(
@@ -107,11 +171,94 @@ class SlicedIMDistributionMultithreaded(SlicedIMDistribution):
         index: int,
         cdf_values: np.ndarray,
         summed_values: np.ndarray,
-        frame: int,
+        apices: np.ndarray,
+        scan_centers: np.ndarray,
+        scan_borders: np.ndarray,
+        value_scale: float,
+        smooth_array: np.ndarray,
     ) -> None:
-        cdf = self.multiply(index, frame)
-        cdf = np.cumsum(cdf)
-        summed_values[index] = cdf[-1]
-        cdf = self.normalize_cdf(cdf)
+        efficiency = self.get_efficiency_from_scans(
+            index,
+            scan_centers,
+            scan_borders,
+        )
+        precursor_cdf = self.precursors.im_projection.get_cdf(index)
+        precursor_value_scale = self.precursors.im_projection.value_scale
+        cdf = np.empty(len(precursor_cdf))
+        summed_value = 0.
+        for cdf_index in range(len(precursor_cdf)):
+            if cdf_index == 0:
+                probability = precursor_cdf[0]
+            else:
+                probability = precursor_cdf[cdf_index] - precursor_cdf[cdf_index - 1]
+            if precursor_value_scale != 1:
+                probability *= precursor_value_scale
+            summed_value += efficiency[cdf_index] * probability
+            cdf[cdf_index] = summed_value
+        summed_values[index] = summed_value
         start, end = self.precursors.im_projection.get_boundaries(index)
-        cdf_values[start: end] = self.normalize_cdf(cdf)
+        alphasynchro.stats.distributions.encode_cdf_values(
+            self.normalize_cdf(cdf),
+            cdf_values[start: end],
+            value_scale,
+        )
+        if (len(smooth_array) > 0) and (summed_value > 0):
+            distribution = alphasynchro.stats.distributions.get_pdf_from_cdf_values(
+                cdf_values[start: end],
+                value_scale,
+            )
+            apices[index] = alphasynchro.stats.apex_finder.find_smooth_apex(
+                distribution,
+                smooth_array,
+            ) + self.precursors.im_projection.get_start_offset(index)
+
+    def create_transmissibility_index(
+        self
+    ) -> alphasynchro.data.sparse_indices.SparseIndex:
+        frame_count = self.cycle.shape[1]
+        is_transmissible = np.zeros(
+            (frame_count, len(self.precursors)),
+            dtype=np.bool_,
+        )
+        lower_bound, upper_bound = self.calibration.get_transmission_bounds()
+        alphasynchro.performance.multithreading.parallel(
+            self.set_transmissibility_from_buffers
+        )(
+            range(len(self.precursors)),
+            is_transmissible,
+            lower_bound,
+            upper_bound,
+        )
+        frames, precursor_indices = np.nonzero(is_transmissible)
+        indptr = np.zeros(frame_count + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum(np.bincount(frames, minlength=frame_count))
+        return alphasynchro.data.sparse_indices.SparseIndex(
+            indptr=indptr,
+            values=precursor_indices,
+        )
+
+    @alphasynchro.performance.compiling.njit(nogil=True)
+    def set_transmissibility_from_buffers(
+        self,
+        index: int,
+        is_transmissible: np.ndarray,
+        lower_bound: float,
+        upper_bound: float,
+    ) -> None:
+        precursor_mz = self.precursors.aggregate_data.mz_weighted_average[index]
+        start_offset = self.precursors.im_projection.get_start_offset(index)
+        end_offset = self.precursors.im_projection.get_end_offset(index)
+        if start_offset == end_offset:
+            return
+        for frame in range(is_transmissible.shape[0]):
+            if self.diapasef:
+                borders = self.cycle[0, frame, start_offset: end_offset]
+                is_transmissible[frame, index] = (
+                    np.min(borders[:, 0]) <= precursor_mz <= np.max(borders[:, 1])
+                )
+            else:
+                scan_centers = self.cycle_center[frame, start_offset: end_offset]
+                is_transmissible[frame, index] = (
+                    (np.max(scan_centers) - precursor_mz >= lower_bound)
+                    and (np.min(scan_centers) - precursor_mz <= upper_bound)
+                )
@@ -0,0 +1,194 @@
+#!python
+'''Module to benchmark how parallel kernels scale with the number of threads.'''
+
+
+# builtin
+import logging
+import os
+import tempfile
+import time
+
+# local
+import alphasynchro.algorithms.pipeline
+import alphasynchro.algorithms.precursor_slicing
+import alphasynchro.algorithms.matching.matching
+import alphasynchro.ms.peaks.indexed.im_peaks
+import alphasynchro.ms.transitions.frame_transitions
+import alphasynchro.ms.transitions.merged_transitions
+import alphasynchro.performance.multithreading
+import alphasynchro.stats.ks_1d
+
+# external
+import numpy as np
+
+
+def get_thread_counts(max_thread_count: int) -> list[int]:
+    thread_counts = []
+    thread_count = 1
+    while thread_count < max_thread_count:
+        thread_counts.append(thread_count)
+        thread_count *= 2
+    thread_counts.append(max_thread_count)
+    return thread_counts
+
+
+def time_kernel(
+    kernel: callable,
+    thread_counts: list[int],
+    repeats: int = 3,
+) -> dict[int: float]:
+    elapsed_times = {}
+    for thread_count in thread_counts:
+        alphasynchro.performance.multithreading.set_threads(thread_count)
+        kernel()
+        elapsed_time = np.inf
+        for _ in range(repeats):
+            start_time = time.perf_counter()
+            kernel()
+            elapsed_time = min(elapsed_time, time.perf_counter() - start_time)
+        elapsed_times[thread_count] = elapsed_time
+    return elapsed_times
+
+
+def create_kernels(
+    pipeline: alphasynchro.algorithms.pipeline.Pipeline,
+    frame: int,
+) -> dict[str: callable]:
+    slicer = alphasynchro.algorithms.precursor_slicing.SlicedIMDistributionMultithreaded(
+        precursors=pipeline.monoisotopic_precursors,
+        calibration=pipeline.transmission_calibrator,
+        cycle_center=(np.sum(pipeline.cycle, axis=-1) / 2)[0],
+        cycle=pipeline.cycle,
+        diapasef=False,
+    )
+    transmissible_precursors = slicer.create_transmissibility_index().get_values(frame)
+    (
+        transmitted_precursor_im_profiles,
+        im_apices,
+    ) = slicer.calculate_all_transmitted_cdf_and_apices_for_frame(
+        frame,
+        transmissible_precursors,
+    )
+    matcher = alphasynchro.algorithms.matching.matching.FragmentedMatcherMultithreaded(
+        indexed_precursors=alphasynchro.ms.peaks.indexed.im_peaks.PushIndexedImPeaks.from_data_space(
+            peaks=pipeline.monoisotopic_precursors,
+            im_apices=im_apices,
+            cycle_shape=pipeline.cycle.shape,
+            tof_indptr=pipeline.tof_indptr,
+        ),
+        indexed_fragments=pipeline.indexed_fragments,
+        frame=frame,
+    )
+    match_counts = matcher.count_all()
+    precursor_fragment_pairs = matcher.match_all(match_counts)
+    precursor_fragment_pairs = precursor_fragment_pairs[
+        np.argsort(precursor_fragment_pairs[:, 0])
+    ]
+    indptr = np.zeros(len(pipeline.monoisotopic_precursors) + 1, dtype=np.int64)
+    indptr[1:] = np.cumsum(
+        np.bincount(
+            precursor_fragment_pairs[:, 0],
+            minlength=len(pipeline.monoisotopic_precursors),
+        )
+    )
+    paired_ks_tester = alphasynchro.stats.ks_1d.KSTester1DFusedPairedBlockedMultithreaded(
+        first_ks_tester=alphasynchro.stats.ks_1d.KSTester1DPaired(
+            cdf_with_offset=transmitted_precursor_im_profiles,
+            secondary_cdf_with_offset=pipeline.fragments.im_projection,
+            threshold=1.0,
+        ),
+        second_ks_tester=alphasynchro.stats.ks_1d.KSTester1DPaired(
+            cdf_with_offset=pipeline.monoisotopic_precursors.rt_projection,
+            secondary_cdf_with_offset=pipeline.fragments.rt_projection,
+            threshold=1.0,
+        ),
+        first_threshold=1.0,
+    )
+    im_weights, rt_weights = paired_ks_tester.calculate_all(
+        precursor_fragment_pairs,
+        indptr,
+    )
+    transitions = alphasynchro.ms.transitions.frame_transitions.Transitions(
+        indptr=indptr,
+        values=precursor_fragment_pairs[:, 1],
+        weights=im_weights,
+        precursor_indices=np.arange(len(indptr) - 1),
+    )
+    merged_frames = alphasynchro.ms.transitions.merged_transitions.MergedFrames(
+        indptr=indptr,
+        values=precursor_fragment_pairs[:, 1],
+        weights=alphasynchro.ms.transitions.frame_transitions.combine_weights(
+            rt_weights,
+            im_weights,
+        ),
+        fragments=pipeline.fragments,
+    )
+    valid_precursors = np.flatnonzero(np.diff(indptr) > 0)
+    return {
+        "slicing": lambda: slicer.calculate_all_transmitted_cdf_and_apices_for_frame(
+            frame,
+            transmissible_precursors,
+        ),
+        "matcher count": lambda: matcher.count_all(),
+        "matcher fill": lambda: matcher.match_all(match_counts),
+        "ks paired": lambda: paired_ks_tester.calculate_all(
+            precursor_fragment_pairs,
+            indptr,
+        ),
+        "transitions filter": lambda: transitions.filter(valid_precursors),
+        "merged frames sort mz": lambda: merged_frames.sort_mz(),
+    }
+
+
+def benchmark_scaling(
+    cluster_file_name: str,
+    max_thread_count: int = None,
+    frame: int = 1,
+    repeats: int = 3,
+    sampled_cycle_count: int = 0,
+) -> dict[str: dict[int: float]]:
+    if max_thread_count is None:
+        max_thread_count = alphasynchro.performance.multithreading.MAX_THREADS
+    max_thread_count = alphasynchro.performance.multithreading.set_threads(
+        max_thread_count,
+        set_global=False,
+    )
+    thread_counts = get_thread_counts(max_thread_count)
+    original_thread_count = alphasynchro.performance.multithreading.MAX_THREADS
+    with tempfile.TemporaryDirectory() as temp_dir_name:
+        pipeline = alphasynchro.algorithms.pipeline.Pipeline(
+            os.path.join(temp_dir_name, "analysis.hdf"),
+            overwrite=True,
+        )
+        pipeline.load_data_space(cluster_file_name)
+        pipeline.load_peaks(cluster_file_name)
+        pipeline.calibrate(sampled_cycle_count=sampled_cycle_count)
+        logging.info(f"Preparing kernels for frame {frame}...")
+        kernels = create_kernels(pipeline, frame)
+        elapsed_times = {}
+        try:
+            for name, kernel in kernels.items():
+                logging.info(f"Benchmarking {name} with {thread_counts} threads...")
+                elapsed_times[name] = time_kernel(kernel, thread_counts, repeats)
+        finally:
+            alphasynchro.performance.multithreading.set_threads(
+                original_thread_count
+            )
+    show_scaling(elapsed_times)
+    return elapsed_times
+
+
+def show_scaling(elapsed_times: dict[str: dict[int: float]]) -> None:
+    logging.info("Scaling of parallel kernels:")
+    logging.info(
+        f"{'kernel':>24} {'threads':>8} {'time (s)':>10} "
+        f"{'speedup':>8} {'efficiency':>10}"
+    )
+    for name, kernel_times in elapsed_times.items():
+        single_thread_time = kernel_times[min(kernel_times)]
+        for thread_count, elapsed_time in kernel_times.items():
+            speedup = single_thread_time / elapsed_time
+            logging.info(
+                f"{name:>24} {thread_count:>8} {elapsed_time:>10.4f} "
+                f"{speedup:>8.2f} {speedup / thread_count:>10.1%}"
+            )
@@ -100,6 +100,80 @@ def gui() -> None:
     help="Use regular diapasef rather than synchropasef.",
     show_default=True,
 )
+@click.option(
+    "--prune_candidates",
+    is_flag=True,
+    default=False,
+    help="Discard precursor-fragment candidates that are impossible by mz, charge or quadrupole window before ks-testing.",
+    show_default=True,
+)
+@click.option(
+    "--quadrupole_tolerance",
+    type=float,
+    default=1.0,
+    help="Mz margin around the quadrupole window within which precursors are considered transmitted when pruning candidates (a negative value disables this check).",
+    show_default=True,
+)
+@click.option(
+    "--cdf_dtype",
+    type=click.Choice(["float64", "float32", "uint16"]),
+    default="float64",
+    help="Storage type of rt/im cdfs. Compact types reduce memory traffic of ks-tests, changing ks-distances by at most 2**-23 (float32) or 1/65535 (uint16).",
+    show_default=True,
+)
+@click.option(
+    "--ks_sketch_size",
+    type=int,
+    default=0,
+    help="Screen ks-tests with quantile sketches of this size first, only comparing full cdfs of pairs that are not rejected by the sketch (0 disables sketches).",
+    show_default=True,
+)
+@click.option(
+    "--approximate_ks",
+    is_flag=True,
+    default=False,
+    help="Use sketched ks-distances, accurate up to 1/ks_sketch_size, for pairs that are clearly below thresholds.",
+    show_default=True,
+)
+@click.option(
+    "--calibration_file",
+    type=click.Path(exists=False, file_okay=True, dir_okay=False),
+    default=None,
+    help="A quadrupole calibration file. If it exists, it is used instead of calibrating, otherwise the calibration of this sample is saved to it.",
+)
+@click.option(
+    "--calibration_drift_tolerance",
+    type=float,
+    default=None,
+    help="Still calibrate when a calibration file exists, and only refresh it if efficiencies differ by more than this tolerance.",
+)
+@click.option(
+    "--sampled_cycle_count",
+    type=int,
+    default=0,
+    help="Only match unfragmented precursors of this many evenly spaced cycles to calibrate the quadrupole (0 uses all cycles).",
+    show_default=True,
+)
+@click.option(
+    "--max_memory",
+    type=float,
+    default=None,
+    help="Memory budget in Gb. Precursor-fragment pairs are matched and ks-tested in blocks that fit in it and frame transitions are spilled to disk once it is exceeded.",
+)
+@click.option(
+    "--profile_kernels",
+    is_flag=True,
+    default=False,
+    help="Count calls and cpu cycles of all compiled methods and time each thread of parallel calls, reported in the log and the json report.",
+    show_default=True,
+)
+@click.option(
+    "--profile_sample_interval",
+    type=int,
+    default=1000,
+    help="Add every Nth call of each compiled method to a histogram of its cpu cycles (0 disables histograms).",
+    show_default=True,
+)
 def create_spectra(
     analysis_file_name: str,
     cluster_file_name: str,
@@ -110,12 +184,26 @@ def create_spectra(
     unique_transitions_only: bool,
     min_fragment_size: int,
     diapasef: bool,
+    prune_candidates: bool,
+    quadrupole_tolerance: float,
+    cdf_dtype: str,
+    ks_sketch_size: int,
+    approximate_ks: bool,
+    calibration_file: str,
+    calibration_drift_tolerance: float,
+    sampled_cycle_count: int,
+    max_memory: float,
+    profile_kernels: bool,
+    profile_sample_interval: int,
 ) -> None:
     import alphasynchro.algorithms.pipeline
     import alphasynchro.performance.multithreading
+    import alphasynchro.performance.profiling
     alphasynchro.io.logging.show_platform_info()
     alphasynchro.io.logging.show_python_info()
     alphasynchro.performance.multithreading.set_threads(threads)
+    if profile_kernels:
+        alphasynchro.performance.profiling.enable(profile_sample_interval)
     pipeline = alphasynchro.algorithms.pipeline.Pipeline(
         analysis_file_name,
         overwrite=True
@@ -128,6 +216,15 @@ def create_spectra(
         unique_transitions_only=unique_transitions_only,
         min_fragment_size=min_fragment_size,
         diapasef=diapasef,
+        prune_candidates=prune_candidates,
+        quadrupole_tolerance=quadrupole_tolerance,
+        cdf_dtype=cdf_dtype,
+        ks_sketch_size=ks_sketch_size,
+        approximate_ks=approximate_ks,
+        calibration_file=calibration_file,
+        calibration_drift_tolerance=calibration_drift_tolerance,
+        sampled_cycle_count=sampled_cycle_count,
+        max_memory=max_memory,
     )
 
 @run.command(
@@ -159,5 +256,71 @@ def write_mgf(
     pipeline.write_ms2_spectra(spectra_file_name)
 
 
+@run.group(
+    "benchmark",
+    help="Benchmark the performance of alphasynchro.",
+)
+def benchmark() -> None:
+    pass
+
+
+@benchmark.command(
+    "scaling",
+    help="Time the parallel kernels of a single frame with 1, 2, 4, ... threads and report speedup and efficiency.",
+    no_args_is_help=True,
+)
+@click.option(
+    "--cluster_file_name",
+    type=click.Path(exists=True, file_okay=True, dir_okay=False),
+    required=True,
+    help="A peakpicker preprocessed .hdf file.",
+)
+@click.option(
+    "--threads",
+    type=int,
+    default=31,
+    help="Maximum number of threads (negative is how many to leave available, 0 means all)",
+    show_default=True,
+)
+@click.option(
+    "--frame",
+    type=int,
+    default=1,
+    help="The frame (group) whose kernels are benchmarked.",
+    show_default=True,
+)
+@click.option(
+    "--repeats",
+    type=int,
+    default=3,
+    help="The number of repeats per thread count, of which the fastest is reported.",
+    show_default=True,
+)
+@click.option(
+    "--sampled_cycle_count",
+    type=int,
+    default=0,
+    help="Only match unfragmented precursors of this many evenly spaced cycles to calibrate the quadrupole (0 uses all cycles).",
+    show_default=True,
+)
+def scaling(
+    cluster_file_name: str,
+    threads: int,
+    frame: int,
+    repeats: int,
+    sampled_cycle_count: int,
+) -> None:
+    import alphasynchro.algorithms.scaling
+    alphasynchro.io.logging.show_platform_info()
+    alphasynchro.io.logging.show_python_info()
+    alphasynchro.algorithms.scaling.benchmark_scaling(
+        cluster_file_name,
+        max_thread_count=threads,
+        frame=frame,
+        repeats=repeats,
+        sampled_cycle_count=sampled_cycle_count,
+    )
+
+
 if __name__ == "__main__":
     run()
@@ -29,14 +29,21 @@ def read_mmap(
         return _read_mmap(array, file_name)
 
 
-def _read_mmap(array, file_name):
+def _read_mmap(array, file_name, writable=False):
     offset = array.id.get_offset()
     shape = array.shape
-    with open(file_name, "rb") as raw_hdf_file:
+    if offset is None:
+        # hdf does not allocate storage for empty datasets
+        return np.empty(shape, dtype=array.dtype)
+    if writable:
+        file_mode, access = "r+b", mmap.ACCESS_WRITE
+    else:
+        file_mode, access = "rb", mmap.ACCESS_READ
+    with open(file_name, file_mode) as raw_hdf_file:
         mmap_obj = mmap.mmap(
             raw_hdf_file.fileno(),
             0,
-            access=mmap.ACCESS_READ
+            access=access
         )
         return np.frombuffer(
             mmap_obj,
@@ -64,6 +71,35 @@ def write_mmap(
     )
 
 
+def create_empty_mmap(
+    *,
+    file_name: str,
+    group_name: str,
+    mmap_name: str,
+    shape: tuple,
+    dtype: np.dtype,
+) -> np.ndarray:
+    with get_or_create_group_from_hdf(file_name, group_name) as group:
+        if mmap_name in group:
+            del group[mmap_name]
+        # storage is allocated upfront so the dataset can be mmapped before it is written
+        dataset_properties = h5py.h5p.create(h5py.h5p.DATASET_CREATE)
+        dataset_properties.set_alloc_time(h5py.h5d.ALLOC_TIME_EARLY)
+        h5py.h5d.create(
+            group.id,
+            mmap_name.encode(),
+            h5py.h5t.py_create(np.dtype(dtype)),
+            h5py.h5s.create_simple(tuple(shape)),
+            dcpl=dataset_properties,
+        )
+    with h5py.File(file_name, "r") as hdf_file:
+        return _read_mmap(
+            hdf_file[f"{group_name}/{mmap_name}"],
+            file_name,
+            writable=True,
+        )
+
+
 def read_attr(
     *,
     file_name: str,
@@ -191,6 +227,24 @@ class HDFObject:
             self.arrays[mmap_name] = mmap_value
         return mmap_value
 
+    def create_mmap(
+        self,
+        mmap_name: str,
+        shape: tuple,
+        dtype: np.dtype = np.float64,
+    ) -> np.ndarray:
+        mmap_value = create_empty_mmap(
+            file_name=self.file_name,
+            group_name=self.group_name,
+            mmap_name=mmap_name,
+            shape=shape,
+            dtype=dtype,
+        )
+        object.__setattr__(self, mmap_name, mmap_value)
+        if mmap_name not in self.arrays:
+            self.arrays[mmap_name] = mmap_value
+        return mmap_value
+
     def set_group(self, group_name: str):
         full_group_name = f"{self.group_name}{group_name}"
         with get_or_create_group_from_hdf(
@@ -27,3 +27,88 @@ def match_mz_arrays(
                 yield index1, index2
         else:
             break
+
+
+@alphasynchro.performance.compiling.njit(nogil=True)
+def get_mz_window_factors(
+    ppm_tolerance: float = 50.0
+) -> tuple[float, float]:
+    relative_tolerance = ppm_tolerance * 10**-6 / 2
+    lower_factor = (1 - relative_tolerance) / (1 + relative_tolerance)
+    upper_factor = (1 + relative_tolerance) / (1 - relative_tolerance)
+    return lower_factor, upper_factor
+
+
+@alphasynchro.performance.compiling.njit(nogil=True)
+def get_mz_window_bounds(
+    mz_values1: np.ndarray,
+    mz_values2: np.ndarray,
+    ppm_tolerance: float = 50.0
+) -> tuple[np.ndarray, np.ndarray]:
+    lower_factor, upper_factor = get_mz_window_factors(ppm_tolerance)
+    lower_bounds = np.searchsorted(mz_values2, mz_values1 * lower_factor, "left")
+    upper_bounds = np.searchsorted(mz_values2, mz_values1 * upper_factor, "right")
+    return lower_bounds, upper_bounds
+
+
+@alphasynchro.performance.compiling.njit(nogil=True)
+def count_mz_array_matches(
+    mz_values1: np.ndarray,
+    mz_values2: np.ndarray,
+    ppm_tolerance: float = 50.0
+) -> int:
+    if (len(mz_values1) == 0) or (len(mz_values2) == 0):
+        return 0
+    lower_bounds, upper_bounds = get_mz_window_bounds(
+        mz_values1,
+        mz_values2,
+        ppm_tolerance,
+    )
+    return np.sum(upper_bounds - lower_bounds)
+
+
+@alphasynchro.performance.compiling.njit(nogil=True)
+def fill_mz_array_matches(
+    mz_values1: np.ndarray,
+    mz_values2: np.ndarray,
+    ppm_tolerance: float,
+    matches: np.ndarray,
+    offset: int,
+    index_offset1: int = 0,
+    index_offset2: int = 0,
+) -> int:
+    if (len(mz_values1) == 0) or (len(mz_values2) == 0):
+        return offset
+    lower_bounds, upper_bounds = get_mz_window_bounds(
+        mz_values1,
+        mz_values2,
+        ppm_tolerance,
+    )
+    for index1 in range(len(mz_values1)):
+        for index2 in range(lower_bounds[index1], upper_bounds[index1]):
+            matches[offset, 0] = index_offset1 + index1
+            matches[offset, 1] = index_offset2 + index2
+            offset += 1
+    return offset
+
+
+@alphasynchro.performance.compiling.njit(nogil=True)
+def match_mz_arrays_batched(
+    mz_values1: np.ndarray,
+    mz_values2: np.ndarray,
+    ppm_tolerance: float = 50.0
+) -> np.ndarray:
+    match_count = count_mz_array_matches(
+        mz_values1,
+        mz_values2,
+        ppm_tolerance,
+    )
+    matches = np.empty((match_count, 2), dtype=np.int64)
+    fill_mz_array_matches(
+        mz_values1,
+        mz_values2,
+        ppm_tolerance,
+        matches,
+        0,
+    )
+    return matches
@@ -21,8 +21,7 @@ class MergedFragments:
 
     fragment_pointers: alphasynchro.data.sparse_indices.SparseIndex
     frame_intensities: alphasynchro.stats.distributions.CDF
-    rt_weights: alphasynchro.data.sparse_indices.SparseIndex
-    im_weights: alphasynchro.data.sparse_indices.SparseIndex
+    weights: alphasynchro.data.sparse_indices.SparseIndex
     aggregate_data: alphasynchro.data.dataframe.DataFrame
 
     @classmethod
@@ -33,13 +32,9 @@ class MergedFragments:
         merged_transition_index: alphasynchro.ms.transitions.merged_transitions.MergedFrames,
         fragment_frame_count: int,
     ):
-        rt_weights = alphasynchro.data.sparse_indices.SparseIndex(
+        weights = alphasynchro.data.sparse_indices.SparseIndex(
             indptr=fragment_pointers.indptr,
-            values=merged_transition_index.rt_weights,
-        )
-        im_weights = alphasynchro.data.sparse_indices.SparseIndex(
-            indptr=fragment_pointers.indptr,
-            values=merged_transition_index.im_weights,
+            values=merged_transition_index.weights,
         )
         frame_intensities = FrameIntensitiesCalculator(
             fragments=fragments,
@@ -53,8 +48,7 @@ class MergedFragments:
         return cls(
             fragment_pointers=fragment_pointers,
             frame_intensities=frame_intensities,
-            rt_weights=rt_weights,
-            im_weights=im_weights,
+            weights=weights,
             aggregate_data=aggregate_data,
         )
 
@@ -69,13 +63,9 @@ class MergedFragments:
                 indptr=analysis_file.merged_fragments.frame_intensities.indptr,
                 values=analysis_file.merged_fragments.frame_intensities.values,
             ),
-            rt_weights=alphasynchro.data.sparse_indices.SparseIndex(
-                indptr=analysis_file.merged_fragments.rt_weights.indptr,
-                values=analysis_file.merged_fragments.rt_weights.values,
-            ),
-            im_weights=alphasynchro.data.sparse_indices.SparseIndex(
-                indptr=analysis_file.merged_fragments.im_weights.indptr,
-                values=analysis_file.merged_fragments.im_weights.values,
+            weights=alphasynchro.data.sparse_indices.SparseIndex(
+                indptr=analysis_file.merged_fragments.weights.indptr,
+                values=analysis_file.merged_fragments.weights.values,
             ),
             aggregate_data=alphasynchro.data.dataframe.DataFrame(
                 **{
@@ -100,8 +90,10 @@ class FrameIntensitiesCalculator:
 
     def calculate_all(
         self,
-    ) -> alphasynchro.data.dataframe.DataFrame:
-        indptr = np.arange(len(self.fragment_pointers) + 1) * self.fragment_frame_count
+    ) -> alphasynchro.stats.distributions.CDF:
+        profile_builder = alphasynchro.stats.distributions.FrameProfileBuilder(
+            frame_count=self.fragment_frame_count,
+        )
         values = np.zeros(len(self.fragment_pointers) * self.fragment_frame_count)
         alphasynchro.performance.multithreading.parallel(
             self._calculate_frame_intensities,
@@ -109,10 +101,7 @@ class FrameIntensitiesCalculator:
             range(self.fragment_pointers.size),
             values,
         )
-        return alphasynchro.stats.distributions.PDF(
-            indptr=indptr,
-            values=values,
-        ).to_cdf()
+        return profile_builder.create_cdf(values)
 
     @alphasynchro.performance.compiling.njit
     def _calculate_frame_intensities(
@@ -120,12 +109,17 @@ class FrameIntensitiesCalculator:
         merged_fragment_index,
         values,
     ):
-        offset = merged_fragment_index * self.fragment_frame_count - 1
+        profile = alphasynchro.stats.distributions.get_frame_profile(
+            values,
+            merged_fragment_index,
+            self.fragment_frame_count,
+        )
         fragment_indices = self.fragment_pointers.get_values(merged_fragment_index)
         for fragment_index in fragment_indices:
             frame = self.fragments.aggregate_data.frame_group[fragment_index]
             intensity = self.fragments.aggregate_data.summed_intensity[fragment_index]
-            values[offset + frame] += intensity
+            profile[frame - 1] += intensity
+        alphasynchro.stats.distributions.convert_pdf_to_cdf_inplace(profile)
 
 
 @alphasynchro.performance.compiling.njit_dataclass
@@ -2,6 +2,9 @@
 '''Module to represent MS1/MS2 peaks as a njit dataclass.'''
 
 
+# builtin
+import dataclasses
+
 # local
 import alphasynchro.data.sparse_indices
 import alphasynchro.stats.distributions
@@ -91,6 +94,13 @@ class Peaks:
     def __len__(self):
         return len(self.aggregate_data)
 
+    def compress_projections(self, dtype: np.dtype = np.float32):
+        return dataclasses.replace(
+            self,
+            rt_projection=self.rt_projection.compress(dtype),
+            im_projection=self.im_projection.compress(dtype),
+        )
+
     @classmethod
     def from_analysis_hdf_subgroup(cls, hdf_subgroup):
         peaks = cls(
@@ -102,11 +112,13 @@ class Peaks:
                 indptr=hdf_subgroup.rt_projection.indptr,
                 values=hdf_subgroup.rt_projection.values,
                 start_offsets=hdf_subgroup.rt_projection.start_offsets,
+                value_scale=getattr(hdf_subgroup.rt_projection, "value_scale", 1.0),
             ),
             im_projection=alphasynchro.stats.distributions.CDFWithOffset(
                 indptr=hdf_subgroup.im_projection.indptr,
                 values=hdf_subgroup.im_projection.values,
                 start_offsets=hdf_subgroup.im_projection.start_offsets,
+                value_scale=getattr(hdf_subgroup.im_projection, "value_scale", 1.0),
             ),
             aggregate_data=alphasynchro.data.dataframe.DataFrame(
                 **{
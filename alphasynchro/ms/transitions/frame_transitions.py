@@ -17,6 +17,20 @@ import alphasynchro.ms.peaks.precursors
 import numpy as np
 
 
+RT_WEIGHT_COLUMN = 0
+IM_WEIGHT_COLUMN = 1
+
+
+def combine_weights(
+    rt_weights: np.ndarray,
+    im_weights: np.ndarray,
+) -> np.ndarray:
+    weights = np.empty((len(rt_weights), 2), dtype=np.float32)
+    weights[:, RT_WEIGHT_COLUMN] = rt_weights
+    weights[:, IM_WEIGHT_COLUMN] = im_weights
+    return weights
+
+
 @alphasynchro.performance.compiling.njit_dataclass
 class Transitions(alphasynchro.data.sparse_indices.SparseIndex):
 
@@ -40,7 +54,10 @@ class Transitions(alphasynchro.data.sparse_indices.SparseIndex):
         new_indptr[1:] = self.indptr[indices + 1] - self.indptr[indices]
         new_indptr = np.cumsum(new_indptr)
         new_values = np.empty(new_indptr[-1], dtype=self.values.dtype)
-        new_weights = np.empty(new_indptr[-1], dtype=self.weights.dtype)
+        new_weights = np.empty(
+            (new_indptr[-1],) + self.weights.shape[1:],
+            dtype=self.weights.dtype,
+        )
         new_precursor_indices = self.precursor_indices[indices]
         alphasynchro.performance.multithreading.parallel(
             self._set_new_values_after_filtering,
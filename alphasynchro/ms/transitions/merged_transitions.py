@@ -7,6 +7,7 @@ import numpy as np
 
 # local
 import alphasynchro.performance.compiling
+import alphasynchro.performance.multithreading
 import alphasynchro.ms.peaks.fragments
 import alphasynchro.algorithms.calibration
 import alphasynchro.stats.distributions
@@ -14,92 +15,264 @@ import alphasynchro.data.sparse_indices
 import alphasynchro.ms.transitions.frame_transitions
 
 
+INSERTION_SORT_SIZE = 32
+RADIX_BITS = 8
+RADIX_SIZE = 2**RADIX_BITS
+RADIX_MASK = np.uint32(RADIX_SIZE - 1)
+SIGN_BIT = np.uint32(2**31)
+
+
+def create_sort_buffers(
+    thread_count: int,
+    size: int,
+    keys: np.ndarray,
+    values: np.ndarray,
+    weights: np.ndarray,
+) -> tuple[np.ndarray]:
+    return (
+        np.empty((thread_count, size), dtype=np.uint32),
+        np.empty((thread_count, size), dtype=np.int64),
+        np.empty((thread_count, size), dtype=np.int64),
+        np.empty((thread_count, RADIX_SIZE + 1), dtype=np.int64),
+        np.empty((thread_count, size), dtype=keys.dtype),
+        np.empty((thread_count, size), dtype=values.dtype),
+        np.empty((thread_count, size, weights.shape[1]), dtype=weights.dtype),
+    )
+
+
+@alphasynchro.performance.compiling.njit(nogil=True)
+def sort_segment_by_keys(
+    keys: np.ndarray,
+    values: np.ndarray,
+    weights: np.ndarray,
+    sort_buffers: tuple[np.ndarray],
+    thread_index: int,
+) -> None:
+    if len(keys) <= INSERTION_SORT_SIZE:
+        insertion_sort_by_keys(keys, values, weights)
+    else:
+        radix_sort_by_keys(keys, values, weights, sort_buffers, thread_index)
+
+
+@alphasynchro.performance.compiling.njit(nogil=True)
+def insertion_sort_by_keys(
+    keys: np.ndarray,
+    values: np.ndarray,
+    weights: np.ndarray,
+) -> None:
+    for index in range(1, len(keys)):
+        key = keys[index]
+        target = index
+        while (target > 0) and (keys[target - 1] > key):
+            target -= 1
+        if target == index:
+            continue
+        value = values[index]
+        for shifted_index in range(index, target, -1):
+            keys[shifted_index] = keys[shifted_index - 1]
+            values[shifted_index] = values[shifted_index - 1]
+        keys[target] = key
+        values[target] = value
+        for column in range(weights.shape[1]):
+            weight = weights[index, column]
+            for shifted_index in range(index, target, -1):
+                weights[shifted_index, column] = weights[shifted_index - 1, column]
+            weights[target, column] = weight
+
+
+@alphasynchro.performance.compiling.njit(nogil=True)
+def radix_sort_by_keys(
+    keys: np.ndarray,
+    values: np.ndarray,
+    weights: np.ndarray,
+    sort_buffers: tuple[np.ndarray],
+    thread_index: int,
+) -> None:
+    (
+        encoded_key_buffer,
+        order_buffer,
+        next_order_buffer,
+        count_buffer,
+        key_buffer,
+        value_buffer,
+        weight_buffer,
+    ) = sort_buffers
+    size = len(keys)
+    encoded_keys = encoded_key_buffer[thread_index, :size]
+    float32_keys = encoded_keys.view(np.float32)
+    for index in range(size):
+        float32_keys[index] = keys[index]
+        bits = encoded_keys[index]
+        if bits & SIGN_BIT:
+            encoded_keys[index] = ~bits
+        else:
+            encoded_keys[index] = bits | SIGN_BIT
+    order = order_buffer[thread_index, :size]
+    next_order = next_order_buffer[thread_index, :size]
+    counts = count_buffer[thread_index]
+    for index in range(size):
+        order[index] = index
+    for shift in range(0, 32, RADIX_BITS):
+        radix_shift = np.uint32(shift)
+        counts[:] = 0
+        for index in order:
+            counts[int((encoded_keys[index] >> radix_shift) & RADIX_MASK) + 1] += 1
+        if np.max(counts) == size:
+            continue
+        for digit in range(RADIX_SIZE):
+            counts[digit + 1] += counts[digit]
+        for index in order:
+            digit = int((encoded_keys[index] >> radix_shift) & RADIX_MASK)
+            next_order[counts[digit]] = index
+            counts[digit] += 1
+        order, next_order = next_order, order
+    sorted_keys = key_buffer[thread_index, :size]
+    sorted_values = value_buffer[thread_index, :size]
+    sorted_weights = weight_buffer[thread_index, :size]
+    for index in range(size):
+        sorted_keys[index] = keys[order[index]]
+        sorted_values[index] = values[order[index]]
+        for column in range(weights.shape[1]):
+            sorted_weights[index, column] = weights[order[index], column]
+    keys[:] = sorted_keys
+    values[:] = sorted_values
+    weights[:] = sorted_weights
+    # float32 keys only tie values that are close, so this pass moves few elements
+    insertion_sort_by_keys(keys, values, weights)
+
+
+@alphasynchro.performance.compiling.njit(nogil=True)
+def set_frame_transitions(
+    precursor_index: int,
+    offsets: np.ndarray,
+    indptr: np.ndarray,
+    values: np.ndarray,
+    weights: np.ndarray,
+    merged_values: np.ndarray,
+    merged_weights: np.ndarray,
+) -> None:
+    start = indptr[precursor_index]
+    end = indptr[precursor_index + 1]
+    offset = offsets[precursor_index]
+    for index in range(start, end):
+        merged_values[offset] = values[index]
+        merged_weights[offset] = weights[index]
+        offset += 1
+
+
 @alphasynchro.performance.compiling.njit_dataclass
 class MergedFrames(alphasynchro.data.sparse_indices.SparseIndex):
 
-    rt_weights: np.ndarray
-    im_weights: np.ndarray
+    weights: np.ndarray
     fragments: alphasynchro.ms.peaks.fragments.Fragments
 
     @classmethod
     def from_transition_dicts(
         cls,
         *,
-        im_transition_dict: dict[int: alphasynchro.ms.transitions.frame_transitions.Transitions],
-        rt_transition_dict: dict[int: alphasynchro.ms.transitions.frame_transitions.Transitions],
+        transition_dict: dict[int: alphasynchro.ms.transitions.frame_transitions.Transitions],
         fragments: alphasynchro.ms.peaks.fragments.Fragments,
     ):
-        merged_transitions_indptr = np.zeros_like(im_transition_dict[1].indptr)
-        for _, transitions in im_transition_dict.items():
+        merged_transitions_indptr = np.zeros_like(transition_dict[1].indptr)
+        for _, transitions in transition_dict.items():
             merged_transitions_indptr += transitions.indptr
         merged_transitions_values = np.empty(merged_transitions_indptr[-1], dtype=np.int64)
-        merged_rt_weights = np.empty(merged_transitions_indptr[-1])
-        merged_im_weights = np.empty(merged_transitions_indptr[-1])
-        merged_transitions_indptr_copy = np.copy(merged_transitions_indptr)
-        for frame, im_transitions in im_transition_dict.items():
-            rt_transitions = rt_transition_dict[frame]
-            for precursor_index in range(im_transitions.size):
-                if im_transitions.is_empty(precursor_index):
-                    continue
-                start = merged_transitions_indptr_copy[precursor_index]
-                size = im_transitions.get_size(precursor_index)
-                merged_transitions_values[start: start + size] = im_transitions.get_values(precursor_index)
-                merged_im_weights[start: start + size] = im_transitions.get_weights(precursor_index)
-                merged_rt_weights[start: start + size] = rt_transitions.get_weights(precursor_index)
-                merged_transitions_indptr_copy[precursor_index] += size
+        merged_weights = np.empty(
+            (merged_transitions_indptr[-1], 2),
+            dtype=transition_dict[1].weights.dtype,
+        )
+        offsets = np.copy(merged_transitions_indptr[:-1])
+        for transitions in transition_dict.values():
+            alphasynchro.performance.multithreading.parallel(
+                alphasynchro.ms.transitions.merged_transitions.set_frame_transitions,
+            )(
+                range(transitions.size),
+                offsets,
+                transitions.indptr,
+                transitions.values,
+                transitions.weights,
+                merged_transitions_values,
+                merged_weights,
+            )
+            offsets += np.diff(transitions.indptr)
         return cls(
             indptr=merged_transitions_indptr,
             values=merged_transitions_values,
-            rt_weights=merged_im_weights,
-            im_weights=merged_rt_weights,
+            weights=merged_weights,
             fragments=fragments,
         )
 
+    @alphasynchro.performance.compiling.njit(nogil=True)
+    def get_weights(self, index: int) -> np.ndarray:
+        start, end = self.get_boundaries(index)
+        return self.weights[start: end]
+
     @alphasynchro.performance.compiling.njit(nogil=True)
     def get_rt_weights(self, index: int) -> np.ndarray:
         start, end = self.get_boundaries(index)
-        return self.rt_weights[start: end]
+        return self.weights[
+            start: end,
+            alphasynchro.ms.transitions.frame_transitions.RT_WEIGHT_COLUMN
+        ]
 
     @alphasynchro.performance.compiling.njit(nogil=True)
     def get_im_weights(self, index: int) -> np.ndarray:
         start, end = self.get_boundaries(index)
-        return self.im_weights[start: end]
+        return self.weights[
+            start: end,
+            alphasynchro.ms.transitions.frame_transitions.IM_WEIGHT_COLUMN
+        ]
 
     def sort_mz(self):
-        new_values = np.empty_like(self.values)
-        new_rt_weights = np.empty_like(self.rt_weights)
-        new_im_weights = np.empty_like(self.im_weights)
+        mz_values = self.fragments.aggregate_data.mz_weighted_average[self.values]
+        new_values = np.copy(self.values)
+        new_weights = np.copy(self.weights)
+        thread_count = alphasynchro.performance.multithreading.MAX_THREADS
+        # each thread sorts every thread_count-th row with its own scratch space
+        sort_buffers = alphasynchro.ms.transitions.merged_transitions.create_sort_buffers(
+            thread_count,
+            np.max(np.diff(self.indptr), initial=0),
+            mz_values,
+            new_values,
+            new_weights,
+        )
         alphasynchro.performance.multithreading.parallel(
             self._sort_by_mz,
+            thread_count=thread_count,
         )(
-            range(self.size),
+            range(thread_count),
+            thread_count,
+            mz_values,
             new_values,
-            new_rt_weights,
-            new_im_weights,
+            new_weights,
+            sort_buffers,
         )
         return type(self)(
             indptr=self.indptr,
             values=new_values,
-            rt_weights=new_rt_weights,
-            im_weights=new_im_weights,
+            weights=new_weights,
             fragments=self.fragments,
         )
 
     @alphasynchro.performance.compiling.njit(nogil=True)
     def _sort_by_mz(
         self,
-        precursor_index: int,
+        thread_index: int,
+        thread_count: int,
+        mz_values: np.ndarray,
         new_values: np.ndarray,
-        new_rt_weights: np.ndarray,
-        new_im_weights: np.ndarray,
+        new_weights: np.ndarray,
+        sort_buffers: tuple[np.ndarray],
     ) -> None:
-        values = self.get_values(precursor_index)
-        mz_values = self.fragments.aggregate_data.mz_weighted_average[values]
-        order = np.argsort(mz_values)
-        start, end = self.get_boundaries(precursor_index)
-        new_values[start: end] = values[order]
-        new_rt_weights[start: end] = self.get_rt_weights(precursor_index)[order]
-        new_im_weights[start: end] = self.get_im_weights(precursor_index)[order]
+        for precursor_index in range(thread_index, self.size, thread_count):
+            start, end = self.get_boundaries(precursor_index)
+            alphasynchro.ms.transitions.merged_transitions.sort_segment_by_keys(
+                mz_values[start: end],
+                new_values[start: end],
+                new_weights[start: end],
+                sort_buffers,
+                thread_index,
+            )
 
     def count_all_merged_peaks(
         self,
@@ -14,6 +14,9 @@ import numba
 import pandas as pd
 import numpy as np
 
+# local
+import alphasynchro.performance.profiling
+
 
 def njit_dataclass(
     _cls=None,
@@ -150,6 +153,11 @@ def add_njit_function_to_object_njit_module(self, func, tree) -> None:
     exec(src, self.__njit__.__dict__)
     nogil = tree_has_decorator_containing_name(tree, "nogil")
     func_ = numba.njit(nogil=nogil)(self.__njit__.__dict__[func.__name__])
+    if alphasynchro.performance.profiling.is_enabled():
+        func_ = alphasynchro.performance.profiling.profile_function(
+            f"{type(self).__name__}.{func.__name__}",
+            func_,
+        )
     src = f"object.__setattr__(self.__njit__, '{func.__name__}', func_)"
     exec(src)
 
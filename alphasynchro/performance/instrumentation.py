@@ -0,0 +1,103 @@
+#!python
+'''Module to record time and memory usage of pipeline stages and parallel calls.'''
+
+
+# builtin
+import contextlib
+import functools
+import json
+import sys
+import time
+
+# external
+import psutil
+
+
+OPEN_RECORDS = []
+
+
+def is_recording() -> bool:
+    return len(OPEN_RECORDS) > 0
+
+
+def get_memory_usage() -> int:
+    return psutil.Process().memory_info().rss
+
+
+def get_peak_memory_usage() -> int:
+    memory_info = psutil.Process().memory_info()
+    if hasattr(memory_info, "peak_wset"):
+        return memory_info.peak_wset
+    import resource
+    peak_memory_usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform != "darwin":
+        # linux reports kilobytes, macos bytes
+        peak_memory_usage *= 1024
+    return peak_memory_usage
+
+
+@contextlib.contextmanager
+def record(
+    name: str,
+    *,
+    kind: str = "stage",
+    force: bool = False,
+    **info,
+):
+    if not (force or is_recording()):
+        yield None
+        return
+    current_record = {
+        "name": name,
+        "kind": kind,
+        **info,
+        "children": [],
+    }
+    if is_recording():
+        OPEN_RECORDS[-1]["children"].append(current_record)
+    OPEN_RECORDS.append(current_record)
+    start_rss = get_memory_usage()
+    start_cpu_time = time.process_time()
+    start_wall_time = time.perf_counter()
+    try:
+        yield current_record
+    finally:
+        current_record["wall_time"] = time.perf_counter() - start_wall_time
+        current_record["cpu_time"] = time.process_time() - start_cpu_time
+        end_rss = get_memory_usage()
+        current_record["start_rss"] = start_rss
+        current_record["end_rss"] = end_rss
+        current_record["allocated_bytes"] = end_rss - start_rss
+        current_record["peak_rss"] = max(get_peak_memory_usage(), end_rss)
+        children = current_record["children"]
+        if "item_count" not in current_record:
+            current_record["item_count"] = sum(
+                child["item_count"] for child in children
+            )
+        if "thread_count" not in current_record:
+            current_record["thread_count"] = max(
+                [1] + [child["thread_count"] for child in children]
+            )
+        OPEN_RECORDS.pop()
+
+
+def stage(func: callable) -> callable:
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with record(func.__name__):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+@contextlib.contextmanager
+def report(
+    file_name: str,
+    name: str = "run",
+):
+    root_record = {}
+    try:
+        with record(name, force=True) as root_record:
+            yield root_record
+    finally:
+        with open(file_name, "w") as report_file:
+            json.dump(root_record, report_file, indent=4)
@@ -0,0 +1,58 @@
+#!python
+'''Module to keep memory usage within a budget.'''
+
+
+# local
+import alphasynchro.performance.instrumentation
+
+# external
+import numpy as np
+import psutil
+
+
+def get_memory_budget(max_memory: float) -> int:
+    return int(max_memory * 1024**3)
+
+
+def get_available_memory(max_memory: float = None) -> int:
+    available_memory = psutil.virtual_memory().available
+    if max_memory is not None:
+        available_memory = min(
+            available_memory,
+            get_memory_budget(max_memory)
+            - alphasynchro.performance.instrumentation.get_memory_usage(),
+        )
+    return max(available_memory, 0)
+
+
+def is_exceeded(max_memory: float = None) -> bool:
+    if max_memory is None:
+        return False
+    return (
+        alphasynchro.performance.instrumentation.get_memory_usage()
+        > get_memory_budget(max_memory)
+    )
+
+
+def get_max_item_count(
+    item_size: int,
+    max_memory: float = None,
+    min_item_count: int = 1,
+) -> int:
+    if max_memory is None:
+        return None
+    return max(get_available_memory(max_memory) // item_size, min_item_count)
+
+
+def split_into_blocks(
+    counts: np.ndarray,
+    max_count: int = None,
+) -> list[np.ndarray]:
+    if (max_count is None) or (np.sum(counts) <= max_count):
+        return [None]
+    indices = np.flatnonzero(counts)
+    start_offsets = np.cumsum(counts[indices]) - counts[indices]
+    # an index is put in the block of its start offset, so a block can exceed max_count by its last index
+    block_ids = start_offsets // max_count
+    block_starts = np.flatnonzero(np.diff(block_ids, prepend=-1))
+    return np.split(indices, block_starts[1:])
@@ -7,12 +7,17 @@ import multiprocessing
 import multiprocessing.pool
 import functools
 import threading
+import time
 
 # external
 import tqdm
 import numba
 import numpy as np
 
+# local
+import alphasynchro.performance.instrumentation
+import alphasynchro.performance.profiling
+
 
 MAX_THREADS = multiprocessing.cpu_count() - 1
 MAX_GRANULARITY = 10**6
@@ -40,46 +45,40 @@ def parallel(
     include_progress_callback: bool = True,
 ) -> None:
     def parallel_compiled_func_inner(func):
-        numba_func = func
-
-        @numba.njit(nogil=True)
-        def numba_func_parallel(
-            iterable,
-            thread_id,
-            progress_counter,
-            start,
-            stop,
-            step,
-            *args,
-        ):
-            if len(iterable) == 0:
-                for i in range(start, stop, step):
-                    numba_func(i, *args)
-                    progress_counter[thread_id] += 1
-            else:
-                for i in iterable:
-                    numba_func(i, *args)
-                    progress_counter[thread_id] += 1
+        numba_func_parallel = _get_numba_func_parallel(func)
 
         def wrapper(iterable, *args):
             current_thread_count = _set_current_thread_count(thread_count)
-            threads = []
-            progress_counter = np.zeros(current_thread_count, dtype=np.int64)
-            for thread_id in range(current_thread_count):
-                thread = _launch_thread(
-                    iterable,
-                    thread_id,
-                    current_thread_count,
-                    numba_func_parallel,
-                    progress_counter,
-                    args,
-                )
-                threads.append(thread)
-            if include_progress_callback:
-                _track_progress(iterable, progress_counter)
-            for thread in threads:
-                thread.join()
-                del thread
+            with alphasynchro.performance.instrumentation.record(
+                f"{func.__module__}.{func.__name__}",
+                kind="parallel",
+                item_count=len(iterable),
+                thread_count=current_thread_count,
+            ) as current_record:
+                thread_times = None
+                if (current_record is not None) and alphasynchro.performance.profiling.is_enabled():
+                    thread_times = np.zeros((current_thread_count, 2))
+                threads = []
+                progress_counter = np.zeros(current_thread_count, dtype=np.int64)
+                for thread_id in range(current_thread_count):
+                    thread = _launch_thread(
+                        iterable,
+                        thread_id,
+                        current_thread_count,
+                        numba_func_parallel,
+                        progress_counter,
+                        args,
+                        thread_times,
+                    )
+                    threads.append(thread)
+                if include_progress_callback:
+                    _track_progress(iterable, progress_counter)
+                for thread in threads:
+                    thread.join()
+                    del thread
+                if thread_times is not None:
+                    current_record["thread_wall_times"] = thread_times[:, 0].tolist()
+                    current_record["thread_cpu_times"] = thread_times[:, 1].tolist()
         return functools.wraps(func)(wrapper)
     if _func is None:
         return parallel_compiled_func_inner
@@ -87,6 +86,33 @@ def parallel(
         return parallel_compiled_func_inner(_func)
 
 
+def _get_numba_func_parallel(numba_func):
+    if hasattr(numba_func, "_numba_func_parallel"):
+        return numba_func._numba_func_parallel
+
+    @numba.njit(nogil=True)
+    def numba_func_parallel(
+        iterable,
+        thread_id,
+        progress_counter,
+        start,
+        stop,
+        step,
+        *args,
+    ):
+        if len(iterable) == 0:
+            for i in range(start, stop, step):
+                numba_func(i, *args)
+                progress_counter[thread_id] += 1
+        else:
+            for i in iterable:
+                numba_func(i, *args)
+                progress_counter[thread_id] += 1
+
+    numba_func._numba_func_parallel = numba_func_parallel
+    return numba_func_parallel
+
+
 def _set_current_thread_count(thread_count: int) -> int:
     if thread_count is None:
         current_thread_count = MAX_THREADS
@@ -105,6 +131,7 @@ def _launch_thread(
     numba_func_parallel,
     progress_counter,
     args,
+    thread_times: np.ndarray = None,
 ) -> threading.Thread:
     local_iterable = iterable[thread_id::current_thread_count]
     if isinstance(local_iterable, range):
@@ -116,8 +143,16 @@ def _launch_thread(
         start = -1
         stop = -1
         step = -1
+    target = numba_func_parallel
+    if thread_times is not None:
+        target = functools.partial(
+            _run_and_time_thread,
+            numba_func_parallel,
+            thread_times,
+            thread_id,
+        )
     thread = threading.Thread(
-        target=numba_func_parallel,
+        target=target,
         args=(
             local_iterable,
             thread_id,
@@ -133,6 +168,21 @@ def _launch_thread(
     return thread
 
 
+def _run_and_time_thread(
+    numba_func_parallel,
+    thread_times: np.ndarray,
+    thread_id: int,
+    *args,
+) -> None:
+    start_wall_time = time.perf_counter()
+    start_cpu_time = time.thread_time()
+    numba_func_parallel(*args)
+    thread_times[thread_id] = (
+        time.perf_counter() - start_wall_time,
+        time.thread_time() - start_cpu_time,
+    )
+
+
 def _track_progress(iterable, progress_counter) -> None:
     import time
     if len(iterable) > MAX_GRANULARITY:
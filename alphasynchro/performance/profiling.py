@@ -0,0 +1,157 @@
+#!python
+'''Module to profile njit methods of njit dataclasses from within compiled code.'''
+
+
+# builtin
+import inspect
+import logging
+
+# external
+import llvmlite.ir
+import numba
+import numba.core.cgutils
+import numba.extending
+import numpy as np
+
+
+MAX_KERNEL_COUNT = 1024
+HISTOGRAM_SIZE = 64
+CALL_COLUMN = 0
+CYCLE_COLUMN = 1
+HISTOGRAM_OFFSET = 2
+ENABLED = False
+SAMPLE_INTERVAL = 1000
+KERNEL_SLOTS = {}
+PROFILES = np.zeros(
+    (MAX_KERNEL_COUNT, HISTOGRAM_OFFSET + HISTOGRAM_SIZE),
+    dtype=np.int64,
+)
+
+
+def enable(sample_interval: int = 1000) -> None:
+    global ENABLED, SAMPLE_INTERVAL
+    ENABLED = True
+    SAMPLE_INTERVAL = sample_interval
+
+
+def disable() -> None:
+    global ENABLED
+    ENABLED = False
+
+
+def is_enabled() -> bool:
+    return ENABLED
+
+
+def reset() -> None:
+    PROFILES[:] = 0
+
+
+@numba.extending.intrinsic
+def read_cycle_counter(typingctx):
+    signature = numba.types.int64()
+
+    def codegen(context, builder, signature, args):
+        function_type = llvmlite.ir.FunctionType(llvmlite.ir.IntType(64), [])
+        function = numba.core.cgutils.get_or_insert_function(
+            builder.module,
+            function_type,
+            "llvm.readcyclecounter",
+        )
+        return builder.call(function, [])
+    return signature, codegen
+
+
+@numba.extending.intrinsic
+def atomic_add(typingctx, address, value):
+    signature = numba.types.int64(numba.types.int64, numba.types.int64)
+
+    def codegen(context, builder, signature, args):
+        address, value = args
+        pointer = builder.inttoptr(address, llvmlite.ir.IntType(64).as_pointer())
+        return builder.atomic_rmw("add", pointer, value, "monotonic")
+    return signature, codegen
+
+
+@numba.njit(nogil=True)
+def record_call(
+    address: int,
+    elapsed_cycles: int,
+    sample_interval: int,
+) -> None:
+    call_index = atomic_add(address, 1)
+    atomic_add(address + 8 * CYCLE_COLUMN, elapsed_cycles)
+    if (sample_interval > 0) and (call_index % sample_interval == 0):
+        bucket = 0
+        while (elapsed_cycles > 1) and (bucket < HISTOGRAM_SIZE - 1):
+            elapsed_cycles >>= 1
+            bucket += 1
+        atomic_add(address + 8 * (HISTOGRAM_OFFSET + bucket), 1)
+
+
+def get_kernel_slot(name: str) -> int:
+    if name not in KERNEL_SLOTS:
+        if len(KERNEL_SLOTS) >= MAX_KERNEL_COUNT:
+            raise IndexError(
+                f"Cannot profile more than {MAX_KERNEL_COUNT} kernels"
+            )
+        KERNEL_SLOTS[name] = len(KERNEL_SLOTS)
+    return KERNEL_SLOTS[name]
+
+
+def profile_function(name: str, func: callable) -> callable:
+    address = PROFILES[get_kernel_slot(name)].ctypes.data
+    sample_interval = SAMPLE_INTERVAL
+    if inspect.isgeneratorfunction(func.py_func):
+        # only cycles spent inside the generator are counted, not those of the caller between yields
+        @numba.njit(nogil=True)
+        def profiled_generator(*args):
+            elapsed_cycles = 0
+            start = read_cycle_counter()
+            for item in func(*args):
+                elapsed_cycles += read_cycle_counter() - start
+                yield item
+                start = read_cycle_counter()
+            elapsed_cycles += read_cycle_counter() - start
+            record_call(address, elapsed_cycles, sample_interval)
+        return profiled_generator
+
+    @numba.njit(nogil=True)
+    def profiled_function(*args):
+        start = read_cycle_counter()
+        result = func(*args)
+        record_call(address, read_cycle_counter() - start, sample_interval)
+        return result
+    return profiled_function
+
+
+def get_kernel_profiles() -> dict[str: dict]:
+    kernel_profiles = {}
+    for name, slot in KERNEL_SLOTS.items():
+        call_count, cycle_count = PROFILES[slot, [CALL_COLUMN, CYCLE_COLUMN]]
+        if call_count == 0:
+            continue
+        histogram = PROFILES[slot, HISTOGRAM_OFFSET:]
+        kernel_profiles[name] = {
+            "call_count": int(call_count),
+            "cycle_count": int(cycle_count),
+            "sampled_log2_cycle_histogram": {
+                int(bucket): int(histogram[bucket])
+                for bucket in np.flatnonzero(histogram)
+            },
+        }
+    return kernel_profiles
+
+
+def show_kernel_profiles() -> None:
+    kernel_profiles = get_kernel_profiles()
+    logging.info("Profiles of compiled methods:")
+    logging.info(f"{'method':>64} {'calls':>12} {'cycles':>16} {'cycles/call':>12}")
+    for name, profile in sorted(
+        kernel_profiles.items(),
+        key=lambda item: -item[1]["cycle_count"],
+    ):
+        logging.info(
+            f"{name:>64} {profile['call_count']:>12} {profile['cycle_count']:>16} "
+            f"{profile['cycle_count'] / profile['call_count']:>12.1f}"
+        )
@@ -7,9 +7,49 @@ import numpy as np
 
 # local
 import alphasynchro.performance.compiling
+import alphasynchro.performance.multithreading
 import alphasynchro.stats.distributions
 
 
+def get_smooth_array(smooth_sigma: int) -> np.ndarray:
+    bins = np.arange(-3 * smooth_sigma, 3 * smooth_sigma + 1)
+    normalization_constant = 1 / (smooth_sigma * np.sqrt(2 * np.pi))
+    exponents = -bins**2 / (2 * smooth_sigma**2)
+    return normalization_constant * np.exp(exponents)
+
+
+@alphasynchro.performance.compiling.njit(nogil=True)
+def convolve_same(
+    distribution: np.ndarray,
+    smooth_array: np.ndarray,
+) -> np.ndarray:
+    smooth_distribution = np.zeros(len(distribution))
+    center = (len(smooth_array) - 1) // 2
+    for index in range(len(distribution)):
+        full_index = index + center
+        start = max(0, full_index - len(smooth_array) + 1)
+        end = min(len(distribution), full_index + 1)
+        value = 0.
+        for distribution_index in range(start, end):
+            value += distribution[distribution_index] * smooth_array[
+                full_index - distribution_index
+            ]
+        smooth_distribution[index] = value
+    return smooth_distribution
+
+
+@alphasynchro.performance.compiling.njit(nogil=True)
+def find_smooth_apex(
+    distribution: np.ndarray,
+    smooth_array: np.ndarray,
+) -> int:
+    smooth_distribution = alphasynchro.stats.apex_finder.convolve_same(
+        distribution,
+        smooth_array,
+    )
+    return np.argmax(smooth_distribution)
+
+
 @alphasynchro.performance.compiling.njit_dataclass
 class SmoothApexFinder:
 
@@ -17,22 +57,37 @@ class SmoothApexFinder:
     smooth_sigma: int = 5
 
     def __post_init__(self):
-        bins = np.arange(-3 * self.smooth_sigma, 3 * self.smooth_sigma + 1)
-        normalization_constant = 1 / (self.smooth_sigma * np.sqrt(2 * np.pi))
-        exponents = -bins**2 / (2 * self.smooth_sigma**2)
-        smooth_array = normalization_constant * np.exp(exponents)
+        smooth_array = get_smooth_array(self.smooth_sigma)
         object.__setattr__(self, "smooth_array", smooth_array)
 
-    def calculate_all(self) -> np.ndarray:
-        apices = np.empty(self.cdf.shape[0], dtype=np.int64)
-        for index in range(self.cdf.shape[0]):
-            apices[index] = self.calculate(index)
+    def calculate_all(self, indices: np.ndarray = None) -> np.ndarray:
+        if indices is None:
+            indices = range(self.cdf.shape[0])
+        apices = np.full(self.cdf.shape[0], -1, dtype=np.int64)
+        alphasynchro.performance.multithreading.parallel(
+            self.calculate_from_buffers
+        )(
+            indices,
+            apices,
+        )
         return apices
 
-    def calculate(self, index: int) -> np.ndarray:
+    @alphasynchro.performance.compiling.njit(nogil=True)
+    def calculate_from_buffers(
+        self,
+        index: int,
+        apices: np.ndarray,
+    ) -> None:
+        apices[index] = self.calculate(index)
+
+    @alphasynchro.performance.compiling.njit(nogil=True)
+    def calculate(self, index: int) -> int:
         im_apex = -1
         summed_value = self.cdf.get_summed_value(index)
         if summed_value > 0:
-            smooth_distribution = self.cdf.smooth(index, self.smooth_array)
-            im_apex = np.argmax(smooth_distribution) + self.cdf.start_offsets[index]
+            distribution = self.cdf.get_pdf(index)
+            im_apex = alphasynchro.stats.apex_finder.find_smooth_apex(
+                distribution,
+                self.smooth_array,
+            ) + self.cdf.get_start_offset(index)
         return im_apex
@@ -15,6 +15,73 @@ import numpy as np
 import scipy.signal
 
 
+def get_value_scale(dtype: np.dtype) -> float:
+    dtype = np.dtype(dtype)
+    if np.issubdtype(dtype, np.unsignedinteger):
+        return 1 / np.iinfo(dtype).max
+    return 1.0
+
+
+def get_ks_accuracy_bound(dtype: np.dtype) -> float:
+    # Compressed CDF values differ at most half a unit in the last place from
+    # the original values in [0, 1]. Since a KS distance is a maximum of
+    # differences between two such values, it is off by at most one unit.
+    dtype = np.dtype(dtype)
+    if dtype == np.float64:
+        return 0.0
+    if np.issubdtype(dtype, np.unsignedinteger):
+        return get_value_scale(dtype)
+    return float(np.finfo(dtype).eps)
+
+
+@alphasynchro.performance.compiling.njit(nogil=True)
+def encode_cdf_values(
+    cdf: np.ndarray,
+    encoded_cdf: np.ndarray,
+    value_scale: float,
+) -> None:
+    if value_scale == 1:
+        encoded_cdf[:] = cdf
+    else:
+        encoded_cdf[:] = np.round(cdf / value_scale)
+
+
+@alphasynchro.performance.compiling.njit(nogil=True)
+def get_pdf_from_cdf_values(
+    cdf: np.ndarray,
+    value_scale: float,
+) -> np.ndarray:
+    distribution = np.empty(len(cdf), dtype=np.float64)
+    if len(cdf) > 0:
+        distribution[0] = cdf[0]
+        distribution[1:] = np.diff(cdf)
+    if value_scale != 1:
+        distribution *= value_scale
+    return distribution
+
+
+@alphasynchro.performance.compiling.njit(nogil=True)
+def convert_pdf_to_cdf_inplace(
+    values: np.ndarray,
+) -> None:
+    total = 0.
+    for index in range(len(values)):
+        total += values[index]
+        values[index] = total
+    if total > 0:
+        for index in range(len(values)):
+            values[index] /= total
+
+
+@alphasynchro.performance.compiling.njit(nogil=True)
+def get_frame_profile(
+    values: np.ndarray,
+    index: int,
+    frame_count: int,
+) -> np.ndarray:
+    return values[index * frame_count: (index + 1) * frame_count]
+
+
 @alphasynchro.performance.compiling.njit_dataclass
 class PDF(alphasynchro.data.sparse_indices.SparseIndex):
 
@@ -57,6 +124,8 @@ class PDF(alphasynchro.data.sparse_indices.SparseIndex):
 @alphasynchro.performance.compiling.njit_dataclass
 class CDF(alphasynchro.data.sparse_indices.SparseIndex):
 
+    value_scale: float = 1.0
+
     @alphasynchro.performance.compiling.njit(nogil=True)
     def get_cdf(self, index: int) -> np.ndarray:
         return self.get_values(index)
@@ -67,14 +136,13 @@ class CDF(alphasynchro.data.sparse_indices.SparseIndex):
         index: int,
     ) -> np.ndarray:
         cdf = self.get_cdf(index)
-        distribution = np.empty_like(cdf)
-        if len(cdf) > 0:
-            distribution[0] = cdf[0]
-            distribution[1:] = np.diff(cdf)
-        return distribution
+        return alphasynchro.stats.distributions.get_pdf_from_cdf_values(
+            cdf,
+            self.value_scale,
+        )
 
     def to_pdf(self):
-        new_values = np.empty(self.indptr[-1], dtype=self.values.dtype)
+        new_values = np.empty(self.indptr[-1], dtype=np.float64)
         alphasynchro.performance.multithreading.parallel(
             self._convert_to_pdf,
         )(
@@ -105,6 +173,21 @@ class CDF(alphasynchro.data.sparse_indices.SparseIndex):
         )
         return smooth_distribution
 
+    def compress(self, dtype: np.dtype = np.float32):
+        dtype = np.dtype(dtype)
+        value_scale = get_value_scale(dtype)
+        if (dtype == self.values.dtype) and (value_scale == self.value_scale):
+            return self
+        values = self.values * self.value_scale
+        if value_scale != 1:
+            values = np.clip(np.round(values / value_scale), 0, 1 / value_scale)
+        return dataclasses.replace(
+            self,
+            values=values.astype(dtype),
+            value_scale=value_scale,
+        )
+
+
 @alphasynchro.performance.compiling.njit_dataclass
 class CDFWithOffset(CDF):
 
@@ -123,6 +206,37 @@ class CDFWithOffset(CDF):
         offset += self.get_size(index)
         return offset
 
+    def to_quantile_sketch(self, sketch_size: int = 16):
+        positions = np.empty((len(self), sketch_size), dtype=np.int64)
+        alphasynchro.performance.multithreading.parallel(
+            self._set_quantile_positions,
+        )(
+            range(len(self)),
+            positions,
+        )
+        end_offsets = self.start_offsets + np.diff(self.indptr)
+        return QuantileSketch(
+            positions=positions,
+            end_offsets=end_offsets,
+        )
+
+    @alphasynchro.performance.compiling.njit(nogil=True)
+    def _set_quantile_positions(
+        self,
+        index: int,
+        positions: np.ndarray,
+    ) -> None:
+        cdf = self.get_cdf(index)
+        start_offset = self.get_start_offset(index)
+        sketch_size = positions.shape[1]
+        quantile_index = 0
+        for cdf_index, value in enumerate(cdf):
+            value = value * self.value_scale * sketch_size
+            while (quantile_index < sketch_size) and (value >= quantile_index + 1):
+                positions[index, quantile_index] = start_offset + cdf_index
+                quantile_index += 1
+        positions[index, quantile_index:] = start_offset + len(cdf)
+
     def filter(self, indices: np.ndarray):
         new_indptr = np.zeros(len(indices) + 1, dtype=self.indptr.dtype)
         new_indptr[1:] = self.indptr[indices + 1] - self.indptr[indices]
@@ -141,6 +255,7 @@ class CDFWithOffset(CDF):
             indptr=new_indptr,
             values=new_values,
             start_offsets=new_start_offsets,
+            value_scale=self.value_scale,
         )
 
 
@@ -176,7 +291,8 @@ class CDFWithSummedValues(CDF):
         return type(self)(
             indptr=new_indptr,
             values=new_values,
-            summed_values=summed_values
+            summed_values=summed_values,
+            value_scale=self.value_scale,
         )
 
 
@@ -202,5 +318,74 @@ class CDFWithOffsetAndSummedValues(CDFWithOffset, CDFWithSummedValues):
             indptr=new_indptr,
             values=new_values,
             start_offsets=new_start_offsets,
-            summed_values=new_summed_values
+            summed_values=new_summed_values,
+            value_scale=self.value_scale,
+        )
+
+
+@alphasynchro.performance.compiling.njit_dataclass
+class QuantileSketch:
+
+    positions: np.ndarray = dataclasses.field(repr=False)
+    end_offsets: np.ndarray = dataclasses.field(repr=False)
+
+    def __len__(self):
+        return len(self.end_offsets)
+
+    @alphasynchro.performance.compiling.njit(nogil=True)
+    def get_sketch_size(self) -> int:
+        return self.positions.shape[1]
+
+    @alphasynchro.performance.compiling.njit(nogil=True)
+    def get_positions(self, index: int) -> np.ndarray:
+        return self.positions[index]
+
+    @alphasynchro.performance.compiling.njit(nogil=True)
+    def get_end_offset(self, index: int) -> int:
+        return self.end_offsets[index]
+
+
+@alphasynchro.performance.compiling.njit_dataclass
+class FrameProfileBuilder:
+
+    frame_count: int
+
+    def from_frame_values(
+        self,
+        frame_values: np.ndarray,
+    ) -> CDF:
+        row_count = frame_values.shape[1]
+        values = np.empty(row_count * self.frame_count)
+        alphasynchro.performance.multithreading.parallel(
+            self._set_profile_from_frame_values,
+        )(
+            range(row_count),
+            values,
+            frame_values,
+        )
+        return self.create_cdf(values)
+
+    def create_cdf(
+        self,
+        values: np.ndarray,
+    ) -> CDF:
+        return CDF(
+            indptr=np.arange(len(values) // self.frame_count + 1) * self.frame_count,
+            values=values,
+        )
+
+    @alphasynchro.performance.compiling.njit(nogil=True)
+    def _set_profile_from_frame_values(
+        self,
+        index: int,
+        values: np.ndarray,
+        frame_values: np.ndarray,
+    ) -> None:
+        profile = alphasynchro.stats.distributions.get_frame_profile(
+            values,
+            index,
+            self.frame_count,
         )
+        for frame in range(self.frame_count):
+            profile[frame] = frame_values[frame, index]
+        alphasynchro.stats.distributions.convert_pdf_to_cdf_inplace(profile)
@@ -11,6 +11,71 @@ import alphasynchro.stats.distributions
 import numpy as np
 
 
+REJECTED_KS_VALUE = np.inf
+
+
+@alphasynchro.performance.compiling.njit(nogil=True)
+def trim_left_edge_of_cdf_pair(
+    cdf1: np.ndarray,
+    start_offset1: int,
+    cdf2: np.ndarray,
+    start_offset2: int,
+    value_scale1: float = 1.0,
+    value_scale2: float = 1.0,
+) -> tuple[float, np.ndarray, np.ndarray]:
+    # a cdf that ends before the other starts keeps its last value
+    max_diff = 0.
+    if start_offset1 < start_offset2:
+        offset = min(start_offset2 - start_offset1, len(cdf1))
+        if offset > 0:
+            max_diff = cdf1[offset - 1] * value_scale1
+        cdf1 = cdf1[offset:]
+    elif start_offset2 < start_offset1:
+        offset = min(start_offset1 - start_offset2, len(cdf2))
+        if offset > 0:
+            max_diff = cdf2[offset - 1] * value_scale2
+        cdf2 = cdf2[offset:]
+    return max_diff, cdf1, cdf2
+
+
+@alphasynchro.performance.compiling.njit(nogil=True)
+def get_sketched_ks_count(
+    positions1: np.ndarray[int],
+    positions2: np.ndarray[int],
+    end_offset: int,
+) -> int:
+    count1 = 0
+    count2 = 0
+    max_count_diff = 0
+    sketch_size = len(positions1)
+    while True:
+        position = end_offset
+        if count1 < sketch_size:
+            position = min(position, positions1[count1])
+        if count2 < sketch_size:
+            position = min(position, positions2[count2])
+        if position >= end_offset:
+            break
+        while (count1 < sketch_size) and (positions1[count1] == position):
+            count1 += 1
+        while (count2 < sketch_size) and (positions2[count2] == position):
+            count2 += 1
+        max_count_diff = max(max_count_diff, abs(count1 - count2))
+    return max_count_diff
+
+
+@alphasynchro.performance.compiling.njit
+def get_block_indptr(
+    indices: np.ndarray[int],
+) -> np.ndarray[int]:
+    block_starts = np.flatnonzero(indices[1:] != indices[:-1]) + 1
+    block_indptr = np.empty(len(block_starts) + 2, dtype=np.int64)
+    block_indptr[0] = 0
+    block_indptr[1:-1] = block_starts
+    block_indptr[-1] = len(indices)
+    return block_indptr
+
+
 @alphasynchro.performance.compiling.njit_dataclass
 class KSTester1D:
 
@@ -19,10 +84,41 @@ class KSTester1D:
 
     @alphasynchro.performance.compiling.njit(nogil=True)
     def calculate(self, index1: int, index2: int) -> float:
+        max_diff, _, _ = self.calculate_with_statistics(index1, index2)
+        return max_diff
+
+    @alphasynchro.performance.compiling.njit(nogil=True)
+    def calculate_with_statistics(
+        self,
+        index1: int,
+        index2: int,
+    ) -> tuple[float, int, int]:
         max_diff, cdf1, cdf2 = self.trim_left_edge_of_cdfs(index1, index2)
+        return self.compare_left_trimmed_cdfs(cdf1, cdf2, max_diff)
+
+    @alphasynchro.performance.compiling.njit(nogil=True)
+    def compare_left_trimmed_cdfs(
+        self,
+        cdf1: np.ndarray,
+        cdf2: np.ndarray,
+        max_diff: float,
+    ) -> tuple[float, int, int]:
         cdf1, cdf2 = self.trim_right_edge_of_cdfs(cdf1, cdf2)
-        max_diff = self.check_overlapping_part_of_cdfs(cdf1, cdf2, max_diff)
-        return max_diff
+        overlap_size = len(cdf1)
+        if max_diff > self.threshold:
+            return REJECTED_KS_VALUE, 0, overlap_size
+        max_diff, scanned_size = self.scan_overlapping_part_of_cdfs(
+            cdf1,
+            cdf2,
+            max_diff,
+        )
+        return max_diff, scanned_size, overlap_size
+
+    @alphasynchro.performance.compiling.njit(nogil=True)
+    def get_overlap_size(self, index1: int, index2: int) -> int:
+        _, cdf1, cdf2 = self.trim_left_edge_of_cdfs(index1, index2)
+        cdf1, cdf2 = self.trim_right_edge_of_cdfs(cdf1, cdf2)
+        return len(cdf1)
 
     @alphasynchro.performance.compiling.njit(nogil=True)
     def trim_left_edge_of_cdfs(
@@ -34,15 +130,19 @@ class KSTester1D:
         cdf2 = self.cdf_with_offset.get_cdf(index2)
         start_offset1 = self.cdf_with_offset.get_start_offset(index1)
         start_offset2 = self.cdf_with_offset.get_start_offset(index2)
-        if start_offset1 < start_offset2:
-            max_diff = cdf1[start_offset2 - start_offset1 - 1]
-            cdf1 = cdf1[start_offset2 - start_offset1:]
-        elif start_offset2 < start_offset1:
-            max_diff = cdf2[start_offset1 - start_offset2 - 1]
-            cdf2 = cdf2[start_offset1 - start_offset2:]
-        else:
-            max_diff = 0
-        return  max_diff, cdf1, cdf2
+        value_scale1, value_scale2 = self.get_value_scales()
+        return alphasynchro.stats.ks_1d.trim_left_edge_of_cdf_pair(
+            cdf1,
+            start_offset1,
+            cdf2,
+            start_offset2,
+            value_scale1,
+            value_scale2,
+        )
+
+    @alphasynchro.performance.compiling.njit(nogil=True)
+    def get_value_scales(self) -> tuple[float, float]:
+        return self.cdf_with_offset.value_scale, self.cdf_with_offset.value_scale
 
     @alphasynchro.performance.compiling.njit(nogil=True)
     def trim_right_edge_of_cdfs(
@@ -63,16 +163,28 @@ class KSTester1D:
         cdf2: np.ndarray,
         max_diff = float
     ) -> float:
+        max_diff, _ = self.scan_overlapping_part_of_cdfs(cdf1, cdf2, max_diff)
+        return max_diff
+
+    @alphasynchro.performance.compiling.njit(nogil=True)
+    def scan_overlapping_part_of_cdfs(
+        self,
+        cdf1: np.ndarray,
+        cdf2: np.ndarray,
+        max_diff = float
+    ) -> tuple[float, int]:
+        scanned_size = 0
+        value_scale1, value_scale2 = self.get_value_scales()
         for v1, v2 in zip(cdf1, cdf2):
-            diff = v1 - v2
+            scanned_size += 1
+            diff = v1 * value_scale1 - v2 * value_scale2
             if diff < 0:
                 diff = -diff
             if diff > self.threshold:
-                max_diff = self.threshold
-                break
+                return REJECTED_KS_VALUE, scanned_size
             if diff > max_diff:
                 max_diff = diff
-        return max_diff
+        return max_diff, scanned_size
 
 
 @alphasynchro.performance.compiling.njit_dataclass
@@ -92,6 +204,35 @@ class KSTester1DMultithreadedInterface:
         )
         return ks_values
 
+    def calculate_all_of_indptr(
+        self,
+        indptr: np.ndarray[int],
+        ks_values: np.ndarray[float] = None,
+    ) -> np.ndarray[float]:
+        if ks_values is None:
+            ks_values = np.empty(indptr[-1])
+        alphasynchro.performance.multithreading.parallel(
+            self.calculate_row_from_buffers
+        )(
+            range(len(indptr) - 1),
+            ks_values,
+            indptr,
+        )
+        return ks_values
+
+    @alphasynchro.performance.compiling.njit(nogil=True)
+    def calculate_row_from_buffers(
+        self,
+        index1: int,
+        ks_values: np.ndarray[float],
+        indptr: np.ndarray[int],
+    ) -> None:
+        for index2 in range(indptr[index1], indptr[index1 + 1]):
+            ks_values[index2] = self.calculate(
+                index1,
+                index2,
+            )
+
     @alphasynchro.performance.compiling.njit(nogil=True)
     def calculate_from_buffers(
         self,
@@ -106,6 +247,68 @@ class KSTester1DMultithreadedInterface:
         )
         ks_values[index] = ks_value
 
+    def calculate_all_with_statistics(
+        self,
+        paired_indices: np.ndarray[int, int],
+    ) -> tuple[np.ndarray[float], dict]:
+        ks_values = np.empty(len(paired_indices))
+        scanned_sizes = np.empty(len(paired_indices), dtype=np.int64)
+        overlap_sizes = np.empty(len(paired_indices), dtype=np.int64)
+        alphasynchro.performance.multithreading.parallel(
+            self.calculate_with_statistics_from_buffers
+        )(
+            range(len(ks_values)),
+            ks_values,
+            scanned_sizes,
+            overlap_sizes,
+            paired_indices,
+        )
+        statistics = summarize_scan_statistics(
+            ks_values,
+            scanned_sizes,
+            overlap_sizes,
+        )
+        return ks_values, statistics
+
+    @alphasynchro.performance.compiling.njit(nogil=True)
+    def calculate_with_statistics_from_buffers(
+        self,
+        index: int,
+        ks_values: np.ndarray[float],
+        scanned_sizes: np.ndarray[int],
+        overlap_sizes: np.ndarray[int],
+        paired_indices: np.ndarray[int, int],
+    ) -> None:
+        index1, index2 = paired_indices[index]
+        (
+            ks_values[index],
+            scanned_sizes[index],
+            overlap_sizes[index],
+        ) = self.calculate_with_statistics(
+            index1,
+            index2,
+        )
+
+
+def summarize_scan_statistics(
+    ks_values: np.ndarray[float],
+    scanned_sizes: np.ndarray[int],
+    overlap_sizes: np.ndarray[int],
+) -> dict:
+    scanned_size = int(np.sum(scanned_sizes))
+    overlap_size = int(np.sum(overlap_sizes))
+    if overlap_size > 0:
+        avoided_fraction = 1 - scanned_size / overlap_size
+    else:
+        avoided_fraction = 0.
+    return {
+        "pair_count": len(ks_values),
+        "rejected_count": int(np.sum(ks_values == REJECTED_KS_VALUE)),
+        "scanned_size": scanned_size,
+        "overlap_size": overlap_size,
+        "avoided_fraction": avoided_fraction,
+    }
+
 
 @alphasynchro.performance.compiling.njit_dataclass
 class KSTester1DMultithreaded(KSTester1D, KSTester1DMultithreadedInterface):
@@ -125,18 +328,52 @@ class KSTester1DPaired(KSTester1D):
         index2: int,
     ) -> tuple[float, np.ndarray, np.ndarray]:
         cdf1 = self.cdf_with_offset.get_cdf(index1)
-        cdf2 = self.secondary_cdf_with_offset.get_cdf(index2)
         start_offset1 = self.cdf_with_offset.get_start_offset(index1)
+        return self.trim_left_edge_of_cdf_and_secondary_cdf(
+            cdf1,
+            start_offset1,
+            index2,
+        )
+
+    @alphasynchro.performance.compiling.njit(nogil=True)
+    def trim_left_edge_of_cdf_and_secondary_cdf(
+        self,
+        cdf1: np.ndarray,
+        start_offset1: int,
+        index2: int,
+    ) -> tuple[float, np.ndarray, np.ndarray]:
+        cdf2 = self.secondary_cdf_with_offset.get_cdf(index2)
         start_offset2 = self.secondary_cdf_with_offset.get_start_offset(index2)
-        if start_offset1 < start_offset2:
-            max_diff = cdf1[start_offset2 - start_offset1 - 1]
-            cdf1 = cdf1[start_offset2 - start_offset1:]
-        elif start_offset2 < start_offset1:
-            max_diff = cdf2[start_offset1 - start_offset2 - 1]
-            cdf2 = cdf2[start_offset1 - start_offset2:]
-        else:
-            max_diff = 0
-        return  max_diff, cdf1, cdf2
+        value_scale1, value_scale2 = self.get_value_scales()
+        return alphasynchro.stats.ks_1d.trim_left_edge_of_cdf_pair(
+            cdf1,
+            start_offset1,
+            cdf2,
+            start_offset2,
+            value_scale1,
+            value_scale2,
+        )
+
+    @alphasynchro.performance.compiling.njit(nogil=True)
+    def get_value_scales(self) -> tuple[float, float]:
+        return (
+            self.cdf_with_offset.value_scale,
+            self.secondary_cdf_with_offset.value_scale,
+        )
+
+    @alphasynchro.performance.compiling.njit(nogil=True)
+    def calculate_with_statistics_from_cdf(
+        self,
+        cdf1: np.ndarray,
+        start_offset1: int,
+        index2: int,
+    ) -> tuple[float, int, int]:
+        max_diff, cdf1, cdf2 = self.trim_left_edge_of_cdf_and_secondary_cdf(
+            cdf1,
+            start_offset1,
+            index2,
+        )
+        return self.compare_left_trimmed_cdfs(cdf1, cdf2, max_diff)
 
 
 @alphasynchro.performance.compiling.njit_dataclass
@@ -148,6 +385,102 @@ class KSTester1DPairedMultithreaded(
     pass
 
 
+@alphasynchro.performance.compiling.njit_dataclass
+class KSTester1DPairedBlockedMultithreaded(KSTester1DPairedMultithreaded):
+
+    def calculate_all(
+        self,
+        paired_indices: np.ndarray[int, int],
+        block_indptr: np.ndarray[int] = None,
+    ) -> np.ndarray[float]:
+        if block_indptr is None:
+            block_indptr = get_block_indptr(paired_indices[:, 0])
+        ks_values = np.empty(len(paired_indices))
+        alphasynchro.performance.multithreading.parallel(
+            self.calculate_block_from_buffers
+        )(
+            range(len(block_indptr) - 1),
+            ks_values,
+            paired_indices,
+            block_indptr,
+        )
+        return ks_values
+
+    @alphasynchro.performance.compiling.njit(nogil=True)
+    def calculate_block_from_buffers(
+        self,
+        block_index: int,
+        ks_values: np.ndarray[float],
+        paired_indices: np.ndarray[int, int],
+        block_indptr: np.ndarray[int],
+    ) -> None:
+        start = block_indptr[block_index]
+        end = block_indptr[block_index + 1]
+        if start == end:
+            return
+        index1 = paired_indices[start, 0]
+        cdf1 = np.copy(self.cdf_with_offset.get_cdf(index1))
+        start_offset1 = self.cdf_with_offset.get_start_offset(index1)
+        for index in range(start, end):
+            ks_value, _, _ = self.calculate_with_statistics_from_cdf(
+                cdf1,
+                start_offset1,
+                paired_indices[index, 1],
+            )
+            ks_values[index] = ks_value
+
+
+@alphasynchro.performance.compiling.njit_dataclass
+class KSTester1DSketchedPaired(KSTester1DPaired):
+
+    sketch: alphasynchro.stats.distributions.QuantileSketch
+    secondary_sketch: alphasynchro.stats.distributions.QuantileSketch
+    approximate: bool = False
+
+    @alphasynchro.performance.compiling.njit(nogil=True)
+    def calculate_with_statistics(
+        self,
+        index1: int,
+        index2: int,
+    ) -> tuple[float, int, int]:
+        sketch_size = self.sketch.get_sketch_size()
+        count_diff = self.calculate_sketched_count(index1, index2)
+        if (count_diff - 1) > self.threshold * sketch_size:
+            overlap_size = self.get_overlap_size(index1, index2)
+            return REJECTED_KS_VALUE, 0, overlap_size
+        if self.approximate and ((count_diff + 1) <= self.threshold * sketch_size):
+            overlap_size = self.get_overlap_size(index1, index2)
+            return count_diff / sketch_size, 0, overlap_size
+        max_diff, cdf1, cdf2 = self.trim_left_edge_of_cdfs(index1, index2)
+        return self.compare_left_trimmed_cdfs(cdf1, cdf2, max_diff)
+
+    @alphasynchro.performance.compiling.njit(nogil=True)
+    def calculate_sketched_count(self, index1: int, index2: int) -> int:
+        end_offset = min(
+            self.sketch.get_end_offset(index1),
+            self.secondary_sketch.get_end_offset(index2),
+        )
+        return alphasynchro.stats.ks_1d.get_sketched_ks_count(
+            self.sketch.get_positions(index1),
+            self.secondary_sketch.get_positions(index2),
+            end_offset,
+        )
+
+    @alphasynchro.performance.compiling.njit(nogil=True)
+    def calculate_approximately(self, index1: int, index2: int) -> float:
+        count_diff = self.calculate_sketched_count(index1, index2)
+        return count_diff / self.sketch.get_sketch_size()
+
+
+@alphasynchro.performance.compiling.njit_dataclass
+class KSTester1DSketchedPairedMultithreaded(
+    KSTester1DSketchedPaired,
+    KSTester1DMultithreadedInterface
+):
+
+    pass
+
+
 @alphasynchro.performance.compiling.njit_dataclass
 class KSTester1DNoOffsetPaired(KSTester1D):
 
@@ -156,12 +489,34 @@ class KSTester1DNoOffsetPaired(KSTester1D):
     threshold: float = 1.0
 
     @alphasynchro.performance.compiling.njit(nogil=True)
-    def calculate(self, index1: int, index2: int) -> float:
-        max_diff = 0
+    def calculate_with_statistics(
+        self,
+        index1: int,
+        index2: int,
+    ) -> tuple[float, int, int]:
+        max_diff = 0.
         cdf1 = self.cdf_with_offset.get_cdf(index1)
         cdf2 = self.secondary_cdf_with_offset.get_cdf(index2)
-        max_diff = self.check_overlapping_part_of_cdfs(cdf1, cdf2, max_diff)
-        return max_diff
+        overlap_size = min(len(cdf1), len(cdf2))
+        max_diff, scanned_size = self.scan_overlapping_part_of_cdfs(
+            cdf1,
+            cdf2,
+            max_diff,
+        )
+        return max_diff, scanned_size, overlap_size
+
+    @alphasynchro.performance.compiling.njit(nogil=True)
+    def get_overlap_size(self, index1: int, index2: int) -> int:
+        cdf1 = self.cdf_with_offset.get_cdf(index1)
+        cdf2 = self.secondary_cdf_with_offset.get_cdf(index2)
+        return min(len(cdf1), len(cdf2))
+
+    @alphasynchro.performance.compiling.njit(nogil=True)
+    def get_value_scales(self) -> tuple[float, float]:
+        return (
+            self.cdf_with_offset.value_scale,
+            self.secondary_cdf_with_offset.value_scale,
+        )
 
 
 @alphasynchro.performance.compiling.njit_dataclass
@@ -171,3 +526,203 @@ class KSTester1DNoOffsetPairedMultithreaded(
 ):
 
     pass
+
+
+@alphasynchro.performance.compiling.njit_dataclass
+class KSTester1DFusedPaired:
+
+    first_ks_tester: KSTester1DPaired
+    second_ks_tester: KSTester1DPaired
+    first_threshold: float = np.inf
+
+    @alphasynchro.performance.compiling.njit(nogil=True)
+    def calculate(self, index1: int, index2: int) -> tuple[float, float]:
+        first_ks_value = self.first_ks_tester.calculate(index1, index2)
+        if first_ks_value > self.first_threshold:
+            return first_ks_value, REJECTED_KS_VALUE
+        second_ks_value = self.second_ks_tester.calculate(index1, index2)
+        return first_ks_value, second_ks_value
+
+    @alphasynchro.performance.compiling.njit(nogil=True)
+    def calculate_with_statistics(
+        self,
+        index1: int,
+        index2: int,
+    ) -> tuple[float, float, int, int, int, int]:
+        (
+            first_ks_value,
+            first_scanned_size,
+            first_overlap_size,
+        ) = self.first_ks_tester.calculate_with_statistics(index1, index2)
+        if first_ks_value > self.first_threshold:
+            second_ks_value = REJECTED_KS_VALUE
+            second_scanned_size = 0
+            second_overlap_size = self.second_ks_tester.get_overlap_size(
+                index1,
+                index2,
+            )
+        else:
+            (
+                second_ks_value,
+                second_scanned_size,
+                second_overlap_size,
+            ) = self.second_ks_tester.calculate_with_statistics(index1, index2)
+        return (
+            first_ks_value,
+            second_ks_value,
+            first_scanned_size,
+            first_overlap_size,
+            second_scanned_size,
+            second_overlap_size,
+        )
+
+
+@alphasynchro.performance.compiling.njit_dataclass
+class KSTester1DFusedPairedMultithreaded(KSTester1DFusedPaired):
+
+    def calculate_all(
+        self,
+        paired_indices: np.ndarray[int, int],
+    ) -> tuple[np.ndarray[float], np.ndarray[float]]:
+        first_ks_values = np.empty(len(paired_indices))
+        second_ks_values = np.empty(len(paired_indices))
+        alphasynchro.performance.multithreading.parallel(
+            self.calculate_from_buffers
+        )(
+            range(len(paired_indices)),
+            first_ks_values,
+            second_ks_values,
+            paired_indices,
+        )
+        return first_ks_values, second_ks_values
+
+    @alphasynchro.performance.compiling.njit(nogil=True)
+    def calculate_from_buffers(
+        self,
+        index: int,
+        first_ks_values: np.ndarray[float],
+        second_ks_values: np.ndarray[float],
+        paired_indices: np.ndarray[int, int],
+    ) -> None:
+        index1, index2 = paired_indices[index]
+        first_ks_value, second_ks_value = self.calculate(
+            index1,
+            index2,
+        )
+        first_ks_values[index] = first_ks_value
+        second_ks_values[index] = second_ks_value
+
+    def calculate_all_with_statistics(
+        self,
+        paired_indices: np.ndarray[int, int],
+    ) -> tuple[np.ndarray[float], np.ndarray[float], dict, dict]:
+        first_ks_values = np.empty(len(paired_indices))
+        second_ks_values = np.empty(len(paired_indices))
+        sizes = np.empty((len(paired_indices), 4), dtype=np.int64)
+        alphasynchro.performance.multithreading.parallel(
+            self.calculate_with_statistics_from_buffers
+        )(
+            range(len(paired_indices)),
+            first_ks_values,
+            second_ks_values,
+            sizes,
+            paired_indices,
+        )
+        first_statistics = summarize_scan_statistics(
+            first_ks_values,
+            sizes[:, 0],
+            sizes[:, 1],
+        )
+        second_statistics = summarize_scan_statistics(
+            second_ks_values,
+            sizes[:, 2],
+            sizes[:, 3],
+        )
+        return (
+            first_ks_values,
+            second_ks_values,
+            first_statistics,
+            second_statistics,
+        )
+
+    @alphasynchro.performance.compiling.njit(nogil=True)
+    def calculate_with_statistics_from_buffers(
+        self,
+        index: int,
+        first_ks_values: np.ndarray[float],
+        second_ks_values: np.ndarray[float],
+        sizes: np.ndarray[int, int],
+        paired_indices: np.ndarray[int, int],
+    ) -> None:
+        index1, index2 = paired_indices[index]
+        (
+            first_ks_values[index],
+            second_ks_values[index],
+            sizes[index, 0],
+            sizes[index, 1],
+            sizes[index, 2],
+            sizes[index, 3],
+        ) = self.calculate_with_statistics(
+            index1,
+            index2,
+        )
+
+
+@alphasynchro.performance.compiling.njit_dataclass
+class KSTester1DFusedPairedBlockedMultithreaded(KSTester1DFusedPairedMultithreaded):
+
+    def calculate_all(
+        self,
+        paired_indices: np.ndarray[int, int],
+        block_indptr: np.ndarray[int] = None,
+    ) -> tuple[np.ndarray[float], np.ndarray[float]]:
+        if block_indptr is None:
+            block_indptr = get_block_indptr(paired_indices[:, 0])
+        first_ks_values = np.empty(len(paired_indices))
+        second_ks_values = np.empty(len(paired_indices))
+        alphasynchro.performance.multithreading.parallel(
+            self.calculate_block_from_buffers
+        )(
+            range(len(block_indptr) - 1),
+            first_ks_values,
+            second_ks_values,
+            paired_indices,
+            block_indptr,
+        )
+        return first_ks_values, second_ks_values
+
+    @alphasynchro.performance.compiling.njit(nogil=True)
+    def calculate_block_from_buffers(
+        self,
+        block_index: int,
+        first_ks_values: np.ndarray[float],
+        second_ks_values: np.ndarray[float],
+        paired_indices: np.ndarray[int, int],
+        block_indptr: np.ndarray[int],
+    ) -> None:
+        start = block_indptr[block_index]
+        end = block_indptr[block_index + 1]
+        if start == end:
+            return
+        index1 = paired_indices[start, 0]
+        first_cdf = np.copy(self.first_ks_tester.cdf_with_offset.get_cdf(index1))
+        first_start_offset = self.first_ks_tester.cdf_with_offset.get_start_offset(index1)
+        second_cdf = np.copy(self.second_ks_tester.cdf_with_offset.get_cdf(index1))
+        second_start_offset = self.second_ks_tester.cdf_with_offset.get_start_offset(index1)
+        for index in range(start, end):
+            index2 = paired_indices[index, 1]
+            first_ks_value, _, _ = self.first_ks_tester.calculate_with_statistics_from_cdf(
+                first_cdf,
+                first_start_offset,
+                index2,
+            )
+            first_ks_values[index] = first_ks_value
+            if first_ks_value > self.first_threshold:
+                second_ks_values[index] = REJECTED_KS_VALUE
+                continue
+            second_ks_value, _, _ = self.second_ks_tester.calculate_with_statistics_from_cdf(
+                second_cdf,
+                second_start_offset,
+                index2,
+            )
+            second_ks_values[index] = second_ks_value
@@ -0,0 +1,19 @@
+# external
+import pytest
+
+# local
+import synthetic_clusters
+
+
+@pytest.fixture(scope="session")
+def synthetic_cluster_file_name(tmp_path_factory):
+    generator = synthetic_clusters.SyntheticClusterGenerator(
+        cycle_count=20,
+        frame_group_count=2,
+        scan_count=50,
+        precursor_count=60,
+        noise_fragment_count=100,
+    )
+    return generator.write(
+        str(tmp_path_factory.mktemp("synthetic") / "clusters.hdf")
+    )
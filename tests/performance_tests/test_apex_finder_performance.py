@@ -0,0 +1,65 @@
+# builtin
+import time
+
+# external
+import numpy as np
+
+# local
+import alphasynchro.stats.apex_finder
+import alphasynchro.stats.distributions
+
+
+def create_cdf(precursor_count, seed=0):
+    generator = np.random.default_rng(seed)
+    sizes = generator.integers(20, 150, precursor_count)
+    indptr = np.zeros(precursor_count + 1, dtype=np.int64)
+    indptr[1:] = np.cumsum(sizes)
+    values = np.concatenate(
+        [np.cumsum(generator.random(size)) for size in sizes]
+    )
+    values /= np.repeat(values[indptr[1:] - 1], sizes)
+    return alphasynchro.stats.distributions.CDFWithOffsetAndSummedValues(
+        indptr=indptr,
+        values=values,
+        start_offsets=generator.integers(0, 700, precursor_count),
+        summed_values=generator.random(precursor_count),
+    )
+
+
+def calculate_all_with_scipy(apex_finder):
+    apices = np.full(apex_finder.cdf.shape[0], -1, dtype=np.int64)
+    for index in range(apex_finder.cdf.shape[0]):
+        if apex_finder.cdf.get_summed_value(index) > 0:
+            smooth_distribution = apex_finder.cdf.smooth(
+                index,
+                apex_finder.smooth_array,
+            )
+            apices[index] = np.argmax(smooth_distribution) + apex_finder.cdf.start_offsets[index]
+    return apices
+
+
+def time_function(func, *args, repeats=3):
+    result = func(*args)
+    elapsed_times = []
+    for _ in range(repeats):
+        start_time = time.perf_counter()
+        func(*args)
+        elapsed_times.append(time.perf_counter() - start_time)
+    return result, min(elapsed_times)
+
+
+def test_calculate_all_performance():
+    apex_finder = alphasynchro.stats.apex_finder.SmoothApexFinder(
+        cdf=create_cdf(50000),
+    )
+    expected, scipy_time = time_function(
+        calculate_all_with_scipy,
+        apex_finder,
+        repeats=1,
+    )
+    output, njit_time = time_function(apex_finder.calculate_all)
+    print(
+        f"\nSmoothApexFinder.calculate_all for {apex_finder.cdf.shape[0]} cdfs: "
+        f"{scipy_time:.4f} s with scipy, {njit_time:.4f} s compiled"
+    )
+    assert np.array_equal(output, expected)
@@ -0,0 +1,86 @@
+# builtin
+import time
+
+# external
+import numpy as np
+import pytest
+
+# local
+import alphasynchro.ms.dimensions.mz_matching
+
+
+def create_push_mz_values(peak_count, mz_width, seed=0):
+    generator = np.random.default_rng(seed)
+    mz_values = np.sort(generator.uniform(400, 400 + mz_width, peak_count))
+    return mz_values
+
+
+def match_with_generator(mz_values1, mz_values2, ppm_tolerance):
+    matches = []
+    for pair in alphasynchro.ms.dimensions.mz_matching.match_mz_arrays(
+        mz_values1,
+        mz_values2,
+        ppm_tolerance,
+    ):
+        matches.append(pair)
+    return np.array(matches, dtype=np.int64).reshape(-1, 2)
+
+
+def match_batched(mz_values1, mz_values2, ppm_tolerance):
+    return alphasynchro.ms.dimensions.mz_matching.match_mz_arrays_batched(
+        mz_values1,
+        mz_values2,
+        ppm_tolerance,
+    )
+
+
+def match_with_window_reference(mz_values1, mz_values2, ppm_tolerance):
+    matches = []
+    for index1, mz_value1 in enumerate(mz_values1):
+        ppm_differences = (mz_values2 - mz_value1) * 2 / (mz_values2 + mz_value1) * 10**6
+        for index2 in np.flatnonzero(np.abs(ppm_differences) <= ppm_tolerance):
+            matches.append((index1, index2))
+    return np.array(matches, dtype=np.int64).reshape(-1, 2)
+
+
+def time_function(func, *args, repeats=5):
+    result = func(*args)
+    elapsed_times = []
+    for _ in range(repeats):
+        start_time = time.perf_counter()
+        func(*args)
+        elapsed_times.append(time.perf_counter() - start_time)
+    return result, min(elapsed_times)
+
+
+@pytest.mark.parametrize(
+    "name, peak_count, mz_width",
+    [
+        ("sparse", 100, 5),
+        ("dense", 10**4, 10),
+    ]
+)
+def test_match_mz_arrays_performance(name, peak_count, mz_width):
+    mz_values1 = create_push_mz_values(peak_count, mz_width, seed=1)
+    mz_values2 = create_push_mz_values(peak_count, mz_width, seed=2)
+    generator_matches, generator_time = time_function(
+        match_with_generator,
+        mz_values1,
+        mz_values2,
+        50,
+    )
+    batched_matches, batched_time = time_function(
+        match_batched,
+        mz_values1,
+        mz_values2,
+        50,
+    )
+    expected_matches = match_with_window_reference(mz_values1, mz_values2, 50)
+    # the generator stops once mz_values2 is exhausted and misses later pairs within the window
+    print(
+        f"{name}: {len(batched_matches)} matches "
+        f"({len(expected_matches) - len(generator_matches)} missed by the generator), "
+        f"generator {generator_time:.6f}s, "
+        f"batched {batched_time:.6f}s"
+    )
+    assert np.array_equal(batched_matches, expected_matches)
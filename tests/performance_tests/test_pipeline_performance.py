@@ -0,0 +1,108 @@
+# builtin
+import collections
+import os
+
+# external
+import numpy as np
+import pytest
+
+# local
+import alphasynchro.algorithms.pipeline
+import alphasynchro.performance.instrumentation
+import synthetic_clusters
+
+
+SCALES = {
+    "small": dict(
+        cycle_count=50,
+        precursor_count=200,
+        noise_fragment_count=500,
+    ),
+    "medium": dict(
+        cycle_count=100,
+        precursor_count=1000,
+        noise_fragment_count=2500,
+    ),
+    "large": dict(
+        cycle_count=200,
+        scan_count=200,
+        precursor_count=4000,
+        noise_fragment_count=10000,
+        im_width=20,
+    ),
+}
+STAGES = [
+    "load_peaks",
+    "calibrate",
+    "calculate_transitions_of_frame",
+    "create_ms2_spectra",
+    "write_ms2_spectra",
+]
+KERNELS = {
+    "calibration": "alphasynchro.algorithms.calibration.",
+    "matching": "alphasynchro.algorithms.matching.matching.",
+    "slicing": "alphasynchro.algorithms.precursor_slicing.",
+    "ks": "alphasynchro.stats.ks_1d.",
+    "merging": "alphasynchro.ms.transitions.merged_transitions.",
+    "merged fragments": "alphasynchro.ms.peaks.merged_fragments.",
+    "filtering": "alphasynchro.ms.transitions.frame_transitions.",
+}
+
+
+@pytest.fixture(scope="module", params=list(SCALES))
+def benchmark_report(request, tmp_path_factory):
+    scale = request.param
+    folder = str(tmp_path_factory.mktemp(scale))
+    generator = synthetic_clusters.SyntheticClusterGenerator(**SCALES[scale])
+    cluster_file_name = generator.write(os.path.join(folder, "clusters.hdf"))
+    pipeline = alphasynchro.algorithms.pipeline.Pipeline(
+        os.path.join(folder, "analysis.hdf"),
+        overwrite=True,
+    )
+    with alphasynchro.performance.instrumentation.report(
+        os.path.join(folder, "benchmark_report.json"),
+        name=scale,
+    ) as report:
+        pipeline.run(cluster_file_name)
+        pipeline.write_ms2_spectra(os.path.join(folder, "spectra.mgf"))
+    return scale, generator, pipeline, report
+
+
+def collect_records(record, kind):
+    records = collections.defaultdict(list)
+    if record["kind"] == kind:
+        records[record["name"]].append(record)
+    for child in record["children"]:
+        for name, child_records in collect_records(child, kind).items():
+            records[name].extend(child_records)
+    return records
+
+
+def test_stage_performance(benchmark_report):
+    scale, generator, pipeline, report = benchmark_report
+    stages = collect_records(report, "stage")
+    print(f"\n{scale} ({generator.precursor_count} precursors, {generator.cycle_count} cycles):")
+    for name in STAGES:
+        wall_time = sum(record["wall_time"] for record in stages[name])
+        peak_rss = max(record["peak_rss"] for record in stages[name])
+        print(f"{name:>32}: {wall_time:8.3f} s, peak rss {peak_rss / 1024**2:8.1f} Mb")
+    assert pipeline.transitions.indptr[-1] > 0
+
+
+def test_kernel_performance(benchmark_report):
+    scale, generator, pipeline, report = benchmark_report
+    kernels = collect_records(report, "parallel")
+    print(f"\n{scale} ({generator.precursor_count} precursors, {generator.cycle_count} cycles):")
+    for kernel, prefix in KERNELS.items():
+        records = [
+            record for name, records in kernels.items() if name.startswith(prefix)
+            for record in records
+        ]
+        assert len(records) > 0
+        wall_time = sum(record["wall_time"] for record in records)
+        item_count = sum(record["item_count"] for record in records)
+        print(
+            f"{kernel:>32}: {wall_time:8.3f} s for {item_count} items "
+            f"in {len(records)} calls"
+        )
+
@@ -0,0 +1,140 @@
+# builtin
+import time
+
+# external
+import numpy as np
+import pytest
+
+# local
+import alphasynchro.algorithms.calibration
+import alphasynchro.algorithms.precursor_slicing
+import alphasynchro.data.dataframe
+import alphasynchro.data.sparse_indices
+import alphasynchro.ms.peaks.precursors
+import alphasynchro.stats.apex_finder
+import alphasynchro.stats.distributions
+
+
+def create_precursors(precursor_count, scan_count, seed=0):
+    generator = np.random.default_rng(seed)
+    sizes = generator.integers(20, 150, precursor_count)
+    indptr = np.zeros(precursor_count + 1, dtype=np.int64)
+    indptr[1:] = np.cumsum(sizes)
+    values = np.concatenate(
+        [np.cumsum(generator.random(size)) for size in sizes]
+    )
+    values /= np.repeat(values[indptr[1:] - 1], sizes)
+    start_offsets = generator.integers(0, scan_count - sizes)
+    projection = alphasynchro.stats.distributions.CDFWithOffset(
+        indptr=indptr,
+        values=values,
+        start_offsets=start_offsets,
+    )
+    return alphasynchro.ms.peaks.precursors.Precursors(
+        raw_pointers=alphasynchro.data.sparse_indices.SparseIndex(
+            indptr=np.arange(precursor_count + 1),
+            values=np.arange(precursor_count),
+        ),
+        rt_projection=projection,
+        im_projection=projection,
+        aggregate_data=alphasynchro.data.dataframe.DataFrame(
+            mz_weighted_average=generator.uniform(400, 1200, precursor_count),
+            charge=generator.integers(2, 4, precursor_count),
+        ),
+    )
+
+
+def create_cycle(frame_count, scan_count, window_width=25):
+    cycle = np.zeros((1, frame_count, scan_count, 2))
+    scan_fraction = np.arange(scan_count) / (scan_count - 1)
+    for frame in range(1, frame_count):
+        centers = 400 + (frame - 1 + scan_fraction) * 800 / (frame_count - 1)
+        cycle[0, frame, :, 0] = centers - window_width / 2
+        cycle[0, frame, :, 1] = centers + window_width / 2
+    return cycle
+
+
+@pytest.fixture(scope="module")
+def slicing_data():
+    scan_count = 900
+    cycle = create_cycle(9, scan_count)
+    precursors = create_precursors(20000, scan_count)
+    calibration = alphasynchro.algorithms.calibration.TransmissionCalibrator(
+        indexed_efficiency=np.random.default_rng(1).random((2, 1000)),
+        decimals=1,
+    )
+    return precursors, calibration, cycle
+
+
+def time_function(func, *args, repeats=5):
+    result = func(*args)
+    elapsed_times = []
+    for _ in range(repeats):
+        start_time = time.perf_counter()
+        func(*args)
+        elapsed_times.append(time.perf_counter() - start_time)
+    return result, min(elapsed_times)
+
+
+@pytest.mark.parametrize(
+    "diapasef",
+    [False, True]
+)
+def test_calculate_all_transmitted_cdf_for_frame_performance(slicing_data, diapasef):
+    precursors, calibration, cycle = slicing_data
+    slicer = alphasynchro.algorithms.precursor_slicing.SlicedIMDistributionMultithreaded(
+        precursors=precursors,
+        calibration=calibration,
+        cycle_center=(np.sum(cycle, axis=-1) / 2)[0],
+        cycle=cycle,
+        diapasef=diapasef,
+    )
+    frame = 4
+    transmitted_cdf, elapsed_time = time_function(
+        slicer.calculate_all_transmitted_cdf_for_frame,
+        frame,
+    )
+    print(
+        f"\ncalculate_all_transmitted_cdf_for_frame (diapasef={diapasef}): "
+        f"{elapsed_time:.4f} s for {len(precursors)} precursors "
+        f"and {len(transmitted_cdf.values)} scans"
+    )
+    for index in range(0, len(precursors), 997):
+        expected = slicer.get_transmitted_projection_cdf(index, frame)
+        assert np.array_equal(transmitted_cdf.get_cdf(index), expected)
+
+
+def calculate_cdf_and_apices_separately(slicer, frame):
+    transmitted_cdf = slicer.calculate_all_transmitted_cdf_for_frame(frame)
+    apices = alphasynchro.stats.apex_finder.SmoothApexFinder(
+        cdf=transmitted_cdf,
+    ).calculate_all()
+    return transmitted_cdf, apices
+
+
+def test_calculate_all_transmitted_cdf_and_apices_for_frame_performance(slicing_data):
+    precursors, calibration, cycle = slicing_data
+    slicer = alphasynchro.algorithms.precursor_slicing.SlicedIMDistributionMultithreaded(
+        precursors=precursors,
+        calibration=calibration,
+        cycle_center=(np.sum(cycle, axis=-1) / 2)[0],
+        cycle=cycle,
+        diapasef=False,
+    )
+    frame = 4
+    (expected_cdf, expected_apices), separate_time = time_function(
+        calculate_cdf_and_apices_separately,
+        slicer,
+        frame,
+        repeats=1,
+    )
+    (transmitted_cdf, apices), fused_time = time_function(
+        slicer.calculate_all_transmitted_cdf_and_apices_for_frame,
+        frame,
+    )
+    print(
+        f"\nslicing and apex finding for {len(precursors)} precursors: "
+        f"{separate_time:.4f} s separately, {fused_time:.4f} s in one pass"
+    )
+    assert np.array_equal(transmitted_cdf.values, expected_cdf.values)
+    assert np.array_equal(apices, expected_apices)
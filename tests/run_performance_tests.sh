@@ -0,0 +1,3 @@
+conda activate alphasynchro_testing
+python -m pytest -s ./performance_tests
+conda deactivate
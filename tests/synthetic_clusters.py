@@ -0,0 +1,206 @@
+#!python
+'''Module to generate synthetic cluster hdf files.'''
+
+
+# builtin
+import dataclasses
+
+# external
+import numpy as np
+
+# local
+import alphasynchro.algorithms.matching.matching
+import alphasynchro.io.hdf
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class SyntheticClusterGenerator:
+
+    cycle_count: int = 50
+    frame_group_count: int = 4
+    scan_count: int = 100
+    precursor_count: int = 200
+    fragments_per_precursor: int = 10
+    noise_fragment_count: int = 500
+    unfragmented_ratio: float = 0.5
+    rt_width: int = 5
+    im_width: int = 10
+    window_width: float = 25.
+    min_mz: float = 400.
+    max_mz: float = 1200.
+    pointers_per_push: int = 10
+    seed: int = 0
+
+    def __post_init__(self):
+        object.__setattr__(self, "random", np.random.default_rng(self.seed))
+
+    @property
+    def frame_count(self) -> int:
+        return self.frame_group_count + 1
+
+    @property
+    def push_count(self) -> int:
+        return self.cycle_count * self.frame_count * self.scan_count
+
+    def create_cycle(self) -> np.ndarray:
+        cycle = np.zeros((1, self.frame_count, self.scan_count, 2))
+        span = (self.max_mz - self.min_mz) / self.frame_group_count
+        scan_fraction = np.arange(self.scan_count) / (self.scan_count - 1)
+        for frame in range(1, self.frame_count):
+            centers = self.min_mz + (frame - 1 + scan_fraction) * span
+            cycle[0, frame, :, 0] = centers - self.window_width / 2
+            cycle[0, frame, :, 1] = centers + self.window_width / 2
+        return cycle
+
+    def create_projection(self, apex, width, length, pdf=None):
+        bins = np.arange(length)
+        if pdf is None:
+            pdf = np.exp(-(bins - apex)**2 / (2 * (width / 3)**2))
+        pdf[pdf < 10**-3 * np.max(pdf)] = 0
+        nonzero = np.flatnonzero(pdf)
+        if len(nonzero) == 0:
+            nonzero = np.array([min(max(apex, 0), length - 1)])
+            pdf = np.zeros(length)
+            pdf[nonzero] = 1
+        start, end = nonzero[0], nonzero[-1] + 1
+        cdf = np.cumsum(pdf[start: end])
+        return start, cdf / cdf[-1], np.sum(pdf[start: end])
+
+    def create_clusters(self) -> dict:
+        cycle = self.create_cycle()
+        clusters = {
+            "rt_apex": [],
+            "im_apex": [],
+            "frame_group": [],
+            "mz": [],
+            "intensity": [],
+            "rt_projection": [],
+            "im_projection": [],
+            "is_precursor": [],
+            "charge": [],
+        }
+
+        def add_cluster(rt_apex, im_pdf, frame, mz, intensity, is_precursor, charge):
+            im_start, im_cdf, im_sum = self.create_projection(
+                0, 0, self.scan_count, im_pdf
+            )
+            rt_start, rt_cdf, _ = self.create_projection(
+                rt_apex, self.rt_width, self.cycle_count
+            )
+            clusters["rt_apex"].append(rt_apex)
+            clusters["im_apex"].append(im_start + np.searchsorted(im_cdf, .5))
+            clusters["frame_group"].append(frame)
+            clusters["mz"].append(mz)
+            clusters["intensity"].append(intensity * im_sum)
+            clusters["rt_projection"].append((rt_start, rt_cdf))
+            clusters["im_projection"].append((im_start, im_cdf))
+            clusters["is_precursor"].append(is_precursor)
+            clusters["charge"].append(charge)
+
+        scans = np.arange(self.scan_count)
+        for _ in range(self.precursor_count):
+            mz = self.random.uniform(self.min_mz, self.max_mz)
+            charge = self.random.integers(2, 4)
+            rt_apex = self.random.integers(self.rt_width, self.cycle_count - self.rt_width)
+            im_apex = self.random.integers(self.im_width, self.scan_count - self.im_width)
+            intensity = self.random.lognormal(10, 1)
+            im_pdf = np.exp(-(scans - im_apex)**2 / (2 * (self.im_width / 3)**2))
+            add_cluster(rt_apex, im_pdf.copy(), 0, mz, intensity, True, charge)
+            for frame in range(1, self.frame_count):
+                transmitted = (cycle[0, frame, :, 0] <= mz) & (mz <= cycle[0, frame, :, 1])
+                transmitted_pdf = im_pdf * transmitted
+                if np.sum(transmitted_pdf) < 10**-2 * np.sum(im_pdf):
+                    continue
+                max_fragment_mz = (
+                    mz - alphasynchro.algorithms.matching.matching.PROTON_MASS
+                ) * charge + alphasynchro.algorithms.matching.matching.PROTON_MASS
+                fragment_mzs = self.random.uniform(150, max_fragment_mz, self.fragments_per_precursor)
+                if self.random.random() < self.unfragmented_ratio:
+                    fragment_mzs[0] = mz
+                for fragment_mz in fragment_mzs:
+                    add_cluster(
+                        rt_apex,
+                        transmitted_pdf.copy(),
+                        frame,
+                        fragment_mz,
+                        intensity * self.random.uniform(.05, 1),
+                        False,
+                        0,
+                    )
+        for _ in range(self.noise_fragment_count):
+            im_apex = self.random.integers(0, self.scan_count)
+            add_cluster(
+                self.random.integers(0, self.cycle_count),
+                np.exp(-(scans - im_apex)**2 / (2 * (self.im_width / 3)**2)),
+                self.random.integers(1, self.frame_count),
+                self.random.uniform(150, self.max_mz),
+                self.random.lognormal(9, 1),
+                False,
+                0,
+            )
+        arrays = {}
+        for key, value in clusters.items():
+            if key.endswith("projection"):
+                array = np.empty(len(value), dtype=object)
+                for index, item in enumerate(value):
+                    array[index] = item
+                arrays[key] = array
+            else:
+                arrays[key] = np.array(value)
+        return cycle, arrays
+
+    def write(self, file_name: str) -> str:
+        cycle, clusters = self.create_clusters()
+        push_apices = (
+            clusters["rt_apex"] * self.frame_count + clusters["frame_group"]
+        ) * self.scan_count + clusters["im_apex"]
+        order = np.lexsort((clusters["mz"], push_apices))
+        clusters = {key: value[order] for key, value in clusters.items()}
+        push_apices = push_apices[order]
+        hdf = alphasynchro.io.hdf.HDFObject.from_file(file_name, new=True)
+        hdf.set_attr("sample_name", "synthetic_sample")
+        acquisition = hdf.set_group("acquisition")
+        acquisition.set_mmap("cycle", cycle)
+        acquisition.set_mmap(
+            "tof_indptr",
+            np.arange(self.push_count + 1, dtype=np.int64) * self.pointers_per_push,
+        )
+        clustering = hdf.set_group("clustering")
+        for name in ["rt_projection", "im_projection"]:
+            group = clustering.set_group(name)
+            starts = np.array([start for start, _ in clusters[name]], dtype=np.int64)
+            values = [cdf for _, cdf in clusters[name]]
+            indptr = np.zeros(len(values) + 1, dtype=np.int64)
+            indptr[1:] = np.cumsum([len(value) for value in values])
+            group.set_mmap("indptr", indptr)
+            group.set_mmap("start_index", starts)
+            group.set_mmap("summed_intensity_values", np.concatenate(values))
+        cluster_count = len(push_apices)
+        raw_pointers = clustering.set_group("raw_pointers")
+        raw_pointers.set_mmap("indptr", np.arange(cluster_count + 1, dtype=np.int64))
+        raw_pointers.set_mmap("indices", np.arange(cluster_count, dtype=np.int64))
+        as_dataframe = clustering.set_group("as_dataframe")
+        as_dataframe.set_mmap("apex_pointer", push_apices * self.pointers_per_push)
+        as_dataframe.set_mmap("frame_group", clusters["frame_group"].astype(np.int64))
+        as_dataframe.set_mmap("im_weighted_average", clusters["im_apex"] / self.scan_count)
+        as_dataframe.set_mmap("rt_weighted_average", clusters["rt_apex"].astype(np.float64))
+        as_dataframe.set_mmap("mz_weighted_average", clusters["mz"].astype(np.float64))
+        as_dataframe.set_mmap("number_of_ions", np.full(cluster_count, 10, dtype=np.int64))
+        as_dataframe.set_mmap("summed_intensity", clusters["intensity"].astype(np.float64))
+        precursor_pointers = np.flatnonzero(clusters["is_precursor"])
+        ms1 = hdf.set_group("ms1")
+        ms1.set_group("precursors").set_mmap("cluster_pointers", precursor_pointers)
+        monoisotopic = ms1.set_group("monoisotopic_precursors").set_group("as_dataframe")
+        monoisotopic.set_mmap("charge", clusters["charge"][precursor_pointers].astype(np.int64))
+        monoisotopic.set_mmap("precursor_pointers", np.arange(len(precursor_pointers), dtype=np.int64))
+        ms2 = hdf.set_group("ms2")
+        ms2.set_group("fragments").set_mmap(
+            "cluster_pointers",
+            np.flatnonzero(~clusters["is_precursor"]),
+        )
+        return file_name
+
+
+if __name__ == "__main__":
+    import sys
+    SyntheticClusterGenerator().write(sys.argv[1])
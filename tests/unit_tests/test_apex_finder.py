@@ -55,3 +55,57 @@ def test_calculate_all(apex_finder):
     output = apex_finder.calculate_all()
     expected = np.array([5, 5, -1])
     assert np.array_equal(output, expected)
+
+
+def test_calculate_all_selected(apex_finder):
+    output = apex_finder.calculate_all(np.array([1]))
+    expected = np.array([-1, 5, -1])
+    assert np.array_equal(output, expected)
+
+
+@pytest.mark.parametrize(
+    "size, smooth_sigma",
+    [
+        (1, 1),
+        (5, 3),
+        (40, 5),
+    ]
+)
+def test_convolve_same(size, smooth_sigma):
+    distribution = np.random.default_rng(0).random(size)
+    smooth_array = alphasynchro.stats.apex_finder.get_smooth_array(smooth_sigma)
+    output = alphasynchro.stats.apex_finder.convolve_same(distribution, smooth_array)
+    expected = scipy.signal.convolve(distribution, smooth_array, mode='same')
+    assert np.allclose(output, expected)
+    assert alphasynchro.stats.apex_finder.find_smooth_apex(
+        distribution,
+        smooth_array,
+    ) == np.argmax(expected)
+
+
+def test_calculate_all_matches_scipy_smoothing():
+    random = np.random.default_rng(0)
+    sizes = random.integers(1, 200, 500)
+    indptr = np.zeros(len(sizes) + 1, dtype=np.int64)
+    indptr[1:] = np.cumsum(sizes)
+    values = np.concatenate(
+        [np.cumsum(random.random(size)) for size in sizes]
+    )
+    values /= np.repeat(values[indptr[1:] - 1], sizes)
+    cdf = alphasynchro.stats.distributions.CDFWithOffsetAndSummedValues(
+        indptr=indptr,
+        values=values,
+        start_offsets=random.integers(0, 100, len(sizes)),
+        summed_values=random.random(len(sizes)) * (random.random(len(sizes)) > .1),
+    )
+    apex_finder = alphasynchro.stats.apex_finder.SmoothApexFinder(
+        cdf=cdf,
+    )
+    expected = np.full(len(sizes), -1)
+    for index in range(len(sizes)):
+        if cdf.summed_values[index] > 0:
+            expected[index] = np.argmax(
+                cdf.smooth(index, apex_finder.smooth_array)
+            ) + cdf.start_offsets[index]
+    output = apex_finder.calculate_all()
+    assert np.array_equal(output, expected)
@@ -2,9 +2,16 @@
 import numpy as np
 import pandas as pd
 import pytest
+import scipy.signal
 
 #local
 import alphasynchro.algorithms.calibration
+import alphasynchro.data.dataframe
+import alphasynchro.data.sparse_indices
+import alphasynchro.ms.peaks.fragments
+import alphasynchro.ms.peaks.indexed.mz_peaks
+import alphasynchro.ms.peaks.precursors
+import alphasynchro.stats.distributions
 
 
 @pytest.fixture(scope="module")
@@ -41,3 +48,196 @@ def calibrator():
 def test_get_efficiency(calibrator, input, expected):
     output = calibrator.get_efficiency(input)
     assert np.array_equal(output, expected)
+
+
+def test_get_efficiencies(calibrator):
+    mz_distances = np.array([.09, .19, .20, .30, 31, -.09, -.19, -.20, -.31, 0])
+    expected = np.array(
+        [calibrator.get_efficiency(mz_distance) for mz_distance in mz_distances]
+    )
+    output = calibrator.get_efficiencies(mz_distances)
+    assert np.array_equal(output, expected)
+
+
+def test_get_transmission_bounds(calibrator):
+    output = calibrator.get_transmission_bounds()
+    assert np.allclose(output, (-.4, .4))
+
+
+def create_peaks(peak_class, peak_count, scan_count, generator):
+    sizes = generator.integers(1, 60, peak_count)
+    indptr = np.zeros(peak_count + 1, dtype=np.int64)
+    indptr[1:] = np.cumsum(sizes)
+    values = np.concatenate(
+        [np.cumsum(generator.random(size)) for size in sizes]
+    )
+    values /= np.repeat(values[indptr[1:] - 1], sizes)
+    projection = alphasynchro.stats.distributions.CDFWithOffset(
+        indptr=indptr,
+        values=values,
+        start_offsets=generator.integers(0, scan_count - sizes),
+    )
+    return peak_class(
+        raw_pointers=alphasynchro.data.sparse_indices.SparseIndex(
+            indptr=np.arange(peak_count + 1),
+            values=np.arange(peak_count),
+        ),
+        rt_projection=projection,
+        im_projection=projection,
+        aggregate_data=alphasynchro.data.dataframe.DataFrame(
+            mz_weighted_average=generator.uniform(400, 1200, peak_count),
+            frame_group=generator.integers(1, 5, peak_count),
+        ),
+    )
+
+
+def calculate_efficiency(precursors, fragments, precursor_index, fragment_index, smooth_factor):
+    smooth_array = np.ones(smooth_factor) / smooth_factor
+    pdf = fragments.im_projection.get_pdf(fragment_index)
+    smooth = scipy.signal.convolve(pdf / np.max(pdf), smooth_array, mode="same")
+    start_offset = fragments.im_projection.get_start_offset(fragment_index)
+    precursor_pdf = precursors.im_projection.get_pdf(precursor_index)
+    precursor_smooth = scipy.signal.convolve(
+        precursor_pdf / np.max(precursor_pdf),
+        smooth_array,
+        mode="same",
+    )
+    precursor_start_offset = precursors.im_projection.get_start_offset(precursor_index)
+    efficiency = np.zeros(len(precursor_smooth))
+    for index in range(len(efficiency)):
+        smooth_index = index + precursor_start_offset - start_offset
+        if 0 <= smooth_index < len(smooth):
+            efficiency[index] = smooth[smooth_index]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return efficiency / precursor_smooth
+
+
+def test_unfragmented_efficiency_calculator():
+    generator = np.random.default_rng(0)
+    scan_count = 100
+    precursors = create_peaks(
+        alphasynchro.ms.peaks.precursors.Precursors, 50, scan_count, generator
+    )
+    fragments = create_peaks(
+        alphasynchro.ms.peaks.fragments.Fragments, 80, scan_count, generator
+    )
+    cycle_center = generator.uniform(400, 1200, (5, scan_count))
+    unfragmented_pairs = np.stack(
+        [generator.integers(0, 50, 200), generator.integers(0, 80, 200)],
+        axis=1,
+    )
+    calculator = alphasynchro.algorithms.calibration.UnfragmentedEfficiencyCalculator(
+        precursors=precursors,
+        fragments=fragments,
+        cycle_center=cycle_center,
+        smooth_array=np.ones(10) / 10,
+    )
+    efficiencies, mz_bins = calculator.calculate_all(unfragmented_pairs)
+    offset = 0
+    for precursor_index, fragment_index in unfragmented_pairs:
+        expected = calculate_efficiency(
+            precursors, fragments, precursor_index, fragment_index, 10
+        )
+        start = precursors.im_projection.get_start_offset(precursor_index)
+        end = precursors.im_projection.get_end_offset(precursor_index)
+        frame = fragments.aggregate_data.frame_group[fragment_index]
+        mz = precursors.aggregate_data.mz_weighted_average[precursor_index]
+        expected_mzs = np.round(cycle_center[frame, start: end] - mz, 1)
+        output = efficiencies[offset: offset + len(expected)]
+        assert np.allclose(output, expected, equal_nan=True)
+        assert np.array_equal(
+            np.isfinite(output),
+            np.isfinite(expected),
+        )
+        assert np.array_equal(mz_bins[offset: offset + len(expected)] / 10, expected_mzs)
+        offset += len(expected)
+    assert offset == len(efficiencies)
+
+
+def test_calculate_binned_medians():
+    generator = np.random.default_rng(0)
+    values = generator.random(1000)
+    values[generator.integers(0, 1000, 100)] = np.inf
+    values[generator.integers(0, 1000, 100)] = np.nan
+    bins = generator.integers(-30, 30, 1000)
+    bins[values == np.inf] = 100
+    unique_bins, medians = alphasynchro.algorithms.calibration.calculate_binned_medians(
+        values,
+        bins,
+    )
+    assert np.array_equal(unique_bins, np.unique(bins))
+    for mz_bin, median in zip(unique_bins, medians):
+        bin_values = values[bins == mz_bin]
+        bin_values = bin_values[np.isfinite(bin_values)]
+        if len(bin_values) == 0:
+            assert np.isnan(median)
+        else:
+            assert median == np.median(bin_values)
+
+
+def test_to_and_from_file(calibrator):
+    file_name = "sandbox_folder/calibration.hdf"
+    calibrator.to_file(file_name)
+    output = alphasynchro.algorithms.calibration.TransmissionCalibrator.from_file(
+        file_name
+    )
+    assert np.array_equal(output.indexed_efficiency, calibrator.indexed_efficiency)
+    assert np.array_equal(output.unfragmented_pairs, calibrator.unfragmented_pairs)
+    assert output.decimals == calibrator.decimals
+    assert output.get_efficiency(-.19) == calibrator.get_efficiency(-.19)
+
+
+def test_to_and_from_file_with_unfragmented_pairs(calibrator):
+    file_name = "sandbox_folder/calibration_with_pairs.hdf"
+    unfragmented_pairs = np.array([[0, 1], [2, 3], [4, 5]])
+    alphasynchro.algorithms.calibration.TransmissionCalibrator(
+        unfragmented_pairs=unfragmented_pairs,
+        indexed_efficiency=calibrator.indexed_efficiency,
+    ).to_file(file_name)
+    output = alphasynchro.algorithms.calibration.TransmissionCalibrator.from_file(
+        file_name
+    )
+    assert np.array_equal(output.unfragmented_pairs, unfragmented_pairs)
+    assert np.array_equal(output.indexed_efficiency, calibrator.indexed_efficiency)
+
+
+@pytest.mark.parametrize(
+    "indexed_efficiency, expected",
+    [
+        ([[1, .5, .2], [.9, .4, .1]], 0.),
+        ([[1, .5, .2], [.9, .4, .3]], .2),
+        ([[1, .5], [.9, .4]], .2),
+        ([[1, .5, .2, .1], [.9, .4, .1, 0]], .1),
+    ]
+)
+def test_get_drift(calibrator, indexed_efficiency, expected):
+    other = alphasynchro.algorithms.calibration.TransmissionCalibrator(
+        indexed_efficiency=np.array(indexed_efficiency),
+    )
+    assert np.isclose(calibrator.get_drift(other), expected)
+    assert np.isclose(other.get_drift(calibrator), expected)
+
+
+@pytest.mark.parametrize(
+    "cycle_count, expected_cycles",
+    [
+        (1, [0]),
+        (2, [0, 9]),
+        (4, [0, 3, 6, 9]),
+        (20, list(range(10))),
+    ]
+)
+def test_get_sampled_push_indices(cycle_count, expected_cycles):
+    indexed_peaks = alphasynchro.ms.peaks.indexed.mz_peaks.PushIndexedMzs(
+        indptr=np.zeros(10 * 2 * 3 + 1, dtype=np.int64),
+        values=np.array([], dtype=np.float64),
+        axis_shape=(10, 2, 3),
+    )
+    output = alphasynchro.algorithms.calibration.get_sampled_push_indices(
+        indexed_peaks,
+        cycle_count,
+    )
+    expected = np.concatenate(
+        [np.arange(cycle * 6, cycle * 6 + 6) for cycle in expected_cycles]
+    )
+    assert np.array_equal(output, expected)
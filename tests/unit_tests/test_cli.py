@@ -21,3 +21,9 @@ def test_write_mgf():
     runner = click.testing.CliRunner()
     result = runner.invoke(alphasynchro.cli.run, ["write_mgf"])
     assert result.exit_code == 0
+
+
+def test_benchmark_scaling():
+    runner = click.testing.CliRunner()
+    result = runner.invoke(alphasynchro.cli.run, ["benchmark", "scaling"])
+    assert result.exit_code == 0
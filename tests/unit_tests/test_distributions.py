@@ -280,3 +280,85 @@ def test_cdf_to_pdf(cdf, pdf):
 def test_pdf_to_cdf(cdf, pdf):
     new_cdf = pdf.to_cdf()
     assert new_cdf == cdf
+
+
+@pytest.mark.parametrize(
+    "dtype, expected_value_scale",
+    [
+        (np.float64, 1.0),
+        (np.float32, 1.0),
+        (np.uint16, 1 / 65535),
+    ]
+)
+def test_compress(cdf_with_offset, dtype, expected_value_scale):
+    output = cdf_with_offset.compress(dtype)
+    bound = alphasynchro.stats.distributions.get_ks_accuracy_bound(dtype)
+    assert output.values.dtype == dtype
+    assert output.value_scale == expected_value_scale
+    assert np.array_equal(output.start_offsets, cdf_with_offset.start_offsets)
+    for index in range(len(cdf_with_offset)):
+        decoded = output.get_cdf(index) * output.value_scale
+        expected = cdf_with_offset.get_cdf(index)
+        assert np.all(np.abs(decoded - expected) <= bound / 2)
+        assert np.allclose(output.get_pdf(index), cdf_with_offset.get_pdf(index), atol=bound)
+
+
+def test_filter_compressed(cdf_with_offset_and_summed_values):
+    compressed = cdf_with_offset_and_summed_values.compress(np.uint16)
+    output = compressed.filter(np.array([1, 2]))
+    assert output.values.dtype == np.uint16
+    assert output.value_scale == compressed.value_scale
+    assert np.array_equal(output.values, compressed.values[2: 6])
+
+
+def test_to_quantile_sketch(cdf_with_offset):
+    output = cdf_with_offset.to_quantile_sketch(4)
+    expected_positions = np.array(
+        [
+            [1, 1, 2, 2],
+            [1, 1, 1, 1],
+            [1, 1, 2, 2],
+            [2, 3, 3, 3],
+        ]
+    )
+    assert output.get_sketch_size() == 4
+    assert np.array_equal(output.positions, expected_positions)
+    assert np.array_equal(output.end_offsets, [3, 2, 3, 4])
+
+
+@pytest.mark.parametrize(
+    "input",
+    [
+        np.array([1., 0., 3., 4.]),
+        np.array([0., 0., 0.]),
+        np.array([.1, .2, .3, .4, .5, .6, .7]),
+        np.array([]),
+    ]
+)
+def test_convert_pdf_to_cdf_inplace(input):
+    expected = np.cumsum(input)
+    if len(expected) > 0 and expected[-1] > 0:
+        expected /= expected[-1]
+    output = input.copy()
+    alphasynchro.stats.distributions.convert_pdf_to_cdf_inplace(output)
+    assert np.array_equal(output, expected)
+
+
+def test_frame_profile_builder():
+    frame_values = np.array(
+        [
+            [1., 0., 2., .3, 0.],
+            [2., 0., 0., .1, 1.],
+            [3., 0., 5., .7, 0.],
+        ]
+    )
+    frame_count, row_count = frame_values.shape
+    output = alphasynchro.stats.distributions.FrameProfileBuilder(
+        frame_count=frame_count,
+    ).from_frame_values(frame_values)
+    expected = alphasynchro.stats.distributions.PDF(
+        indptr=np.arange(row_count + 1) * frame_count,
+        values=frame_values.T.ravel(),
+    ).to_cdf()
+    assert np.array_equal(output.indptr, expected.indptr)
+    assert np.array_equal(output.values, expected.values)
@@ -111,3 +111,24 @@ def test_filter(transitions, input, expected):
 def test_filter_weights(transitions, input, expected):
     output = transitions.filter_weights(input)
     assert output == expected
+
+
+def test_filter_combined_weights(transitions):
+    weights = alphasynchro.ms.transitions.frame_transitions.combine_weights(
+        rt_weights=transitions.weights,
+        im_weights=transitions.weights / 2,
+    )
+    assert weights.dtype == np.float32
+    assert np.array_equal(
+        weights[:, alphasynchro.ms.transitions.frame_transitions.IM_WEIGHT_COLUMN],
+        (transitions.weights / 2).astype(np.float32),
+    )
+    combined_transitions = alphasynchro.ms.transitions.frame_transitions.Transitions(
+        indptr=transitions.indptr,
+        values=transitions.values,
+        weights=weights,
+        precursor_indices=transitions.precursor_indices,
+    )
+    output = combined_transitions.filter(np.array([2, 0]))
+    assert np.array_equal(output.values, [3, 4, 5])
+    assert np.array_equal(output.weights, weights[[5, 0, 1]])
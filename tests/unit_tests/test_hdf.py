@@ -38,6 +38,18 @@ def test_read_and_write_hdf_mmap():
     assert np.array_equal(output, expected)
 
 
+def test_read_and_write_empty_hdf_mmap():
+    expected = np.array([], dtype=np.int64)
+    output = alphasynchro.io.hdf.write_mmap(
+        file_name=TEST_FILE_NAME,
+        group_name=GROUP_NAME,
+        mmap_name="empty_mmap",
+        mmap_value=expected,
+    )
+    assert np.array_equal(output, expected)
+    assert output.dtype == expected.dtype
+
+
 def test_overwrite_hdf_mmap():
     expected = np.arange(10)
     _ = alphasynchro.io.hdf.write_mmap(
@@ -55,6 +67,26 @@ def test_overwrite_hdf_mmap():
     assert np.array_equal(output, expected)
 
 
+def test_create_empty_hdf_mmap():
+    output = alphasynchro.io.hdf.create_empty_mmap(
+        file_name=TEST_FILE_NAME,
+        group_name=GROUP_NAME,
+        mmap_name="writable_mmap",
+        shape=(5, 2),
+        dtype=np.int64,
+    )
+    assert output.shape == (5, 2)
+    assert output.dtype == np.int64
+    expected = np.arange(10).reshape(5, 2)
+    output[:] = expected
+    output = alphasynchro.io.hdf.read_mmap(
+        file_name=TEST_FILE_NAME,
+        mmap_name="writable_mmap",
+        group_name=GROUP_NAME,
+    )
+    assert np.array_equal(output, expected)
+
+
 def test_hdf_object_reading():
     expected = np.arange(10)
     alphasynchro.io.hdf.write_mmap(
@@ -0,0 +1,80 @@
+# builtin
+import json
+import os
+
+# external
+import numpy as np
+import numba
+import pytest
+
+# local
+import alphasynchro.performance.instrumentation
+import alphasynchro.performance.multithreading
+
+
+TEST_FILE_NAME = "sandbox_folder/report.json"
+
+
+if os.path.exists(TEST_FILE_NAME):
+    os.remove(TEST_FILE_NAME)
+
+
+@alphasynchro.performance.multithreading.parallel(
+    thread_count=2,
+    include_progress_callback=False,
+)
+@numba.njit(nogil=True)
+def square(index, output_buffer): # pragma: no cover
+    output_buffer[index] = index**2
+
+
+@alphasynchro.performance.instrumentation.stage
+def square_all(size):
+    output_buffer = np.empty(size, dtype=np.int64)
+    square(range(size), output_buffer)
+    square(np.arange(size // 2), output_buffer)
+    return output_buffer
+
+
+def test_record_is_inactive_without_report():
+    with alphasynchro.performance.instrumentation.record("stage") as record:
+        assert record is None
+    assert not alphasynchro.performance.instrumentation.is_recording()
+
+
+def test_report():
+    with alphasynchro.performance.instrumentation.report(TEST_FILE_NAME) as root:
+        assert alphasynchro.performance.instrumentation.is_recording()
+        output = square_all(100)
+    assert not alphasynchro.performance.instrumentation.is_recording()
+    assert np.array_equal(output, np.arange(100)**2)
+    with open(TEST_FILE_NAME) as report_file:
+        report = json.load(report_file)
+    assert report == root
+    assert report["name"] == "run"
+    stage, = report["children"]
+    assert stage["name"] == "square_all"
+    assert stage["kind"] == "stage"
+    assert stage["item_count"] == 150
+    assert stage["thread_count"] == alphasynchro.performance.multithreading.set_threads(
+        2,
+        set_global=False,
+    )
+    assert [child["item_count"] for child in stage["children"]] == [100, 50]
+    assert all(child["kind"] == "parallel" for child in stage["children"])
+    for record in [report, stage] + stage["children"]:
+        assert record["wall_time"] >= 0
+        assert record["cpu_time"] >= 0
+        assert record["peak_rss"] >= record["end_rss"] > 0
+        assert record["allocated_bytes"] == record["end_rss"] - record["start_rss"]
+
+
+def test_report_is_written_on_failure():
+    with pytest.raises(ValueError):
+        with alphasynchro.performance.instrumentation.report(TEST_FILE_NAME):
+            with alphasynchro.performance.instrumentation.record("failing_stage"):
+                raise ValueError
+    assert not alphasynchro.performance.instrumentation.is_recording()
+    with open(TEST_FILE_NAME) as report_file:
+        report = json.load(report_file)
+    assert report["children"][0]["name"] == "failing_stage"
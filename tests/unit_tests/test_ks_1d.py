@@ -117,3 +117,433 @@ def test_calculate_all_no_offsets():
     expected = np.array([0.0, 0.5, 0.5, 0.2, 0.5, 0.5, 0.2, 0.5, 0.5])
     output = paired_ks_tester.calculate_all(input_data)
     assert np.array_equal(output, expected)
+
+
+@pytest.mark.parametrize(
+    "input, expected",
+    [
+        (
+            np.inf,
+            np.array([0, .5, .5, .2, .5, .5, .2, .5, .5]),
+        ),
+        (
+            .3,
+            np.array([0, np.inf, .5, np.inf, np.inf, .5, np.inf, np.inf, np.inf]),
+        ),
+    ]
+)
+def test_calculate_all_fused(ks_tester, input, expected):
+    input_data = np.array(
+        [
+            (0, 0),
+            (1, 0),
+            (2, 0),
+            (3, 0),
+            (0, 1),
+            (0, 2),
+            (0, 3),
+            (2, 3),
+            (3, 2),
+        ]
+    )
+    no_offset_cdf = alphasynchro.stats.distributions.CDFWithOffset(
+        indptr=ks_tester.cdf_with_offset.indptr,
+        values=ks_tester.cdf_with_offset.values,
+        start_offsets=np.zeros(4, dtype=np.int64),
+    )
+    fused_ks_tester = alphasynchro.stats.ks_1d.KSTester1DFusedPairedMultithreaded(
+        first_ks_tester=alphasynchro.stats.ks_1d.KSTester1DPaired(
+            cdf_with_offset=ks_tester.cdf_with_offset,
+            secondary_cdf_with_offset=ks_tester.cdf_with_offset,
+        ),
+        second_ks_tester=alphasynchro.stats.ks_1d.KSTester1DPaired(
+            cdf_with_offset=no_offset_cdf,
+            secondary_cdf_with_offset=no_offset_cdf,
+        ),
+        first_threshold=input,
+    )
+    first_output, second_output = fused_ks_tester.calculate_all(input_data)
+    assert np.array_equal(
+        first_output,
+        np.array([0, .5, .2, .7, .5, .2, .7, .7, .7])
+    )
+    assert np.allclose(second_output, expected)
+
+
+def test_calculate_all_with_threshold(ks_tester):
+    input_data = np.array(
+        [
+            (0, 0),
+            (1, 0),
+            (2, 0),
+            (3, 0),
+            (0, 1),
+            (0, 2),
+            (0, 3),
+            (2, 3),
+            (3, 2),
+        ]
+    )
+    thresholded_ks_tester = alphasynchro.stats.ks_1d.KSTester1DMultithreaded(
+        cdf_with_offset=ks_tester.cdf_with_offset,
+        threshold=.4,
+    )
+    rejected = alphasynchro.stats.ks_1d.REJECTED_KS_VALUE
+    expected = np.array(
+        [0, rejected, .2, rejected, rejected, .2, rejected, rejected, rejected]
+    )
+    output, statistics = thresholded_ks_tester.calculate_all_with_statistics(
+        input_data
+    )
+    assert np.array_equal(output, expected)
+    assert np.array_equal(thresholded_ks_tester.calculate_all(input_data), expected)
+    assert statistics["pair_count"] == 9
+    assert statistics["rejected_count"] == 6
+    assert statistics["scanned_size"] == 8
+    assert statistics["overlap_size"] == 12
+    assert np.isclose(statistics["avoided_fraction"], 1 / 3)
+
+
+def test_calculate_all_fused_with_statistics(ks_tester):
+    input_data = np.array(
+        [
+            (0, 0),
+            (1, 0),
+            (2, 0),
+            (3, 0),
+        ]
+    )
+    fused_ks_tester = alphasynchro.stats.ks_1d.KSTester1DFusedPairedMultithreaded(
+        first_ks_tester=alphasynchro.stats.ks_1d.KSTester1DPaired(
+            cdf_with_offset=ks_tester.cdf_with_offset,
+            secondary_cdf_with_offset=ks_tester.cdf_with_offset,
+            threshold=.4,
+        ),
+        second_ks_tester=alphasynchro.stats.ks_1d.KSTester1DPaired(
+            cdf_with_offset=ks_tester.cdf_with_offset,
+            secondary_cdf_with_offset=ks_tester.cdf_with_offset,
+        ),
+        first_threshold=.4,
+    )
+    (
+        first_output,
+        second_output,
+        first_statistics,
+        second_statistics,
+    ) = fused_ks_tester.calculate_all_with_statistics(input_data)
+    rejected = alphasynchro.stats.ks_1d.REJECTED_KS_VALUE
+    expected = np.array([0, rejected, .2, rejected])
+    assert np.array_equal(first_output, expected)
+    assert np.array_equal(second_output, expected)
+    assert first_statistics["scanned_size"] == 5
+    assert second_statistics["scanned_size"] == 4
+    assert second_statistics["overlap_size"] == 6
+
+
+def test_calculate_all_of_indptr():
+    indptr = np.array([0, 2, 3, 6, 8])
+    values = np.array([.5, 1.0, 1.0, .2, .5, 1., .3, 1.0])
+    cdf_with_offset = alphasynchro.stats.distributions.CDF(
+        indptr=indptr,
+        values=values,
+    )
+    paired_ks_tester = alphasynchro.stats.ks_1d.KSTester1DNoOffsetPairedMultithreaded(
+        cdf_with_offset=cdf_with_offset,
+        secondary_cdf_with_offset=cdf_with_offset,
+    )
+    pair_indptr = np.array([0, 1, 1, 3, 4])
+    expected = paired_ks_tester.calculate_all(
+        np.array(
+            [
+                (0, 0),
+                (2, 1),
+                (2, 2),
+                (3, 3),
+            ]
+        )
+    )
+    output = paired_ks_tester.calculate_all_of_indptr(pair_indptr)
+    assert np.array_equal(output, expected)
+    ks_values = np.full(4, -1.)
+    output = paired_ks_tester.calculate_all_of_indptr(pair_indptr, ks_values)
+    assert output is ks_values
+    assert np.array_equal(output, expected)
+
+
+@pytest.mark.parametrize(
+    "input, expected",
+    [
+        (
+            np.array([0, 0, 0, 0, 1, 2, 2, 3, 3, 3]),
+            np.array([0, 4, 5, 7, 10]),
+        ),
+        (
+            np.array([0]),
+            np.array([0, 1]),
+        ),
+    ]
+)
+def test_get_block_indptr(input, expected):
+    output = alphasynchro.stats.ks_1d.get_block_indptr(input)
+    assert np.array_equal(output, expected)
+
+
+@pytest.mark.parametrize(
+    "start_offset1, start_offset2, expected",
+    [
+        (0, 0, (0., [.5, 1.], [.3, 1.])),
+        (0, 1, (.5, [1.], [.3, 1.])),
+        (0, 5, (1., [], [.3, 1.])),
+        (5, 0, (1., [.5, 1.], [])),
+    ]
+)
+def test_trim_left_edge_of_cdf_pair(start_offset1, start_offset2, expected):
+    max_diff, cdf1, cdf2 = alphasynchro.stats.ks_1d.trim_left_edge_of_cdf_pair(
+        np.array([.5, 1.]),
+        start_offset1,
+        np.array([.3, 1.]),
+        start_offset2,
+    )
+    assert max_diff == expected[0]
+    assert np.array_equal(cdf1, expected[1])
+    assert np.array_equal(cdf2, expected[2])
+
+
+@pytest.mark.parametrize(
+    "cdf1, start_offset1, cdf2, start_offset2, expected",
+    [
+        ([], 0, [.3, 1.], 5, 0.),
+        ([], 5, [.3, 1.], 0, 1.),
+        ([.5, 1.], 0, [], 5, 1.),
+        ([.5, 1.], 5, [], 0, 0.),
+    ]
+)
+def test_trim_left_edge_of_empty_cdf(cdf1, start_offset1, cdf2, start_offset2, expected):
+    max_diff, _, _ = alphasynchro.stats.ks_1d.trim_left_edge_of_cdf_pair(
+        np.array(cdf1, dtype=np.float64),
+        start_offset1,
+        np.array(cdf2, dtype=np.float64),
+        start_offset2,
+    )
+    assert max_diff == expected
+
+
+def test_calculate_all_paired_with_empty_projection():
+    cdf_with_offset = alphasynchro.stats.distributions.CDFWithOffset(
+        indptr=np.array([0, 0, 2]),
+        values=np.array([.5, 1.]),
+        start_offsets=np.array([0, 3], dtype=np.int64),
+    )
+    paired_ks_tester = alphasynchro.stats.ks_1d.KSTester1DPairedBlockedMultithreaded(
+        cdf_with_offset=cdf_with_offset,
+        secondary_cdf_with_offset=cdf_with_offset,
+    )
+    output = paired_ks_tester.calculate_all(np.array([(0, 1), (1, 0), (0, 0)]))
+    assert np.array_equal(output, [0., 0., 0.])
+
+
+def test_calculate_all_paired_blocked(ks_tester):
+    input_data = np.array(
+        [
+            (0, 0),
+            (0, 1),
+            (0, 2),
+            (0, 3),
+            (1, 0),
+            (2, 0),
+            (2, 3),
+            (3, 0),
+            (3, 2),
+        ]
+    )
+    blocked_ks_tester = alphasynchro.stats.ks_1d.KSTester1DPairedBlockedMultithreaded(
+        cdf_with_offset=ks_tester.cdf_with_offset,
+        secondary_cdf_with_offset=ks_tester.cdf_with_offset,
+    )
+    expected = np.array([0, .5, .2, .7, .5, .2, .7, .7, .7])
+    output = blocked_ks_tester.calculate_all(input_data)
+    assert np.array_equal(output, expected)
+    block_indptr = np.array([0, 4, 5, 7, 9])
+    output = blocked_ks_tester.calculate_all(input_data, block_indptr)
+    assert np.array_equal(output, expected)
+
+
+@pytest.mark.parametrize("input", [np.inf, .3])
+def test_calculate_all_fused_blocked(ks_tester, input):
+    input_data = np.array(
+        [
+            (0, 0),
+            (0, 1),
+            (0, 2),
+            (0, 3),
+            (1, 0),
+            (2, 0),
+            (2, 3),
+            (3, 0),
+            (3, 2),
+        ]
+    )
+    no_offset_cdf = alphasynchro.stats.distributions.CDFWithOffset(
+        indptr=ks_tester.cdf_with_offset.indptr,
+        values=ks_tester.cdf_with_offset.values,
+        start_offsets=np.zeros(4, dtype=np.int64),
+    )
+    ks_tester_kwargs = dict(
+        first_ks_tester=alphasynchro.stats.ks_1d.KSTester1DPaired(
+            cdf_with_offset=ks_tester.cdf_with_offset,
+            secondary_cdf_with_offset=ks_tester.cdf_with_offset,
+        ),
+        second_ks_tester=alphasynchro.stats.ks_1d.KSTester1DPaired(
+            cdf_with_offset=no_offset_cdf,
+            secondary_cdf_with_offset=no_offset_cdf,
+        ),
+        first_threshold=input,
+    )
+    fused_ks_tester = alphasynchro.stats.ks_1d.KSTester1DFusedPairedMultithreaded(
+        **ks_tester_kwargs
+    )
+    blocked_ks_tester = alphasynchro.stats.ks_1d.KSTester1DFusedPairedBlockedMultithreaded(
+        **ks_tester_kwargs
+    )
+    expected_first, expected_second = fused_ks_tester.calculate_all(input_data)
+    first_output, second_output = blocked_ks_tester.calculate_all(input_data)
+    assert np.array_equal(first_output, expected_first)
+    assert np.array_equal(second_output, expected_second)
+
+
+@pytest.mark.parametrize(
+    "dtype",
+    [np.float32, np.uint16]
+)
+def test_calculate_all_compressed(dtype):
+    random = np.random.default_rng(0)
+    sizes = random.integers(1, 50, 100)
+    indptr = np.zeros(len(sizes) + 1, dtype=np.int64)
+    indptr[1:] = np.cumsum(sizes)
+    values = np.concatenate(
+        [np.cumsum(random.random(size)) for size in sizes]
+    )
+    values /= np.repeat(values[indptr[1:] - 1], sizes)
+    cdf_with_offset = alphasynchro.stats.distributions.CDFWithOffset(
+        indptr=indptr,
+        values=values,
+        start_offsets=random.integers(0, 20, len(sizes)),
+    )
+    compressed_cdf_with_offset = cdf_with_offset.compress(dtype)
+    input_data = random.integers(0, len(sizes), (1000, 2))
+    expected = alphasynchro.stats.ks_1d.KSTester1DPairedMultithreaded(
+        cdf_with_offset=cdf_with_offset,
+        secondary_cdf_with_offset=cdf_with_offset,
+    ).calculate_all(input_data)
+    output = alphasynchro.stats.ks_1d.KSTester1DPairedMultithreaded(
+        cdf_with_offset=cdf_with_offset,
+        secondary_cdf_with_offset=compressed_cdf_with_offset,
+    ).calculate_all(input_data)
+    fully_compressed_output = alphasynchro.stats.ks_1d.KSTester1DMultithreaded(
+        cdf_with_offset=compressed_cdf_with_offset,
+    ).calculate_all(input_data)
+    bound = alphasynchro.stats.distributions.get_ks_accuracy_bound(dtype)
+    assert np.all(np.abs(output - expected) <= bound)
+    assert np.all(np.abs(fully_compressed_output - expected) <= bound)
+
+
+@pytest.mark.parametrize(
+    "input, expected",
+    [
+        (([1, 1, 2, 2], [1, 1, 1, 1], 2), 2),
+        (([1, 1, 2, 2], [2, 3, 3, 3], 3), 3),
+        (([1, 1, 2, 2], [2, 3, 3, 3], 2), 2),
+        (([2, 3, 3, 3], [1, 1, 2, 2], 4), 3),
+        (([2, 3, 3, 3], [1, 1, 2, 2], 1), 0),
+    ]
+)
+def test_get_sketched_ks_count(input, expected):
+    positions1, positions2, end_offset = input
+    output = alphasynchro.stats.ks_1d.get_sketched_ks_count(
+        np.array(positions1),
+        np.array(positions2),
+        end_offset,
+    )
+    assert output == expected
+
+
+@pytest.fixture(scope="module")
+def random_cdf_with_offset():
+    random = np.random.default_rng(0)
+    sizes = random.integers(1, 100, 200)
+    indptr = np.zeros(len(sizes) + 1, dtype=np.int64)
+    indptr[1:] = np.cumsum(sizes)
+    values = np.concatenate(
+        [np.cumsum(random.random(size)) for size in sizes]
+    )
+    values /= np.repeat(values[indptr[1:] - 1], sizes)
+    start_offsets = random.integers(0, 20, len(sizes))
+    return alphasynchro.stats.distributions.CDFWithOffset(
+        indptr=indptr,
+        values=values,
+        start_offsets=start_offsets,
+    )
+
+
+@pytest.mark.parametrize(
+    "sketch_size, threshold",
+    [
+        (4, .5),
+        (16, .3),
+        (64, .1),
+    ]
+)
+def test_calculate_all_sketched(random_cdf_with_offset, sketch_size, threshold):
+    random = np.random.default_rng(1)
+    cdf_with_offset = random_cdf_with_offset
+    input_data = random.integers(0, len(cdf_with_offset), (2000, 2))
+    overlapping = np.minimum(
+        cdf_with_offset.start_offsets[input_data[:, 0]] + np.diff(cdf_with_offset.indptr)[input_data[:, 0]],
+        cdf_with_offset.start_offsets[input_data[:, 1]] + np.diff(cdf_with_offset.indptr)[input_data[:, 1]],
+    ) > np.maximum(
+        cdf_with_offset.start_offsets[input_data[:, 0]],
+        cdf_with_offset.start_offsets[input_data[:, 1]],
+    )
+    input_data = input_data[overlapping]
+    sketch = cdf_with_offset.to_quantile_sketch(sketch_size)
+    expected = alphasynchro.stats.ks_1d.KSTester1DPairedMultithreaded(
+        cdf_with_offset=cdf_with_offset,
+        secondary_cdf_with_offset=cdf_with_offset,
+    ).calculate_all(input_data)
+    unbounded_expected = alphasynchro.stats.ks_1d.KSTester1DPairedMultithreaded(
+        cdf_with_offset=cdf_with_offset,
+        secondary_cdf_with_offset=cdf_with_offset,
+        threshold=np.inf,
+    ).calculate_all(input_data)
+    ks_testers = {
+        approximate: alphasynchro.stats.ks_1d.KSTester1DSketchedPairedMultithreaded(
+            cdf_with_offset=cdf_with_offset,
+            secondary_cdf_with_offset=cdf_with_offset,
+            threshold=threshold,
+            sketch=sketch,
+            secondary_sketch=sketch,
+            approximate=approximate,
+        ) for approximate in [False, True]
+    }
+    approximations = np.array(
+        [
+            ks_testers[False].calculate_approximately(index1, index2) for index1, index2 in input_data
+        ]
+    )
+    assert np.all(np.abs(approximations - unbounded_expected) < 1 / sketch_size)
+    expected = alphasynchro.stats.ks_1d.KSTester1DPairedMultithreaded(
+        cdf_with_offset=cdf_with_offset,
+        secondary_cdf_with_offset=cdf_with_offset,
+        threshold=threshold,
+    ).calculate_all(input_data)
+    output = ks_testers[False].calculate_all(input_data)
+    assert np.array_equal(output, expected)
+    approximate_output = ks_testers[True].calculate_all(input_data)
+    rejected = expected == alphasynchro.stats.ks_1d.REJECTED_KS_VALUE
+    assert np.array_equal(
+        approximate_output == alphasynchro.stats.ks_1d.REJECTED_KS_VALUE,
+        rejected,
+    )
+    assert np.all(
+        np.abs(approximate_output[~rejected] - expected[~rejected]) < 1 / sketch_size
+    )
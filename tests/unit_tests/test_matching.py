@@ -57,3 +57,68 @@ def test_match_all(unfragmented_matcher):
     output = unfragmented_matcher.match_all()
     print(expected, output)
     assert np.array_equal(output, expected)
+
+
+def test_match_all_of_push_indices(unfragmented_matcher):
+    push_indices = np.array([3])
+    output = unfragmented_matcher.count_all(push_indices)
+    assert np.array_equal(output, np.array([0, 0, 0, 1, 0, 0]))
+    output = unfragmented_matcher.match_all(push_indices=push_indices)
+    assert np.array_equal(output, np.array([[2, 0]]))
+
+
+def create_pruned_matcher(quadrupole_tolerance):
+    indexed_precursors = alphasynchro.ms.peaks.indexed.mz_peaks.PushIndexedMzs(
+        indptr=np.array([0, 2, 2, 2, 2], dtype=np.int64),
+        values=np.array([0, 1], dtype=np.int64),
+        axis_shape=(1, 2, 2),
+    )
+    indexed_fragments = alphasynchro.ms.peaks.indexed.mz_peaks.PushIndexedMzs(
+        indptr=np.array([0, 0, 0, 2, 4], dtype=np.int64),
+        values=np.array([500., 900., 300., 430.]),
+        axis_shape=(1, 2, 2),
+    )
+    cycle = np.array(
+        [
+            [
+                [[0., 0.], [0., 0.]],
+                [[400., 425.], [425., 450.]],
+            ]
+        ]
+    )
+    pruned_matcher = alphasynchro.algorithms.matching.matching.PrunedFragmentedMatcherMultithreaded(
+        indexed_precursors=indexed_precursors,
+        indexed_fragments=indexed_fragments,
+        frame=1,
+        scan_tolerance=1,
+        cycle_tolerance=0,
+        precursor_mz_values=np.array([410., 440.]),
+        precursor_charges=np.array([2, 1], dtype=np.int64),
+        cycle=cycle,
+        quadrupole_tolerance=quadrupole_tolerance,
+    )
+    return pruned_matcher
+
+
+@pytest.mark.parametrize(
+    "input, expected",
+    [
+        (0, np.array([[0, 0], [1, 2], [1, 3]])),
+        (-1, np.array([[0, 0], [0, 2], [0, 3], [1, 2], [1, 3]])),
+    ]
+)
+def test_pruned_match_all(input, expected):
+    pruned_matcher = create_pruned_matcher(input)
+    output = pruned_matcher.match_all()
+    assert np.array_equal(output, expected)
+
+
+def test_pruned_count_all():
+    pruned_matcher = create_pruned_matcher(0)
+    pruned_counts = np.full(4, -1, dtype=np.int64)
+    expected_matches = np.array([3, 0, 0, 0])
+    expected_pruned_counts = np.array([5, 0, 0, 0])
+    assert np.array_equal(pruned_matcher.count_all(), expected_matches)
+    output = pruned_matcher.count_all(pruned_counts=pruned_counts)
+    assert np.array_equal(output, expected_matches)
+    assert np.array_equal(pruned_counts, expected_pruned_counts)
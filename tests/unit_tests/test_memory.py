@@ -0,0 +1,64 @@
+#external
+import numpy as np
+import pytest
+
+#local
+import alphasynchro.performance.instrumentation
+import alphasynchro.performance.memory
+
+
+def test_get_memory_budget():
+    assert alphasynchro.performance.memory.get_memory_budget(1) == 1024**3
+    assert alphasynchro.performance.memory.get_memory_budget(.5) == 512 * 1024**2
+
+
+def test_is_exceeded():
+    assert not alphasynchro.performance.memory.is_exceeded(None)
+    assert alphasynchro.performance.memory.is_exceeded(0)
+    memory_usage = alphasynchro.performance.instrumentation.get_memory_usage()
+    assert not alphasynchro.performance.memory.is_exceeded(
+        10 * memory_usage / 1024**3
+    )
+
+
+def test_get_max_item_count():
+    assert alphasynchro.performance.memory.get_max_item_count(8) is None
+    assert alphasynchro.performance.memory.get_max_item_count(8, 0) == 1
+    assert alphasynchro.performance.memory.get_max_item_count(8, 0, 100) == 100
+    memory_usage = alphasynchro.performance.instrumentation.get_memory_usage()
+    max_memory = 2 * memory_usage / 1024**3
+    available_memory = alphasynchro.performance.memory.get_available_memory(
+        max_memory
+    )
+    assert 0 < available_memory <= memory_usage
+    assert alphasynchro.performance.memory.get_max_item_count(
+        8,
+        max_memory,
+    ) <= available_memory // 8 + 1
+
+
+@pytest.mark.parametrize(
+    "counts,max_count,expected_blocks",
+    [
+        ([1, 2, 3], None, [None]),
+        ([1, 2, 3], 6, [None]),
+        ([1, 2, 3], 3, [[0, 1], [2]]),
+        ([3, 0, 3, 0, 3], 3, [[0], [2], [4]]),
+        ([0, 5, 1, 1, 1, 0], 2, [[1], [2], [3, 4]]),
+        ([1, 1, 1, 1], 1, [[0], [1], [2], [3]]),
+    ]
+)
+def test_split_into_blocks(counts, max_count, expected_blocks):
+    counts = np.array(counts)
+    blocks = alphasynchro.performance.memory.split_into_blocks(counts, max_count)
+    assert len(blocks) == len(expected_blocks)
+    for block, expected_block in zip(blocks, expected_blocks):
+        if expected_block is None:
+            assert block is None
+        else:
+            assert np.array_equal(block, expected_block)
+    if blocks[0] is not None:
+        assert np.array_equal(
+            np.concatenate(blocks),
+            np.flatnonzero(counts),
+        )
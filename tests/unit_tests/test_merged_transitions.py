@@ -1,7 +1,9 @@
 #external
+import numpy as np
 import pytest
 
 #local
+import alphasynchro.ms.transitions.frame_transitions
 import alphasynchro.ms.transitions.merged_transitions
 
 
@@ -13,3 +15,80 @@ import alphasynchro.ms.transitions.merged_transitions
 )
 def test_has_classes(input):
     assert hasattr(alphasynchro.ms.transitions.merged_transitions, input)
+
+
+@pytest.fixture(scope="module")
+def transition_dict():
+    transition_dict = {
+        1: alphasynchro.ms.transitions.frame_transitions.Transitions(
+            indptr=np.array([0, 2, 5, 6]),
+            values=np.array([4, 5, 0, 1, 2, 3]),
+            weights=alphasynchro.ms.transitions.frame_transitions.combine_weights(
+                rt_weights=np.array([.1, .9, .1, .2, .7, .5]),
+                im_weights=np.array([.2, .8, .3, .4, .6, 0.]),
+            ),
+            precursor_indices=np.arange(3),
+        ),
+        2: alphasynchro.ms.transitions.frame_transitions.Transitions(
+            indptr=np.array([0, 1, 1, 3]),
+            values=np.array([7, 8, 9]),
+            weights=alphasynchro.ms.transitions.frame_transitions.combine_weights(
+                rt_weights=np.array([.3, .4, .6]),
+                im_weights=np.array([.5, .25, .75]),
+            ),
+            precursor_indices=np.arange(3),
+        ),
+    }
+    return transition_dict
+
+
+def test_from_transition_dicts(transition_dict):
+    output = alphasynchro.ms.transitions.merged_transitions.MergedFrames.from_transition_dicts(
+        transition_dict=transition_dict,
+        fragments=None,
+    )
+    assert np.array_equal(output.indptr, [0, 3, 6, 9])
+    assert np.array_equal(output.values, [4, 5, 7, 0, 1, 2, 3, 8, 9])
+    assert output.weights.dtype == np.float32
+    assert np.array_equal(
+        output.get_rt_weights(1),
+        np.array([.1, .2, .7], dtype=np.float32),
+    )
+    assert np.array_equal(
+        output.get_im_weights(2),
+        np.array([0., .25, .75], dtype=np.float32),
+    )
+
+
+@pytest.mark.parametrize(
+    "size",
+    [0, 1, 2, 32, 33, 100, 5000],
+)
+def test_sort_segment_by_keys(size):
+    np.random.seed(size)
+    keys = np.round(np.random.uniform(100, 2000, size), 2)
+    # nearly identical keys collide as float32 and must still be sorted exactly
+    keys[::7] = 500 + np.arange(len(keys[::7])) % 3 * 1e-9
+    values = np.arange(size)
+    weights = np.random.random((size, 2)).astype(np.float32)
+    order = np.argsort(keys, kind="stable")
+    expected_keys = keys[order]
+    expected_values = values[order]
+    expected_weights = weights[order]
+    sort_buffers = alphasynchro.ms.transitions.merged_transitions.create_sort_buffers(
+        2,
+        size,
+        keys,
+        values,
+        weights,
+    )
+    alphasynchro.ms.transitions.merged_transitions.sort_segment_by_keys(
+        keys,
+        values,
+        weights,
+        sort_buffers,
+        1,
+    )
+    assert np.array_equal(keys, expected_keys)
+    assert np.array_equal(values, expected_values)
+    assert np.array_equal(weights, expected_weights)
@@ -37,3 +37,91 @@ def test_match_mz_arrays(mz_values1, mz_values2, input, expected):
         )
     )
     assert output == expected
+
+
+@pytest.mark.parametrize(
+    "input, expected",
+    [
+        (0, [(0, 0)]),
+        (30, [(0, 0)]),
+        (50, [(0, 0), (1, 1)]),
+        (52, [(0, 0), (1, 1), (3, 2)]),
+        (100, [(0, 0), (1, 1), (3, 2), (3, 3)]),
+    ]
+)
+def test_match_mz_arrays_batched(mz_values1, mz_values2, input, expected):
+    output = alphasynchro.ms.dimensions.mz_matching.match_mz_arrays_batched(
+        mz_values1,
+        mz_values2,
+        ppm_tolerance=input,
+    )
+    assert output.shape == (len(expected), 2)
+    assert [tuple(pair) for pair in output] == expected
+
+
+@pytest.mark.parametrize(
+    "input, expected",
+    [
+        (0, 1),
+        (50, 2),
+        (100, 4),
+    ]
+)
+def test_count_mz_array_matches(mz_values1, mz_values2, input, expected):
+    output = alphasynchro.ms.dimensions.mz_matching.count_mz_array_matches(
+        mz_values1,
+        mz_values2,
+        input,
+    )
+    assert output == expected
+
+
+def test_fill_mz_array_matches(mz_values1, mz_values2):
+    matches = np.full((6, 2), -1, dtype=np.int64)
+    offset = alphasynchro.ms.dimensions.mz_matching.fill_mz_array_matches(
+        mz_values1,
+        mz_values2,
+        100,
+        matches,
+        1,
+        10,
+        20,
+    )
+    expected = np.array(
+        [
+            [-1, -1],
+            [10, 20],
+            [11, 21],
+            [13, 22],
+            [13, 23],
+            [-1, -1],
+        ]
+    )
+    assert offset == 5
+    assert np.array_equal(matches, expected)
+
+
+def test_match_mz_arrays_batched_empty(mz_values1):
+    output = alphasynchro.ms.dimensions.mz_matching.match_mz_arrays_batched(
+        mz_values1,
+        np.array([], dtype=np.float64),
+    )
+    assert output.shape == (0, 2)
+
+
+def test_match_mz_arrays_batched_brute_force():
+    generator = np.random.default_rng(0)
+    mz_values1 = np.sort(generator.uniform(100, 101, 200))
+    mz_values2 = np.sort(generator.uniform(100, 101, 300))
+    output = alphasynchro.ms.dimensions.mz_matching.match_mz_arrays_batched(
+        mz_values1,
+        mz_values2,
+        50,
+    )
+    ppm_differences = (
+        mz_values2[np.newaxis, :] - mz_values1[:, np.newaxis]
+    ) * 2 / (
+        mz_values2[np.newaxis, :] + mz_values1[:, np.newaxis]
+    ) * 10**6
+    expected = np.argwhere(np.abs(ppm_differences) <= 50)
+    assert np.array_equal(output, expected)
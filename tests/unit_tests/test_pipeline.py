@@ -1,9 +1,11 @@
 #external
+import logging
 import os
 import numpy as np
 import pytest
 
 #local
+import alphasynchro.algorithms.calibration
 import alphasynchro.algorithms.pipeline
 
 
@@ -50,3 +52,168 @@ def test_load_peaks():
     pipeline.load_peaks("./unit_tests/test_clusters.hdf")
     assert hasattr(pipeline, "fragments")
     assert hasattr(pipeline, "monoisotopic_precursors")
+
+
+def test_calibrate_from_file():
+    calibration_file_name = "sandbox_folder/calibration.hdf"
+    calibrator = alphasynchro.algorithms.calibration.TransmissionCalibrator(
+        indexed_efficiency=np.array([[1, .5, .2], [.9, .4, .1]]),
+    )
+    calibrator.to_file(calibration_file_name)
+    pipeline = create_pipeline()
+    pipeline.calibrate(calibration_file=calibration_file_name)
+    assert np.array_equal(
+        pipeline.transmission_calibrator.indexed_efficiency,
+        calibrator.indexed_efficiency,
+    )
+    assert np.array_equal(
+        pipeline.analysis_file.transmission_calibrator.indexed_efficiency,
+        calibrator.indexed_efficiency,
+    )
+
+
+@pytest.fixture(scope="module")
+def synthetic_pipeline(synthetic_cluster_file_name, tmp_path_factory):
+    pipeline = alphasynchro.algorithms.pipeline.Pipeline(
+        str(tmp_path_factory.mktemp("synthetic_analysis") / "analysis.hdf"),
+        overwrite=True,
+    )
+    pipeline.load_data_space(synthetic_cluster_file_name)
+    pipeline.load_peaks(synthetic_cluster_file_name)
+    pipeline.calibrate()
+    return pipeline
+
+
+def create_transitions(pipeline, **kwargs):
+    pipeline.create_ms2_spectra(**kwargs)
+    # stored arrays are views on the analysis file and are overwritten by a next run
+    transitions = {
+        name: np.array(getattr(pipeline.transitions, name))
+        for name in ["indptr", "values", "weights", "precursor_indices"]
+    }
+    pairs = set()
+    for row, precursor_index in enumerate(transitions["precursor_indices"]):
+        start, end = transitions["indptr"][row: row + 2]
+        for merged_fragment_index in transitions["values"][start: end]:
+            for fragment_index in pipeline.merged_fragments.fragment_pointers.get_values(
+                merged_fragment_index
+            ):
+                pairs.add((precursor_index, fragment_index))
+    return transitions, pairs
+
+
+@pytest.mark.parametrize(
+    "unique_transitions_only",
+    [False, True]
+)
+def test_create_ms2_spectra_within_memory_budget(
+    synthetic_pipeline,
+    unique_transitions_only,
+    monkeypatch,
+    caplog,
+):
+    expected_transitions, _ = create_transitions(
+        synthetic_pipeline,
+        unique_transitions_only=unique_transitions_only,
+    )
+    assert expected_transitions["indptr"][-1] > 0
+    monkeypatch.setattr(alphasynchro.algorithms.pipeline, "MIN_PAIR_BLOCK_SIZE", 16)
+    with caplog.at_level(logging.INFO):
+        transitions, _ = create_transitions(
+            synthetic_pipeline,
+            unique_transitions_only=unique_transitions_only,
+            max_memory=1e-6,
+        )
+    assert "precursor blocks" in caplog.text
+    assert "Spilling transitions" in caplog.text
+    assert "Writing ks-stats of intensity profiles to disk" in caplog.text
+    assert not os.path.exists(
+        os.path.join(
+            os.path.dirname(synthetic_pipeline.analysis_file.file_name),
+            ".temp.hdf",
+        )
+    )
+    for name, expected_array in expected_transitions.items():
+        assert np.array_equal(transitions[name], expected_array)
+
+
+def test_create_ms2_spectra_with_pruned_candidates(synthetic_pipeline, caplog):
+    _, expected_pairs = create_transitions(synthetic_pipeline)
+    pruned_counts = {}
+    pruned_pairs = {}
+    for quadrupole_tolerance in [1.0, -1.0]:
+        caplog.clear()
+        with caplog.at_level(logging.INFO):
+            _, pruned_pairs[quadrupole_tolerance] = create_transitions(
+                synthetic_pipeline,
+                prune_candidates=True,
+                quadrupole_tolerance=quadrupole_tolerance,
+            )
+        pruned_counts[quadrupole_tolerance] = [
+            int(record.getMessage().split()[1]) for record in caplog.records
+            if record.getMessage().startswith("Pruned ")
+        ]
+        assert len(pruned_counts[quadrupole_tolerance]) == synthetic_pipeline.cycle.shape[1] - 1
+        assert pruned_pairs[quadrupole_tolerance] <= expected_pairs
+    # a negative tolerance disables the quadrupole check but keeps the charge check
+    assert 0 < sum(pruned_counts[-1.0]) < sum(pruned_counts[1.0])
+    assert pruned_pairs[1.0] <= pruned_pairs[-1.0]
+
+
+def test_calibrate_with_drift_tolerance(
+    synthetic_pipeline,
+    tmp_path,
+    monkeypatch,
+    caplog,
+):
+    calibration_file_name = str(tmp_path / "calibration.hdf")
+    synthetic_pipeline.calibrate(calibration_file=calibration_file_name)
+    stored_calibrator = alphasynchro.algorithms.calibration.TransmissionCalibrator.from_file(
+        calibration_file_name
+    )
+    assert np.array_equal(
+        stored_calibrator.unfragmented_pairs,
+        synthetic_pipeline.transmission_calibrator.unfragmented_pairs,
+    )
+    sampled_cycle_counts = []
+    create_transmission_calibrator = alphasynchro.algorithms.pipeline.Pipeline.create_transmission_calibrator
+
+    def record_sampled_cycle_count(self, indexed_precursors, sampled_cycle_count=0, **kwargs):
+        sampled_cycle_counts.append(sampled_cycle_count)
+        return create_transmission_calibrator(
+            self,
+            indexed_precursors,
+            sampled_cycle_count=sampled_cycle_count,
+            **kwargs,
+        )
+
+    monkeypatch.setattr(
+        alphasynchro.algorithms.pipeline.Pipeline,
+        "create_transmission_calibrator",
+        record_sampled_cycle_count,
+    )
+    with caplog.at_level(logging.INFO):
+        synthetic_pipeline.calibrate(
+            calibration_file=calibration_file_name,
+            calibration_drift_tolerance=np.inf,
+        )
+    assert sampled_cycle_counts == [
+        alphasynchro.algorithms.pipeline.DRIFT_PROBE_CYCLE_COUNT
+    ]
+    assert "Refreshing" not in caplog.text
+    assert np.array_equal(
+        synthetic_pipeline.transmission_calibrator.indexed_efficiency,
+        stored_calibrator.indexed_efficiency,
+    )
+    sampled_cycle_counts.clear()
+    caplog.clear()
+    with caplog.at_level(logging.INFO):
+        synthetic_pipeline.calibrate(
+            calibration_file=calibration_file_name,
+            calibration_drift_tolerance=-1,
+        )
+    assert sampled_cycle_counts == [
+        alphasynchro.algorithms.pipeline.DRIFT_PROBE_CYCLE_COUNT,
+        0,
+    ]
+    assert "Refreshing" in caplog.text
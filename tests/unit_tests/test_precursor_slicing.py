@@ -1,8 +1,15 @@
 #external
+import numpy as np
 import pytest
 
 #local
+import alphasynchro.algorithms.calibration
 import alphasynchro.algorithms.precursor_slicing
+import alphasynchro.data.dataframe
+import alphasynchro.data.sparse_indices
+import alphasynchro.ms.peaks.precursors
+import alphasynchro.stats.apex_finder
+import alphasynchro.stats.distributions
 
 
 @pytest.mark.parametrize(
@@ -14,3 +21,100 @@ import alphasynchro.algorithms.precursor_slicing
 )
 def test_has_classes(input):
     assert hasattr(alphasynchro.algorithms.precursor_slicing, input)
+
+
+@pytest.fixture(scope="module")
+def precursors():
+    im_projection = alphasynchro.stats.distributions.CDFWithOffset(
+        indptr=np.array([0, 3, 7, 10]),
+        values=np.array([.2, .6, 1., .1, .5, .9, 1., .3, .8, 1.]),
+        start_offsets=np.array([2, 0, 5], dtype=np.int64),
+    )
+    precursors = alphasynchro.ms.peaks.precursors.Precursors(
+        raw_pointers=alphasynchro.data.sparse_indices.SparseIndex(
+            indptr=np.arange(4),
+            values=np.arange(3),
+        ),
+        rt_projection=im_projection,
+        im_projection=im_projection,
+        aggregate_data=alphasynchro.data.dataframe.DataFrame(
+            mz_weighted_average=np.array([500., 510., 700.]),
+        ),
+    )
+    return precursors
+
+
+def create_slicer(precursors, diapasef):
+    cycle = np.zeros((1, 3, 10, 2))
+    cycle[0, 1, :, 0] = np.linspace(487.5, 489.3, 10)
+    cycle[0, 1, :, 1] = cycle[0, 1, :, 0] + 25
+    cycle[0, 2] = cycle[0, 1] + 200
+    indexed_efficiency = np.zeros((2, 30))
+    indexed_efficiency[:, :20] = np.linspace(1, 0, 20)
+    slicer = alphasynchro.algorithms.precursor_slicing.SlicedIMDistributionMultithreaded(
+        precursors=precursors,
+        calibration=alphasynchro.algorithms.calibration.TransmissionCalibrator(
+            indexed_efficiency=indexed_efficiency,
+        ),
+        cycle_center=(np.sum(cycle, axis=-1) / 2)[0],
+        cycle=cycle,
+        diapasef=diapasef,
+    )
+    return slicer
+
+
+@pytest.mark.parametrize(
+    "diapasef, expected_indptr, expected_values",
+    [
+        (False, [0, 0, 1, 2], [0, 2]),
+        (True, [0, 0, 2, 3], [0, 1, 2]),
+    ]
+)
+def test_create_transmissibility_index(precursors, diapasef, expected_indptr, expected_values):
+    slicer = create_slicer(precursors, diapasef)
+    output = slicer.create_transmissibility_index()
+    assert np.array_equal(output.indptr, expected_indptr)
+    assert np.array_equal(output.values, expected_values)
+
+
+@pytest.mark.parametrize(
+    "diapasef",
+    [False, True]
+)
+def test_calculate_transmissible_cdf_for_frame(precursors, diapasef):
+    slicer = create_slicer(precursors, diapasef)
+    transmissibility_index = slicer.create_transmissibility_index()
+    for frame in range(1, 3):
+        expected = slicer.calculate_all_transmitted_cdf_for_frame(frame)
+        output = slicer.calculate_all_transmitted_cdf_for_frame(
+            frame,
+            transmissibility_index.get_values(frame),
+        )
+        assert np.array_equal(output.values, expected.values)
+        assert np.array_equal(output.summed_values, expected.summed_values)
+        for index in range(len(precursors)):
+            assert np.array_equal(
+                output.get_cdf(index),
+                slicer.get_transmitted_projection_cdf(index, frame),
+            )
+
+
+@pytest.mark.parametrize(
+    "diapasef",
+    [False, True]
+)
+def test_calculate_transmitted_cdf_and_apices_for_frame(precursors, diapasef):
+    slicer = create_slicer(precursors, diapasef)
+    for frame in range(1, 3):
+        expected_cdf = slicer.calculate_all_transmitted_cdf_for_frame(frame)
+        expected_apices = alphasynchro.stats.apex_finder.SmoothApexFinder(
+            cdf=expected_cdf,
+            smooth_sigma=1,
+        ).calculate_all()
+        cdf, apices = slicer.calculate_all_transmitted_cdf_and_apices_for_frame(
+            frame,
+            smooth_sigma=1,
+        )
+        assert np.array_equal(cdf.values, expected_cdf.values)
+        assert np.array_equal(cdf.summed_values, expected_cdf.summed_values)
+        assert np.array_equal(apices, expected_apices)
@@ -0,0 +1,112 @@
+# external
+import numba
+import numpy as np
+import pytest
+
+# local
+import alphasynchro.performance.compiling
+import alphasynchro.performance.instrumentation
+import alphasynchro.performance.multithreading
+import alphasynchro.performance.profiling
+
+
+@alphasynchro.performance.compiling.njit_dataclass
+class ProfiledDummy:
+
+    arr: np.ndarray
+
+    @alphasynchro.performance.compiling.njit(nogil=True)
+    def generate_values(self, index: int): # pragma: no cover
+        for value in self.arr[:index]:
+            yield value
+
+    @alphasynchro.performance.compiling.njit(nogil=True)
+    def sum_values(self, index: int) -> int: # pragma: no cover
+        total = 0
+        for value in self.generate_values(index):
+            total += value
+        return total
+
+    @alphasynchro.performance.compiling.njit(nogil=True)
+    def set_sum_from_buffers(self, index: int, buffer: np.ndarray) -> None: # pragma: no cover
+        buffer[index] = self.sum_values(index)
+
+    def sum_all(self) -> np.ndarray:
+        buffer = np.empty(len(self.arr) + 1, dtype=np.int64)
+        alphasynchro.performance.multithreading.parallel(
+            self.set_sum_from_buffers,
+            include_progress_callback=False,
+        )(
+            range(len(buffer)),
+            buffer,
+        )
+        return buffer
+
+
+@pytest.fixture
+def profiling():
+    alphasynchro.performance.profiling.enable(sample_interval=10)
+    alphasynchro.performance.profiling.reset()
+    try:
+        yield alphasynchro.performance.profiling
+    finally:
+        alphasynchro.performance.profiling.disable()
+        alphasynchro.performance.profiling.reset()
+
+
+@numba.njit
+def read_cycle_counters(): # pragma: no cover
+    start = alphasynchro.performance.profiling.read_cycle_counter()
+    end = alphasynchro.performance.profiling.read_cycle_counter()
+    return start, end
+
+
+@numba.njit
+def atomic_add(address, value): # pragma: no cover
+    return alphasynchro.performance.profiling.atomic_add(address, value)
+
+
+def test_read_cycle_counter():
+    start, end = read_cycle_counters()
+    assert end >= start
+
+
+def test_atomic_add():
+    array = np.arange(3, dtype=np.int64)
+    output = atomic_add(array.ctypes.data + 8, 5)
+    assert output == 1
+    assert np.array_equal(array, [0, 6, 2])
+
+
+def test_profiled_methods(profiling):
+    dummy = ProfiledDummy(arr=np.arange(100))
+    output = dummy.sum_all()
+    expected = np.cumsum(np.concatenate([[0], np.arange(100)]))
+    assert np.array_equal(output, expected)
+    kernel_profiles = profiling.get_kernel_profiles()
+    for name in ["generate_values", "sum_values", "set_sum_from_buffers"]:
+        kernel_profile = kernel_profiles[f"ProfiledDummy.{name}"]
+        assert kernel_profile["call_count"] == 101
+        assert kernel_profile["cycle_count"] >= 0
+        assert sum(kernel_profile["sampled_log2_cycle_histogram"].values()) == 11
+    profiling.show_kernel_profiles()
+
+
+def test_unprofiled_methods(profiling):
+    profiling.disable()
+    dummy = ProfiledDummy(arr=np.arange(100))
+    dummy.sum_all()
+    assert profiling.get_kernel_profiles() == {}
+
+
+def test_thread_times_in_report(profiling):
+    dummy = ProfiledDummy(arr=np.arange(100))
+    with alphasynchro.performance.instrumentation.report(
+        "sandbox_folder/profiling_report.json"
+    ) as report:
+        dummy.sum_all()
+    parallel_record, = report["children"]
+    thread_count = parallel_record["thread_count"]
+    assert len(parallel_record["thread_wall_times"]) == thread_count
+    assert len(parallel_record["thread_cpu_times"]) == thread_count
+    assert min(parallel_record["thread_wall_times"]) > 0
@@ -0,0 +1,59 @@
+# external
+import numpy as np
+import pytest
+
+# local
+import alphasynchro.algorithms.scaling
+import alphasynchro.performance.multithreading
+
+
+@pytest.mark.parametrize(
+    "max_thread_count, expected",
+    [
+        (1, [1]),
+        (2, [1, 2]),
+        (3, [1, 2, 3]),
+        (8, [1, 2, 4, 8]),
+        (31, [1, 2, 4, 8, 16, 31]),
+    ]
+)
+def test_get_thread_counts(max_thread_count, expected):
+    output = alphasynchro.algorithms.scaling.get_thread_counts(max_thread_count)
+    assert output == expected
+
+
+def test_time_kernel():
+    thread_counts_used = []
+
+    def kernel():
+        thread_counts_used.append(
+            alphasynchro.performance.multithreading.MAX_THREADS
+        )
+
+    original_thread_count = alphasynchro.performance.multithreading.MAX_THREADS
+    output = alphasynchro.algorithms.scaling.time_kernel(kernel, [1], repeats=2)
+    alphasynchro.performance.multithreading.set_threads(original_thread_count)
+    assert list(output) == [1]
+    assert output[1] >= 0
+    assert thread_counts_used == [1, 1, 1]
+
+
+def test_benchmark_scaling(synthetic_cluster_file_name):
+    original_thread_count = alphasynchro.performance.multithreading.MAX_THREADS
+    output = alphasynchro.algorithms.scaling.benchmark_scaling(
+        synthetic_cluster_file_name,
+        max_thread_count=1,
+        repeats=1,
+    )
+    assert alphasynchro.performance.multithreading.MAX_THREADS == original_thread_count
+    assert list(output) == [
+        "slicing",
+        "matcher count",
+        "matcher fill",
+        "ks paired",
+        "transitions filter",
+        "merged frames sort mz",
+    ]
+    for kernel_times in output.values():
+        assert list(kernel_times) == [1]
+        assert kernel_times[1] >= 0